@@ -4,6 +4,13 @@ from flask_sqlalchemy import SQLAlchemy
 import os
 import logging
 from extensions import db, migrate, jwt, cors, bcrypt
+from utils.cache import analytics_cache
+from services.export_jobs import export_jobs
+from utils.task_snapshot import task_snapshots
+from middleware.query_stats import query_instrumentation
+from utils.search import task_search
+from services.ai_service import ai_enrichment
+from services.history_queue import history_writer
 
 def create_app():
     """Factory pattern for Flask app"""
@@ -26,6 +33,36 @@ def create_app():
     app.config['DEBUG'] = os.getenv('DEBUG', 'true').lower() == 'true'
     app.config['CORS_ORIGINS'] = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     app.config['API_PREFIX'] = os.getenv('API_PREFIX', '/api/v1')
+    app.config['ANALYTICS_CACHE_BACKEND'] = os.getenv('ANALYTICS_CACHE_BACKEND', 'memory')  # memory | sqlite
+    app.config['ANALYTICS_CACHE_TTL'] = int(os.getenv('ANALYTICS_CACHE_TTL', 60))
+    app.config['ANALYTICS_CACHE_MAX_ENTRIES'] = int(os.getenv('ANALYTICS_CACHE_MAX_ENTRIES', 1024))
+    if os.getenv('ANALYTICS_CACHE_PATH'):
+        app.config['ANALYTICS_CACHE_PATH'] = os.getenv('ANALYTICS_CACHE_PATH')
+    app.config['EXPORT_JOB_WORKERS'] = int(os.getenv('EXPORT_JOB_WORKERS', 2))
+    app.config['EXPORT_RETENTION_HOURS'] = int(os.getenv('EXPORT_RETENTION_HOURS', 24))
+    app.config['EXPORT_JOB_TIMEOUT_MINUTES'] = int(os.getenv('EXPORT_JOB_TIMEOUT_MINUTES', 30))
+    if os.getenv('EXPORT_STORAGE_DIR'):
+        app.config['EXPORT_STORAGE_DIR'] = os.getenv('EXPORT_STORAGE_DIR')
+    app.config['SLOW_REQUEST_QUERY_BUDGET'] = int(os.getenv('SLOW_REQUEST_QUERY_BUDGET', 30))
+    app.config['SLOW_REQUEST_DB_TIME_MS'] = float(os.getenv('SLOW_REQUEST_DB_TIME_MS', 250))
+    app.config['ANALYTICS_BUNDLE_WORKERS'] = int(os.getenv('ANALYTICS_BUNDLE_WORKERS', 4))
+    app.config['ANALYTICS_SNAPSHOT_ENABLED'] = os.getenv('ANALYTICS_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+    app.config['ANALYTICS_SNAPSHOT_TTL'] = int(os.getenv('ANALYTICS_SNAPSHOT_TTL', 300))
+    app.config['ANALYTICS_SNAPSHOT_MAX_USERS'] = int(os.getenv('ANALYTICS_SNAPSHOT_MAX_USERS', 64))
+    app.config['TASK_SEARCH_ENABLED'] = os.getenv('TASK_SEARCH_ENABLED', 'true').lower() == 'true'
+    app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
+    app.config['OPENAI_API_BASE'] = os.getenv('OPENAI_API_BASE')  # e.g. a local fake AI server
+    app.config['AI_MAX_CONCURRENCY'] = int(os.getenv('AI_MAX_CONCURRENCY', 8))
+    app.config['AI_REQUEST_TIMEOUT'] = float(os.getenv('AI_REQUEST_TIMEOUT', 10))
+    app.config['AI_BATCH_TIMEOUT'] = float(os.getenv('AI_BATCH_TIMEOUT', 15))
+    app.config['TASK_HISTORY_WRITE_BEHIND'] = os.getenv('TASK_HISTORY_WRITE_BEHIND', 'false').lower() == 'true'
+    app.config['TASK_HISTORY_FLUSH_INTERVAL_MS'] = int(os.getenv('TASK_HISTORY_FLUSH_INTERVAL_MS', 200))
+    app.config['TASK_HISTORY_FLUSH_MAX_EVENTS'] = int(os.getenv('TASK_HISTORY_FLUSH_MAX_EVENTS', 500))
+    app.config['TASK_HISTORY_QUEUE_MAX_EVENTS'] = int(os.getenv('TASK_HISTORY_QUEUE_MAX_EVENTS', 10000))
+    app.config['TASK_HISTORY_QUEUE_TIMEOUT'] = float(os.getenv('TASK_HISTORY_QUEUE_TIMEOUT', 5))
+    if os.getenv('TASK_HISTORY_SPOOL_DIR'):
+        app.config['TASK_HISTORY_SPOOL_DIR'] = os.getenv('TASK_HISTORY_SPOOL_DIR')
+    app.config['TASK_HISTORY_SPOOL_FSYNC'] = os.getenv('TASK_HISTORY_SPOOL_FSYNC', 'false').lower() == 'true'
     bcrypt.init_app(app)
 
     # --------------------------
@@ -35,6 +72,13 @@ def create_app():
     migrate.init_app(app, db)
     jwt.init_app(app)
     cors.init_app(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
+    analytics_cache.init_app(app)
+    export_jobs.init_app(app)
+    task_snapshots.init_app(app)
+    query_instrumentation.init_app(app)
+    task_search.init_app(app)
+    ai_enrichment.init_app(app)
+    history_writer.init_app(app)
 
     # --------------------------
     # Logging
@@ -69,6 +113,12 @@ def create_app():
         def test():
             return jsonify({'message': 'API is working (fallback)'})
 
+    # --------------------------
+    # CLI commands
+    # --------------------------
+    from commands import register_commands
+    register_commands(app)
+
     # --------------------------
     # Health check
     # --------------------------
@@ -0,0 +1,35 @@
+# benchmarks/ai_enrichment.py
+"""
+Bulk task creation with AI enrichment: one call at a time versus the
+shared enrichment pool, against the local fake AI server.
+
+    python -m benchmarks.ai_enrichment [task_count] [latency_seconds]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app, seed_user, measure
+from benchmarks.fake_ai import FakeAIServer
+from controllers.task_controller import bulk_create_tasks
+from extensions import db
+from models.user import User
+
+
+def main(task_count=50, latency=0.2):
+    app = make_app()
+    with FakeAIServer(latency) as server, app.test_request_context():
+        app.config.update(OPENAI_API_KEY='bench', OPENAI_API_BASE=server.base_url)
+        user = db.session.get(User, seed_user(0))
+        due = (datetime.utcnow() + timedelta(days=7)).isoformat()
+        tasks = [{'title': f'Task {i}', 'description': f'Import task {i}', 'due_date': due} for i in range(task_count)]
+
+        print(f'\nBulk create of {task_count} tasks, fake AI latency {latency * 1000:.0f} ms')
+        for concurrency in (1, 8, 16):
+            app.config['AI_MAX_CONCURRENCY'] = concurrency
+            app.extensions['ai_enrichment']['executor'] = None
+            measure(f'AI_MAX_CONCURRENCY={concurrency}', lambda: bulk_create_tasks(user, tasks), repeat=1)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, float(args[1]) if len(args) > 1 else 0.2)
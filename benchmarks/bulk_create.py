@@ -0,0 +1,35 @@
+# benchmarks/bulk_create.py
+"""
+Bulk task creation through the set-based ingestion path (POST /tasks/bulk
+without AI enrichment).
+
+    python -m benchmarks.bulk_create [batch_size ...]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app, seed_user, measure, CATEGORIES
+from controllers.task_controller import bulk_create_tasks
+from extensions import db
+from models.user import User
+
+
+def main(batch_sizes=(100, 1000, 5000)):
+    app = make_app()
+    with app.test_request_context():
+        user = db.session.get(User, seed_user(0))
+        due = (datetime.utcnow() + timedelta(days=7)).isoformat()
+
+        print(f'\nBulk create ({db.engine.dialect.name})')
+        for batch_size in batch_sizes:
+            tasks = [
+                {'title': f'Imported task {i}', 'description': f'Row {i} of the import', 'due_date': due,
+                 'category': CATEGORIES[i % len(CATEGORIES)], 'priority': i % 5 + 1, 'tags': ['import']}
+                for i in range(batch_size)
+            ]
+            elapsed = measure(f'{batch_size} tasks', lambda: bulk_create_tasks(user, tasks), repeat=3)
+            print(f'{"":<45} {batch_size / elapsed:>10.0f} tasks/s')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or (100, 1000, 5000))
@@ -0,0 +1,122 @@
+# benchmarks/common.py
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against BENCH_DATABASE_URL (an in-memory SQLite database by
+default) and must be started from the repository root, e.g.
+
+    python -m benchmarks.timeline
+"""
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event  # noqa: E402
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models.user import User  # noqa: E402
+from models.task import Task  # noqa: E402
+
+STATUSES = ['pending', 'in-progress', 'completed', 'blocked']
+CATEGORIES = ['Design', 'Engineering', 'Marketing', 'Finance', 'Research', 'Operations']
+# Title and description vocabulary, drawn with Zipf-like weights so later words are rare
+WORDS = [
+    'review', 'update', 'plan', 'report', 'meeting', 'design', 'budget', 'customer', 'release', 'draft',
+    'research', 'invoice', 'roadmap', 'migration', 'hiring', 'onboarding', 'audit', 'campaign', 'prototype',
+    'contract', 'forecast', 'security', 'workshop', 'analytics', 'partnership', 'interview', 'refactor',
+    'newsletter', 'compliance', 'localization', 'benchmark', 'retrospective', 'procurement', 'sustainability',
+    'accessibility', 'translation', 'warehouse', 'kubernetes', 'photosynthesis', 'zeppelin'
+]
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def random_text(word_count):
+    return ' '.join(random.choices(WORDS, WORD_WEIGHTS, k=word_count))
+
+
+def make_app():
+    """App with a fresh schema"""
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def seed_user(task_count, days=365, batch_size=5000):
+    """Create one user owning task_count random tasks spread over the last days; returns the user id"""
+    user = User(id=str(uuid.uuid4()), email=f'bench-{uuid.uuid4().hex[:8]}@example.com', name='Bench User')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    rows = []
+    for i in range(task_count):
+        created_at = now - timedelta(days=random.randint(0, days), minutes=random.randint(0, 1439))
+        status = random.choice(STATUSES)
+        started_at = created_at + timedelta(hours=random.randint(0, 48)) if status != 'pending' else None
+        rows.append({
+            'id': str(uuid.uuid4()),
+            'user_id': user.id,
+            'title': f'{random_text(3).capitalize()} {i}',
+            'description': random_text(12),
+            'category': random.choice(CATEGORIES),
+            'tags': [],
+            'priority': random.randint(1, 5),
+            'impact': random.randint(1, 10),
+            'complexity': random.randint(1, 5),
+            'estimated_hours': round(random.uniform(0.5, 20), 1),
+            'status': status,
+            'progress': 100 if status == 'completed' else random.randint(0, 90),
+            'due_date': created_at + timedelta(days=random.randint(1, 30)),
+            'created_at': created_at,
+            'updated_at': created_at,
+            'started_at': started_at,
+            'completed_at': started_at + timedelta(hours=random.randint(1, 72)) if status == 'completed' else None,
+            'ai_insights': {}
+        })
+        if len(rows) >= batch_size:
+            db.session.execute(Task.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+    return user.id
+
+
+@contextmanager
+def count_statements():
+    """Count statements executed on the current engine; yields a one-item list"""
+    counter = [0]
+
+    def _count(*args):
+        counter[0] += 1
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', _count)
+
+
+def measure(label, fn, repeat=5):
+    """Run fn repeat times and print the best wall time and statement count"""
+    best = float('inf')
+    statements = 0
+    for _ in range(repeat):
+        db.session.expire_all()
+        with count_statements() as counter:
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+        best = min(best, elapsed)
+        statements = counter[0]
+    print(f'{label:<45} {best * 1000:>10.2f} ms {statements:>6} statements')
+    return best
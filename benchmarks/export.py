@@ -0,0 +1,44 @@
+# benchmarks/export.py
+"""
+Peak Python memory of the legacy in-memory exports versus the streaming exports.
+
+    python -m benchmarks.export [task_count]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import make_app, seed_user
+from models.user import User
+from controllers.analytics_controller import export_analytics_data
+
+
+def run(label, app, user_id, format_type, **kwargs):
+    with app.test_request_context():
+        user = User.query.get(user_id)
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = export_analytics_data(user, format_type, **kwargs)
+        size = sum(len(chunk) for chunk in response.response)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f'{label:<30} {elapsed * 1000:>10.1f} ms  peak {peak / 2 ** 20:>8.1f} MiB  body {size / 2 ** 20:>7.1f} MiB')
+
+
+def main(task_count=100000):
+    app = make_app()
+    with app.app_context():
+        user_id = seed_user(task_count)
+
+    print(f'Export of {task_count} tasks')
+    run('csv: legacy JSON envelope', app, user_id, 'csv', envelope=True)
+    run('csv: streamed', app, user_id, 'csv')
+    run('json: legacy jsonify', app, user_id, 'json', envelope=True)
+    run('json: streamed', app, user_id, 'json')
+    run('ndjson: streamed', app, user_id, 'ndjson')
+    run('ndjson: streamed + gzip', app, user_id, 'ndjson', compression='gzip')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
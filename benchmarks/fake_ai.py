@@ -0,0 +1,126 @@
+# benchmarks/fake_ai.py
+"""
+A local stand-in for the OpenAI chat completions API.
+
+Answers POST .../chat/completions after a fixed latency (slow_latency
+for prompts containing SLOW_MARKER) with a canned task-insights JSON,
+and records how many requests it served and how many were in flight at
+once. Point OPENAI_API_BASE at its base_url to use it
+from tests, benchmarks or a dev server:
+
+    python -m benchmarks.fake_ai [--port 8765] [--latency 0.5]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INSIGHTS = {
+    'estimated_hours': 6.5,
+    'complexity_score': 4,
+    'recommended_approach': 'Split the work into milestones',
+    'potential_blockers': ['Unclear requirements', 'Dependencies on other teams'],
+    'suggested_resources': ['Project plan template', 'Team wiki'],
+    'confidence_score': 0.8
+}
+
+# Prompts containing this take slow_latency to answer
+SLOW_MARKER = '[slow]'
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 stalls bursts of connections
+
+
+class FakeAIServer:
+    """Threaded HTTP server imitating chat completions; usable as a context manager"""
+
+    def __init__(self, latency=0.2, port=0, slow_latency=None):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._server.server_port}/v1'
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                slow = fake.slow_latency is not None and SLOW_MARKER in request
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.slow_latency if slow else fake.latency)
+                    body = json.dumps({
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': 'gpt-3.5-turbo',
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': json.dumps(INSIGHTS)},
+                            'finish_reason': 'stop'
+                        }],
+                        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+                    }).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (timeout)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds per completion')
+    args = parser.parse_args()
+
+    server = FakeAIServer(args.latency, args.port)
+    print(f'Fake AI server on {server.base_url} ({args.latency}s latency); Ctrl+C to stop')
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/search.py
+"""
+Task search: ILIKE '%term%' scans versus the full-text index.
+
+Seeds one user with task_count tasks (titles and descriptions drawn from
+a Zipf-weighted vocabulary) and times the first page of GET /tasks?search=
+for a common word, a rare word, a word prefix and two words, with the
+full-text index and with the ILIKE fallback.
+
+    python -m benchmarks.search [task_count ...]
+"""
+import sys
+
+from benchmarks.common import make_app, seed_user, measure
+from controllers.task_controller import get_tasks
+from extensions import db
+from models.user import User
+
+SEARCHES = (
+    ('common word', 'review'),
+    ('rare word', 'zeppelin'),
+    ('prefix', 'photosyn'),
+    ('two words', 'budget audit'),
+)
+
+
+def main(task_counts=(300000,)):
+    app = make_app()
+    for task_count in task_counts:
+        with app.test_request_context():
+            user = db.session.get(User, seed_user(task_count))
+
+            print(f'\nFirst page of task search, one user with {task_count} tasks ({db.engine.dialect.name})')
+            for label, term in SEARCHES:
+                for enabled, method in ((False, 'ILIKE'), (True, 'full-text')):
+                    app.config['TASK_SEARCH_ENABLED'] = enabled
+                    sort_by = 'relevance' if enabled else 'priority'
+                    measure(f'{method}: {label} ({term!r})',
+                            lambda: get_tasks(user, {'search': term}, sort_by, limit=20))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or (300000,))
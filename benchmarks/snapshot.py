@@ -0,0 +1,59 @@
+# benchmarks/snapshot.py
+"""
+Analytics on SQL versus the vectorized task snapshot.
+
+Computes the dashboard, priority and impact distributions, the 30-day
+timeline, the yearly completion rate and the performance metrics for one
+user, first with the per-metric SQL queries and then from the snapshot.
+The snapshot is measured cold (load + compute, as after a write) and warm
+(cached, as between writes).
+
+    python -m benchmarks.snapshot [task_count ...]
+"""
+import sys
+
+from benchmarks.common import make_app, seed_user, measure
+from controllers.analytics_controller import (
+    get_dashboard_stats, get_priority_distribution, get_impact_analysis,
+    get_timeline_data, get_completion_rate, get_performance_metrics
+)
+from extensions import db
+from models.user import User
+from utils.rollups import rebuild_rollups
+from utils.task_snapshot import TaskSnapshot, task_snapshots
+
+
+def all_metrics(user):
+    for compute in (get_dashboard_stats, get_priority_distribution, get_impact_analysis,
+                    get_timeline_data, get_performance_metrics):
+        compute(user)
+    get_completion_rate(user, 'year')
+
+
+def cold_snapshot(user):
+    task_snapshots.clear()
+    all_metrics(user)
+
+
+def main(task_counts=(1000, 10000, 100000)):
+    app = make_app()
+    for task_count in task_counts:
+        with app.test_request_context():
+            user_id = seed_user(task_count)
+            rebuild_rollups(user_id)
+            db.session.commit()
+            user = db.session.get(User, user_id)
+
+            print(f'\nAll analytics metrics, one user with {task_count} tasks ({db.engine.dialect.name})')
+            app.config['ANALYTICS_SNAPSHOT_ENABLED'] = False
+            measure('SQL: per-metric queries', lambda: all_metrics(user))
+
+            app.config['ANALYTICS_SNAPSHOT_ENABLED'] = True
+            measure('snapshot: load only', lambda: TaskSnapshot.load(user_id))
+            measure('snapshot: cold (load + compute)', lambda: cold_snapshot(user))
+            all_metrics(user)
+            measure('snapshot: warm (compute only)', lambda: all_metrics(user))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or (1000, 10000, 100000))
@@ -0,0 +1,80 @@
+# benchmarks/timeline.py
+"""
+Timeline before/after: the per-day COUNT loop versus bucketed GROUP BY queries.
+
+    python -m benchmarks.timeline [task_count]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from benchmarks.common import make_app, seed_user, measure
+from extensions import db
+from models.analytics import UserDailyStats
+from models.task import Task
+from utils.rollups import rebuild_rollups
+from utils.time_buckets import time_series, fill_buckets
+
+
+def legacy_timeline(user_id):
+    """The original implementation: two COUNT queries per day"""
+    end_date = datetime.utcnow()
+    current = end_date - timedelta(days=30)
+    timeline = []
+    while current <= end_date:
+        next_day = current + timedelta(days=1)
+        created = Task.query.filter(
+            Task.user_id == user_id, Task.created_at >= current, Task.created_at < next_day
+        ).count()
+        completed = Task.query.filter(
+            Task.user_id == user_id, Task.status == 'completed',
+            Task.completed_at >= current, Task.completed_at < next_day
+        ).count()
+        timeline.append((current.date(), created, completed))
+        current = next_day
+    return timeline
+
+
+def bucketed_task_timeline(user_id):
+    """Bucketed GROUP BY directly over tasks.created_at and tasks.completed_at"""
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=30)
+    created = time_series(Task.created_at, {'n': func.count(Task.id)}, start_date, end_date,
+                          criteria=(Task.user_id == user_id,))
+    completed = time_series(Task.completed_at, {'n': func.count(Task.id)}, start_date, end_date,
+                            criteria=(Task.user_id == user_id, Task.status == 'completed'))
+    return [
+        (bucket, created.get(bucket, {}).get('n', 0), values.get('n', 0))
+        for bucket, values in fill_buckets(completed, start_date, end_date)
+    ]
+
+
+def rollup_timeline(user_id):
+    """What get_timeline_data runs: one bucketed query over the daily rollup"""
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=30)
+    series = time_series(
+        UserDailyStats.day,
+        {'created': func.sum(UserDailyStats.tasks_created), 'completed': func.sum(UserDailyStats.tasks_completed)},
+        start_date.date(), end_date.date(),
+        criteria=(UserDailyStats.user_id == user_id,)
+    )
+    return fill_buckets(series, start_date, end_date)
+
+
+def main(task_count=50000):
+    app = make_app()
+    with app.app_context():
+        user_id = seed_user(task_count)
+        rebuild_rollups(user_id)
+        db.session.commit()
+
+        print(f'Timeline over 31 days, one user with {task_count} tasks ({db.engine.dialect.name})')
+        measure('before: per-day COUNT loop', lambda: legacy_timeline(user_id))
+        measure('after: bucketed GROUP BY on tasks', lambda: bucketed_task_timeline(user_id))
+        measure('after: bucketed GROUP BY on daily rollup', lambda: rollup_timeline(user_id))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
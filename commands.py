@@ -0,0 +1,70 @@
+# commands.py
+"""
+Maintenance commands, available as `flask <command>` once the app is loaded.
+"""
+import click
+from extensions import db
+from utils.cache import analytics_cache
+from utils.task_snapshot import task_snapshots
+
+
+def register_commands(app):
+    """Attach maintenance commands to the app CLI"""
+
+    @app.cli.command('rebuild-rollups')
+    @click.option('--user-id', default=None, help='Only rebuild rollups for this user')
+    def rebuild_rollups_command(user_id):
+        """Recompute the daily analytics rollup from the tasks table"""
+        from utils.rollups import rebuild_rollups
+
+        rows = rebuild_rollups(user_id)
+        db.session.commit()
+        analytics_cache.clear()
+        task_snapshots.clear()
+        click.echo(f'✅ Rebuilt {rows} rollup rows')
+
+    @app.cli.command('rebuild-sketches')
+    @click.option('--user-id', default=None, help='Only rebuild sketches for this user')
+    def rebuild_sketches_command(user_id):
+        """Recompute completion-time sketches exactly from the tasks table"""
+        from utils.completion_sketches import rebuild_sketches
+
+        rows = rebuild_sketches(user_id)
+        db.session.commit()
+        analytics_cache.clear()
+        click.echo(f'✅ Rebuilt {rows} completion sketches')
+
+    @app.cli.command('rebuild-tags')
+    @click.option('--user-id', default=None, help='Only rebuild tags for this user')
+    def rebuild_tags_command(user_id):
+        """Recompute the task_tags index from the tasks' tag lists"""
+        from utils.task_tags import rebuild_task_tags
+
+        rows = rebuild_task_tags(user_id)
+        db.session.commit()
+        click.echo(f'✅ Rebuilt {rows} task tags')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Create the full-text task search index if missing and refill it"""
+        from utils.search import task_search
+
+        task_search.rebuild()
+        click.echo('✅ Rebuilt the task search index')
+
+    @app.cli.command('compact-history')
+    def compact_history_command():
+        """Rewrite task history in the versioned delta format"""
+        from utils.task_history import compact_history
+
+        rows = compact_history(db.session.connection())
+        db.session.commit()
+        click.echo(f'✅ Compacted {rows} history rows')
+
+    @app.cli.command('sweep-exports')
+    def sweep_exports_command():
+        """Expire export jobs past their retention period or timeout, deleting their files"""
+        from services.export_jobs import export_jobs
+
+        expired = export_jobs.sweep()
+        click.echo(f'✅ Expired {expired} export jobs')
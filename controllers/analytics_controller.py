@@ -1,85 +1,87 @@
 # controllers/analytics_controller.py
-from flask import jsonify, request
+from flask import jsonify, request, send_file
 from models.task import Task
 from models.user import User
 from extensions import db
 from utils.ai_helper import AIHelper
+from utils.aggregates import (
+    task_aggregates, risk_metrics, optimization_metrics, is_overdue, task_titles
+)
+from utils.time_buckets import GRANULARITIES, time_series, fill_buckets, bucket_label, regroup
+from utils.analytics_sources import AnalyticsSources
+from utils.completion_sketches import merged_sketch, percentiles
+from utils.task_snapshot import task_snapshots
+from models.analytics import UserDailyStats
+from models.export_job import ExportJob
+from services.export_jobs import export_jobs
+from utils.export import (
+    CSV_COLUMNS, csv_task_row, export_filename, iter_csv,
+    iter_ndjson, iter_json_document, task_summary, streaming_response
+)
 from datetime import datetime, timedelta
-from sqlalchemy import func, extract
+from sqlalchemy import func, extract, and_
 import json
 import csv
+import os
 from io import StringIO
 
 ai_helper = AIHelper()
 
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'pdf': 'application/pdf'
+}
+
+
+def _snapshot(user):
+    """The user's task snapshot when the vectorized engine is enabled, else None"""
+    return task_snapshots.get(user.id) if task_snapshots.enabled else None
+
+
+def _dashboard_panel(sources):
+    """Dashboard statistics"""
+    # All counters, averages and the priority histogram in one statement
+    stats = sources.get('task_stats')
+
+    total_tasks = int(stats['total_tasks'])
+    completed_tasks = int(stats['completed_tasks'])
+    avg_completion_time = stats['avg_completion_time']
+    avg_impact = stats['avg_impact']
+
+    # Calculate productivity score (0-100)
+    if total_tasks > 0:
+        completion_rate = (completed_tasks / total_tasks) * 100
+        on_time_rate = 100  # Simplified for now
+        productivity_score = (completion_rate * 0.6) + (on_time_rate * 0.4)
+    else:
+        productivity_score = 0
+
+    priority_counts = {
+        f'priority_{priority}': int(stats[f'priority_{priority}'])
+        for priority in range(1, 6)
+    }
+
+    return {
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'pending_tasks': int(stats['pending_tasks']),
+        'in_progress_tasks': int(stats['in_progress_tasks']),
+        'overdue_tasks': int(stats['overdue_tasks']),
+        'avg_completion_time': round(avg_completion_time, 2),
+        'productivity_score': round(productivity_score, 2),
+        'avg_impact': round(avg_impact, 2),
+        'priority_distribution': priority_counts,
+        'completion_rate': round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
+    }
+
 
 def get_dashboard_stats(user):
     """Get dashboard statistics"""
     try:
-        # Get task counts by status
-        total_tasks = Task.query.filter_by(user_id=user.id).count()
-        completed_tasks = Task.query.filter_by(user_id=user.id, status='completed').count()
-        pending_tasks = Task.query.filter_by(user_id=user.id, status='pending').count()
-        in_progress_tasks = Task.query.filter_by(user_id=user.id, status='in-progress').count()
-
-        # Get overdue tasks
-        overdue_tasks = Task.query.filter(
-            Task.user_id == user.id,
-            Task.status != 'completed',
-            Task.due_date < datetime.utcnow()
-        ).count()
-
-        # Calculate average completion time for completed tasks
-        completed_tasks_with_dates = Task.query.filter_by(
-            user_id=user.id,
-            status='completed'
-        ).filter(Task.completed_at.isnot(None), Task.started_at.isnot(None)).all()
-
-        avg_completion_time = 0
-        if completed_tasks_with_dates:
-            total_hours = sum([
-                (task.completed_at - task.started_at).total_seconds() / 3600
-                for task in completed_tasks_with_dates
-                if task.completed_at and task.started_at
-            ])
-            avg_completion_time = total_hours / len(completed_tasks_with_dates)
-
-        # Calculate productivity score (0-100)
-        if total_tasks > 0:
-            completion_rate = (completed_tasks / total_tasks) * 100
-            on_time_rate = 100  # Simplified for now
-            productivity_score = (completion_rate * 0.6) + (on_time_rate * 0.4)
-        else:
-            productivity_score = 0
-
-        # Get average impact
-        avg_impact = db.session.query(func.avg(Task.impact)).filter_by(
-            user_id=user.id
-        ).scalar() or 0
-
-        # Get priority distribution
-        priority_counts = {}
-        for priority in range(1, 6):
-            count = Task.query.filter_by(
-                user_id=user.id,
-                priority=priority
-            ).count()
-            priority_counts[f'priority_{priority}'] = count
-
         return jsonify({
             'success': True,
-            'data': {
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'pending_tasks': pending_tasks,
-                'in_progress_tasks': in_progress_tasks,
-                'overdue_tasks': overdue_tasks,
-                'avg_completion_time': round(avg_completion_time, 2),
-                'productivity_score': round(productivity_score, 2),
-                'avg_impact': round(avg_impact, 2),
-                'priority_distribution': priority_counts,
-                'completion_rate': round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
-            }
+            'data': _dashboard_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -108,53 +110,42 @@ def get_completion_rate(user, period='week'):
             start_date = end_date - timedelta(days=7)
             group_by = 'day'
 
-        # Query for completed tasks in period
-        completed_tasks = Task.query.filter(
-            Task.user_id == user.id,
-            Task.status == 'completed',
-            Task.completed_at.between(start_date, end_date)
-        ).all()
+        # Completions and impact per day/month, grouped in SQL over the daily rollup
+        snapshot = _snapshot(user)
+        if snapshot is not None:
+            series = snapshot.time_series(start_date.date(), end_date.date(), group_by)
+        else:
+            series = time_series(
+                UserDailyStats.day,
+                {
+                    'completed': func.sum(UserDailyStats.tasks_completed),
+                    'impact': func.sum(UserDailyStats.impact_completed),
+                    'created': func.sum(UserDailyStats.tasks_created)
+                },
+                start_date.date(),
+                end_date.date(),
+                group_by,
+                criteria=(UserDailyStats.user_id == user.id,)
+            )
 
-        # Create timeline data
+        # Create timeline data, one entry per calendar day/month
         timeline_data = []
-        current = start_date
-
-        while current <= end_date:
-            if group_by == 'day':
-                date_key = current.strftime('%Y-%m-%d')
-                next_date = current + timedelta(days=1)
-            else:  # month
-                date_key = current.strftime('%Y-%m')
-                next_date = current + timedelta(days=30)
-
-            # Count tasks completed on this day/month
-            tasks_on_date = [
-                task for task in completed_tasks
-                if task.completed_at and (
-                        (group_by == 'day' and task.completed_at.date() == current.date()) or
-                        (group_by == 'month' and task.completed_at.strftime('%Y-%m') == date_key)
-                )
-            ]
+        for bucket, values in fill_buckets(series, start_date, end_date, group_by):
+            completed = int(values.get('completed', 0))
+            impact = values.get('impact', 0)
 
             timeline_data.append({
-                'date': date_key,
-                'completed_tasks': len(tasks_on_date),
-                'avg_impact': round(
-                    sum(task.impact for task in tasks_on_date) / len(tasks_on_date)
-                    if tasks_on_date else 0, 2
-                )
+                'date': bucket_label(bucket, group_by),
+                'completed_tasks': completed,
+                'avg_impact': round(impact / completed if completed else 0, 2)
             })
 
-            current = next_date
-
         # Calculate completion rate
-        total_tasks_in_period = Task.query.filter(
-            Task.user_id == user.id,
-            Task.created_at.between(start_date, end_date)
-        ).count()
+        total_completed = sum(item['completed_tasks'] for item in timeline_data)
+        total_tasks_in_period = sum(int(values.get('created', 0)) for values in series.values())
 
         completion_rate = round(
-            (len(completed_tasks) / total_tasks_in_period * 100)
+            (total_completed / total_tasks_in_period * 100)
             if total_tasks_in_period > 0 else 0, 2
         )
 
@@ -163,7 +154,7 @@ def get_completion_rate(user, period='week'):
             'data': {
                 'timeline': timeline_data,
                 'period': period,
-                'total_completed': len(completed_tasks),
+                'total_completed': total_completed,
                 'total_created': total_tasks_in_period,
                 'completion_rate': completion_rate,
                 'start_date': start_date.isoformat(),
@@ -179,43 +170,40 @@ def get_completion_rate(user, period='week'):
         }), 500
 
 
+def _category_panel(sources):
+    """Breakdown of tasks by category"""
+    total_tasks = int(sources.get('task_stats')['total_tasks'])
+    sketches = sources.get('completion_sketches')
+
+    categories = []
+    counts = []
+    percentages = []
+    avg_impacts = []
+    completion_times = []
+
+    for category, count, avg_impact, avg_priority in sources.get('category_counts'):
+        categories.append(category)
+        counts.append(count)
+        percentages.append(round((count / total_tasks * 100) if total_tasks > 0 else 0, 2))
+        avg_impacts.append(round(avg_impact or 0, 2))
+        completion_times.append(percentiles(sketches.get(category)))
+
+    return {
+        'categories': categories,
+        'counts': counts,
+        'percentages': percentages,
+        'avg_impacts': avg_impacts,
+        'completion_time_percentiles': completion_times,
+        'total_tasks': total_tasks
+    }
+
+
 def get_category_breakdown(user):
     """Get breakdown of tasks by category"""
     try:
-        # Get all tasks grouped by category
-        tasks_by_category = db.session.query(
-            Task.category,
-            func.count(Task.id).label('count'),
-            func.avg(Task.impact).label('avg_impact'),
-            func.avg(Task.priority).label('avg_priority')
-        ).filter_by(
-            user_id=user.id
-        ).group_by(
-            Task.category
-        ).all()
-
-        total_tasks = Task.query.filter_by(user_id=user.id).count()
-
-        categories = []
-        counts = []
-        percentages = []
-        avg_impacts = []
-
-        for category, count, avg_impact, avg_priority in tasks_by_category:
-            categories.append(category)
-            counts.append(count)
-            percentages.append(round((count / total_tasks * 100) if total_tasks > 0 else 0, 2))
-            avg_impacts.append(round(avg_impact or 0, 2))
-
         return jsonify({
             'success': True,
-            'data': {
-                'categories': categories,
-                'counts': counts,
-                'percentages': percentages,
-                'avg_impacts': avg_impacts,
-                'total_tasks': total_tasks
-            }
+            'data': _category_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -226,54 +214,27 @@ def get_category_breakdown(user):
         }), 500
 
 
+def _impact_panel(sources):
+    """Impact distribution, high impact tasks and impact trend"""
+    impact_levels = {str(impact): count for impact, count in sources.get('impact_counts').items()}
+    recent_avg_impact = sources.get('recent_avg_impact')
+    overall_avg_impact = sources.get('task_stats')['avg_impact']
+
+    return {
+        'impact_distribution': impact_levels,
+        'high_impact_tasks': sources.get('high_impact_tasks'),
+        'recent_avg_impact': recent_avg_impact,
+        'overall_avg_impact': round(overall_avg_impact, 2),
+        'impact_trend': 'increasing' if recent_avg_impact > overall_avg_impact else 'decreasing' if recent_avg_impact < overall_avg_impact else 'stable'
+    }
+
+
 def get_impact_analysis(user):
     """Get impact analysis of tasks"""
     try:
-        # Get tasks grouped by impact level
-        impact_levels = {}
-        for impact in range(1, 11):
-            count = Task.query.filter_by(user_id=user.id, impact=impact).count()
-            impact_levels[str(impact)] = count
-
-        # Get high impact tasks (impact >= 8)
-        high_impact_tasks = Task.query.filter(
-            Task.user_id == user.id,
-            Task.impact >= 8
-        ).order_by(Task.priority).limit(10).all()
-
-        # Calculate impact trends
-        recent_tasks = Task.query.filter_by(
-            user_id=user.id
-        ).order_by(Task.created_at.desc()).limit(20).all()
-
-        recent_avg_impact = round(
-            sum(task.impact for task in recent_tasks) / len(recent_tasks)
-            if recent_tasks else 0, 2
-        )
-
-        # Overall average impact
-        overall_avg_impact = db.session.query(
-            func.avg(Task.impact)
-        ).filter_by(user_id=user.id).scalar() or 0
-
         return jsonify({
             'success': True,
-            'data': {
-                'impact_distribution': impact_levels,
-                'high_impact_tasks': [
-                    {
-                        'id': task.id,
-                        'title': task.title,
-                        'impact': task.impact,
-                        'priority': task.priority,
-                        'status': task.status
-                    }
-                    for task in high_impact_tasks
-                ],
-                'recent_avg_impact': recent_avg_impact,
-                'overall_avg_impact': round(overall_avg_impact, 2),
-                'impact_trend': 'increasing' if recent_avg_impact > overall_avg_impact else 'decreasing' if recent_avg_impact < overall_avg_impact else 'stable'
-            }
+            'data': _impact_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -284,34 +245,22 @@ def get_impact_analysis(user):
         }), 500
 
 
+def _priority_panel(sources):
+    """Distribution of tasks by priority level"""
+    priority_data = sources.get('priority_stats')
+
+    return {
+        'priorities': priority_data,
+        'total_tasks': sum(item['count'] for item in priority_data)
+    }
+
+
 def get_priority_distribution(user):
     """Get distribution of tasks by priority level"""
     try:
-        priority_data = []
-        for priority in range(1, 6):
-            tasks = Task.query.filter_by(user_id=user.id, priority=priority).all()
-
-            if tasks:
-                avg_impact = sum(task.impact for task in tasks) / len(tasks)
-                completion_rate = sum(1 for task in tasks if task.status == 'completed') / len(tasks) * 100
-            else:
-                avg_impact = 0
-                completion_rate = 0
-
-            priority_data.append({
-                'priority_level': priority,
-                'count': len(tasks),
-                'avg_impact': round(avg_impact, 2),
-                'completion_rate': round(completion_rate, 2),
-                'avg_completion_time': 0  # Simplified for now
-            })
-
         return jsonify({
             'success': True,
-            'data': {
-                'priorities': priority_data,
-                'total_tasks': sum(item['count'] for item in priority_data)
-            }
+            'data': _priority_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -322,54 +271,47 @@ def get_priority_distribution(user):
         }), 500
 
 
-def get_timeline_data(user):
-    """Get timeline data for task completion"""
-    try:
-        # Get last 30 days of data
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=30)
-
-        timeline = []
-        current = start_date
-
-        while current <= end_date:
-            next_day = current + timedelta(days=1)
-
-            # Tasks created on this day
-            created = Task.query.filter(
-                Task.user_id == user.id,
-                Task.created_at >= current,
-                Task.created_at < next_day
-            ).count()
-
-            # Tasks completed on this day
-            completed = Task.query.filter(
-                Task.user_id == user.id,
-                Task.status == 'completed',
-                Task.completed_at >= current,
-                Task.completed_at < next_day
-            ).count()
-
-            timeline.append({
-                'date': current.strftime('%Y-%m-%d'),
-                'created': created,
-                'completed': completed,
-                'net_change': completed - created
-            })
+def _timeline_panel(sources, granularity='day'):
+    """Created and completed tasks over the last 30 days"""
+    if granularity not in GRANULARITIES:
+        granularity = 'day'
 
-            current = next_day
+    # Last 30 days of the daily rollup, summed into the requested buckets
+    end_date = sources.now
+    start_date = end_date - timedelta(days=30)
+    series = regroup(sources.get('recent_days'), granularity)
 
+    timeline = []
+    for bucket, values in fill_buckets(series, start_date, end_date, granularity):
+        created = int(values.get('created', 0))
+        completed = int(values.get('completed', 0))
+
+        timeline.append({
+            'date': bucket_label(bucket, granularity),
+            'created': created,
+            'completed': completed,
+            'net_change': completed - created
+        })
+
+    total_completed = sum(bucket['completed'] for bucket in timeline)
+    days = (end_date.date() - start_date.date()).days + 1
+
+    return {
+        'timeline': timeline,
+        'period': '30_days',
+        'granularity': granularity,
+        'total_created': sum(bucket['created'] for bucket in timeline),
+        'total_completed': total_completed,
+        'avg_daily_completed': round(total_completed / days, 2)
+    }
+
+
+def get_timeline_data(user, granularity='day'):
+    """Get timeline data for task completion"""
+    try:
         return jsonify({
             'success': True,
-            'data': {
-                'timeline': timeline,
-                'period': '30_days',
-                'total_created': sum(day['created'] for day in timeline),
-                'total_completed': sum(day['completed'] for day in timeline),
-                'avg_daily_completed': round(
-                    sum(day['completed'] for day in timeline) / len(timeline), 2
-                ) if timeline else 0
-            }
+            'data': _timeline_panel(AnalyticsSources(user.id), granularity)
         })
 
     except Exception as e:
@@ -380,66 +322,56 @@ def get_timeline_data(user):
         }), 500
 
 
+def _performance_panel(sources):
+    """Performance metrics and trends"""
+    # Calculate various performance metrics
+    totals = sources.get('rollup_summary')['totals']
+    total_tasks = int(totals['tasks_created'])
+    completed_tasks = int(totals['tasks_completed'])
+
+    # Efficiency metrics
+    if total_tasks > 0:
+        completion_rate = (completed_tasks / total_tasks) * 100
+    else:
+        completion_rate = 0
+
+    # Average time to completion (for completed tasks)
+    avg_time_to_completion = 0
+    if totals['timed_completions']:
+        avg_time_to_completion = float(totals['completion_hours']) / totals['timed_completions']
+
+    # Priority accuracy (how many high priority tasks completed)
+    high_priority_completed = totals['high_priority_completed']
+    high_priority_total = totals['high_priority_created']
+
+    priority_accuracy = (high_priority_completed / high_priority_total * 100) if high_priority_total > 0 else 0
+
+    # Impact achievement
+    total_impact = totals['impact_completed']
+
+    # Completion time distribution, merged from the per-category sketches
+    completion_time = percentiles(merged_sketch(sources.get('completion_sketches').values()))
+
+    return {
+        'completion_rate': round(completion_rate, 2),
+        'avg_time_to_completion': round(avg_time_to_completion, 2),
+        'completion_time_percentiles': completion_time,
+        'priority_accuracy': round(priority_accuracy, 2),
+        'total_impact_achieved': round(total_impact, 2),
+        'efficiency_score': round(
+            completion_rate * 0.4 + priority_accuracy * 0.3 + (100 - min(avg_time_to_completion, 100)) * 0.3,
+            2),
+        'tasks_completed': completed_tasks,
+        'tasks_pending': total_tasks - completed_tasks
+    }
+
+
 def get_performance_metrics(user):
     """Get performance metrics and trends"""
     try:
-        # Calculate various performance metrics
-        total_tasks = Task.query.filter_by(user_id=user.id).count()
-        completed_tasks = Task.query.filter_by(user_id=user.id, status='completed').count()
-
-        # Efficiency metrics
-        if total_tasks > 0:
-            completion_rate = (completed_tasks / total_tasks) * 100
-        else:
-            completion_rate = 0
-
-        # Average time to completion (for completed tasks)
-        completed_with_dates = Task.query.filter_by(
-            user_id=user.id,
-            status='completed'
-        ).filter(Task.completed_at.isnot(None), Task.started_at.isnot(None)).all()
-
-        avg_time_to_completion = 0
-        if completed_with_dates:
-            total_time = sum([
-                (task.completed_at - task.started_at).total_seconds() / 3600
-                for task in completed_with_dates
-            ])
-            avg_time_to_completion = total_time / len(completed_with_dates)
-
-        # Priority accuracy (how many high priority tasks completed)
-        high_priority_completed = Task.query.filter_by(
-            user_id=user.id,
-            status='completed',
-            priority=1
-        ).count()
-
-        high_priority_total = Task.query.filter_by(
-            user_id=user.id,
-            priority=1
-        ).count()
-
-        priority_accuracy = (high_priority_completed / high_priority_total * 100) if high_priority_total > 0 else 0
-
-        # Impact achievement
-        total_impact = db.session.query(func.sum(Task.impact)).filter_by(
-            user_id=user.id,
-            status='completed'
-        ).scalar() or 0
-
         return jsonify({
             'success': True,
-            'data': {
-                'completion_rate': round(completion_rate, 2),
-                'avg_time_to_completion': round(avg_time_to_completion, 2),
-                'priority_accuracy': round(priority_accuracy, 2),
-                'total_impact_achieved': round(total_impact, 2),
-                'efficiency_score': round(
-                    completion_rate * 0.4 + priority_accuracy * 0.3 + (100 - min(avg_time_to_completion, 100)) * 0.3,
-                    2),
-                'tasks_completed': completed_tasks,
-                'tasks_pending': total_tasks - completed_tasks
-            }
+            'data': _performance_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -450,78 +382,78 @@ def get_performance_metrics(user):
         }), 500
 
 
+def _productivity_recommendations(score, completion_rate, on_time_rate):
+    """Get productivity improvement recommendations"""
+    recommendations = []
+
+    if completion_rate < 60:
+        recommendations.append("Focus on completing more tasks - aim for at least 60% completion rate")
+
+    if on_time_rate < 70:
+        recommendations.append("Improve time management - try setting realistic deadlines")
+
+    if score < 60:
+        recommendations.append("Break larger tasks into smaller, manageable subtasks")
+        recommendations.append("Use the priority system to focus on high-impact tasks first")
+
+    return recommendations
+
+
+def _productivity_panel(sources):
+    """Productivity score and its components"""
+    # Totals and the last 7 days of completions come from one rollup statement
+    summary = sources.get('rollup_summary')
+    totals = summary['totals']
+    total_tasks = int(totals['tasks_created'])
+    completed_tasks = int(totals['tasks_completed'])
+
+    # Calculate completion rate
+    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+
+    # Calculate on-time completion rate
+    on_time_tasks = totals['tasks_on_time']
+
+    on_time_rate = (on_time_tasks / completed_tasks * 100) if completed_tasks > 0 else 0
+
+    # Calculate impact efficiency
+    total_impact = totals['impact_created']
+    completed_impact = totals['impact_completed']
+
+    impact_efficiency = (completed_impact / total_impact * 100) if total_impact > 0 else 0
+
+    # Calculate consistency (tasks completed per day over last 7 days)
+    daily_completions = summary['daily_completions']
+
+    consistency_score = (sum(1 for d in daily_completions if d > 0) / 7 * 100) if daily_completions else 0
+
+    # Calculate overall productivity score (0-100)
+    productivity_score = (
+            completion_rate * 0.3 +
+            on_time_rate * 0.25 +
+            impact_efficiency * 0.25 +
+            consistency_score * 0.2
+    )
+
+    return {
+        'productivity_score': round(productivity_score, 2),
+        'components': {
+            'completion_rate': round(completion_rate, 2),
+            'on_time_rate': round(on_time_rate, 2),
+            'impact_efficiency': round(impact_efficiency, 2),
+            'consistency_score': round(consistency_score, 2)
+        },
+        'daily_completions': daily_completions,
+        'level': 'High' if productivity_score >= 80 else 'Medium' if productivity_score >= 60 else 'Low',
+        'recommendations': _productivity_recommendations(productivity_score, completion_rate, on_time_rate)
+    }
+
+
 def get_productivity_score(user):
     """Get user productivity score"""
     try:
-        # Get various metrics
-        total_tasks = Task.query.filter_by(user_id=user.id).count()
-        completed_tasks = Task.query.filter_by(user_id=user.id, status='completed').count()
-
-        # Calculate completion rate
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-
-        # Calculate on-time completion rate
-        on_time_tasks = Task.query.filter(
-            Task.user_id == user.id,
-            Task.status == 'completed',
-            Task.completed_at <= Task.due_date
-        ).count()
-
-        on_time_rate = (on_time_tasks / completed_tasks * 100) if completed_tasks > 0 else 0
-
-        # Calculate impact efficiency
-        total_impact = db.session.query(func.sum(Task.impact)).filter_by(
-            user_id=user.id
-        ).scalar() or 0
-
-        completed_impact = db.session.query(func.sum(Task.impact)).filter_by(
-            user_id=user.id,
-            status='completed'
-        ).scalar() or 0
-
-        impact_efficiency = (completed_impact / total_impact * 100) if total_impact > 0 else 0
-
-        # Calculate consistency (tasks completed per day over last 7 days)
-        last_week = datetime.utcnow() - timedelta(days=7)
-        daily_completions = []
-
-        for i in range(7):
-            day_start = last_week + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-
-            completions = Task.query.filter(
-                Task.user_id == user.id,
-                Task.status == 'completed',
-                Task.completed_at >= day_start,
-                Task.completed_at < day_end
-            ).count()
-
-            daily_completions.append(completions)
-
-        consistency_score = (sum(1 for d in daily_completions if d > 0) / 7 * 100) if daily_completions else 0
-
-        # Calculate overall productivity score (0-100)
-        productivity_score = (
-                completion_rate * 0.3 +
-                on_time_rate * 0.25 +
-                impact_efficiency * 0.25 +
-                consistency_score * 0.2
-        )
-
         return jsonify({
             'success': True,
-            'data': {
-                'productivity_score': round(productivity_score, 2),
-                'components': {
-                    'completion_rate': round(completion_rate, 2),
-                    'on_time_rate': round(on_time_rate, 2),
-                    'impact_efficiency': round(impact_efficiency, 2),
-                    'consistency_score': round(consistency_score, 2)
-                },
-                'daily_completions': daily_completions,
-                'level': 'High' if productivity_score >= 80 else 'Medium' if productivity_score >= 60 else 'Low',
-                'recommendations': self._get_productivity_recommendations(productivity_score, completion_rate, on_time_rate)
-            }
+            'data': _productivity_panel(AnalyticsSources(user.id))
         })
 
     except Exception as e:
@@ -531,21 +463,55 @@ def get_productivity_score(user):
             'error': str(e)
         }), 500
 
-    def _get_productivity_recommendations(self, score, completion_rate, on_time_rate):
-        """Get productivity improvement recommendations"""
-        recommendations = []
 
-        if completion_rate < 60:
-            recommendations.append("Focus on completing more tasks - aim for at least 60% completion rate")
+# Bundle panel name -> the sources its builder reads
+PANEL_SOURCES = {
+    'dashboard': ('task_stats',),
+    'category-breakdown': ('category_counts', 'task_stats', 'completion_sketches'),
+    'impact-analysis': ('impact_counts', 'high_impact_tasks', 'recent_avg_impact', 'task_stats'),
+    'priority-distribution': ('priority_stats',),
+    'timeline': ('recent_days',),
+    'performance': ('rollup_summary', 'completion_sketches'),
+    'productivity': ('rollup_summary',),
+}
+
 
-        if on_time_rate < 70:
-            recommendations.append("Improve time management - try setting realistic deadlines")
+def get_analytics_bundle(user, panels=None, granularity='day'):
+    """Get several analytics panels from one shared set of queries"""
+    try:
+        names = [name.strip() for name in panels.split(',') if name.strip()] if panels else list(PANEL_SOURCES)
+        unknown = [name for name in names if name not in PANEL_SOURCES]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'message': f'Unknown analytics panels: {", ".join(unknown)}',
+                'available_panels': list(PANEL_SOURCES)
+            }), 400
+
+        builders = {
+            'dashboard': _dashboard_panel,
+            'category-breakdown': _category_panel,
+            'impact-analysis': _impact_panel,
+            'priority-distribution': _priority_panel,
+            'timeline': lambda sources: _timeline_panel(sources, granularity),
+            'performance': _performance_panel,
+            'productivity': _productivity_panel,
+        }
+
+        sources = AnalyticsSources(user.id)
+        sources.prefetch(source for name in names for source in PANEL_SOURCES[name])
 
-        if score < 60:
-            recommendations.append("Break larger tasks into smaller, manageable subtasks")
-            recommendations.append("Use the priority system to focus on high-impact tasks first")
+        return jsonify({
+            'success': True,
+            'data': {name: builders[name](sources) for name in names}
+        })
 
-        return recommendations
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get analytics bundle',
+            'error': str(e)
+        }), 500
 
 
 def get_ai_recommendations(user):
@@ -601,30 +567,26 @@ def get_ai_recommendations(user):
 def get_optimization_tips(user):
     """Get optimization tips"""
     try:
-        tasks = Task.query.filter_by(user_id=user.id).all()
+        counts = task_aggregates(user.id, optimization_metrics())
 
         tips = []
 
         # Analyze task patterns
-        if tasks:
+        if counts['total_tasks']:
             # Check for overdue tasks
-            overdue_count = sum(1 for t in tasks if t.is_overdue)
+            overdue_count = int(counts['overdue_tasks'])
             if overdue_count > 0:
                 tips.append(f"You have {overdue_count} overdue tasks. Consider rescheduling or breaking them down.")
 
             # Check for task clustering
-            categories = {}
-            for task in tasks:
-                categories[task.category] = categories.get(task.category, 0) + 1
-
-            if len(categories) > 5:
+            if counts['categories'] > 5:
                 tips.append("You have tasks in many different categories. Consider consolidating similar tasks.")
 
             # Check for estimated vs actual (simplified)
-            long_tasks = [t for t in tasks if t.estimated_hours > 8]
+            long_tasks = int(counts['long_tasks'])
             if long_tasks:
                 tips.append(
-                    f"You have {len(long_tasks)} tasks estimated over 8 hours. Break them into smaller subtasks.")
+                    f"You have {long_tasks} tasks estimated over 8 hours. Break them into smaller subtasks.")
 
         # Add general tips
         tips.extend([
@@ -653,42 +615,48 @@ def get_optimization_tips(user):
 def get_risk_analysis(user):
     """Get risk analysis"""
     try:
-        tasks = Task.query.filter_by(user_id=user.id).all()
+        now = datetime.utcnow()
+        counts = task_aggregates(user.id, risk_metrics(now))
 
         risks = []
 
-        if tasks:
-            # Overdue risk
-            overdue_tasks = [t for t in tasks if t.is_overdue]
-            if overdue_tasks:
-                risks.append({
-                    'type': 'overdue',
-                    'severity': 'high',
-                    'message': f'{len(overdue_tasks)} tasks are overdue',
-                    'tasks': [t.title for t in overdue_tasks[:3]]
-                })
-
-            # High priority pending risk
-            high_priority_pending = [t for t in tasks if t.priority == 1 and t.status == 'pending']
-            if high_priority_pending:
-                risks.append({
-                    'type': 'high_priority_pending',
-                    'severity': 'critical',
-                    'message': f'{len(high_priority_pending)} critical priority tasks pending',
-                    'tasks': [t.title for t in high_priority_pending[:3]]
-                })
-
-            # Upcoming deadline risk
-            next_week = datetime.utcnow() + timedelta(days=7)
-            upcoming_deadlines = [t for t in tasks if
-                                  t.due_date and t.due_date <= next_week and t.status != 'completed']
-            if upcoming_deadlines:
-                risks.append({
-                    'type': 'upcoming_deadlines',
-                    'severity': 'medium',
-                    'message': f'{len(upcoming_deadlines)} tasks due within 7 days',
-                    'tasks': [t.title for t in upcoming_deadlines[:3]]
-                })
+        # Overdue risk
+        overdue_count = int(counts['overdue'])
+        if overdue_count:
+            risks.append({
+                'type': 'overdue',
+                'severity': 'high',
+                'message': f'{overdue_count} tasks are overdue',
+                'tasks': task_titles(user.id, is_overdue(now), Task.due_date)
+            })
+
+        # High priority pending risk
+        high_priority_pending = int(counts['high_priority_pending'])
+        if high_priority_pending:
+            risks.append({
+                'type': 'high_priority_pending',
+                'severity': 'critical',
+                'message': f'{high_priority_pending} critical priority tasks pending',
+                'tasks': task_titles(
+                    user.id,
+                    and_(Task.priority == 1, Task.status == 'pending'),
+                    Task.due_date
+                )
+            })
+
+        # Upcoming deadline risk
+        upcoming_deadlines = int(counts['upcoming_deadlines'])
+        if upcoming_deadlines:
+            risks.append({
+                'type': 'upcoming_deadlines',
+                'severity': 'medium',
+                'message': f'{upcoming_deadlines} tasks due within 7 days',
+                'tasks': task_titles(
+                    user.id,
+                    and_(Task.status != 'completed', Task.due_date <= now + timedelta(days=7)),
+                    Task.due_date
+                )
+            })
 
         # Calculate risk score (0-100, higher is more risky)
         risk_score = min(100, len(risks) * 20)
@@ -715,9 +683,33 @@ def get_risk_analysis(user):
         }), 500
 
 
-def export_analytics_data(user, format_type='json'):
-    """Export analytics data"""
+def export_analytics_data(user, format_type='json', envelope=False, compression=None):
+    """
+    Export analytics data.
+
+    csv, ndjson and json are streamed (gzip-compressed when compression='gzip').
+    envelope=True keeps the legacy in-memory responses: the whole CSV as a
+    string inside a JSON envelope, or the JSON export built with jsonify.
+    """
     try:
+        if format_type == 'csv' and not envelope:
+            return streaming_response(
+                iter_csv(user.id), 'text/csv',
+                filename=export_filename('csv'), compression=compression
+            )
+
+        if format_type == 'ndjson':
+            return streaming_response(
+                iter_ndjson(user.id), 'application/x-ndjson',
+                filename=export_filename('ndjson'), compression=compression
+            )
+
+        if format_type != 'csv' and not envelope:
+            return streaming_response(
+                iter_json_document(user.id, task_summary(user)), 'application/json',
+                compression=compression
+            )
+
         # Get all tasks for the user
         tasks = Task.query.filter_by(user_id=user.id).all()
 
@@ -727,25 +719,11 @@ def export_analytics_data(user, format_type='json'):
             writer = csv.writer(output)
 
             # Write header
-            writer.writerow([
-                'ID', 'Title', 'Category', 'Priority', 'Impact',
-                'Status', 'Progress', 'Due Date', 'Created At', 'Completed At'
-            ])
+            writer.writerow([header for header, _ in CSV_COLUMNS])
 
             # Write task data
             for task in tasks:
-                writer.writerow([
-                    task.id,
-                    task.title,
-                    task.category,
-                    task.priority,
-                    task.impact,
-                    task.status,
-                    f'{task.progress}%',
-                    task.due_date.isoformat() if task.due_date else '',
-                    task.created_at.isoformat() if task.created_at else '',
-                    task.completed_at.isoformat() if task.completed_at else ''
-                ])
+                writer.writerow(csv_task_row(task))
 
             csv_data = output.getvalue()
             output.close()
@@ -754,24 +732,13 @@ def export_analytics_data(user, format_type='json'):
                 'success': True,
                 'data': csv_data,
                 'format': 'csv',
-                'filename': f'decisionai_export_{datetime.utcnow().strftime("%Y%m%d")}.csv'
+                'filename': export_filename('csv')
             })
 
         else:  # Default to JSON
-            tasks_data = [task.to_dict() for task in tasks]
-
-            # Add analytics summary
-            summary = {
-                'total_tasks': len(tasks),
-                'completed_tasks': len([t for t in tasks if t.status == 'completed']),
-                'pending_tasks': len([t for t in tasks if t.status == 'pending']),
-                'export_date': datetime.utcnow().isoformat(),
-                'user': user.email
-            }
-
             export_data = {
-                'summary': summary,
-                'tasks': tasks_data
+                'summary': task_summary(user),
+                'tasks': [task.to_dict() for task in tasks]
             }
 
             return jsonify({
@@ -785,4 +752,81 @@ def export_analytics_data(user, format_type='json'):
             'success': False,
             'message': 'Failed to export analytics data',
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+def create_export_job(user, data):
+    """Queue a background export of the user's tasks"""
+    try:
+        job = export_jobs.submit(user, data['format'], data.get('compression'))
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict(),
+            'message': 'Export job queued'
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Failed to queue export job',
+            'error': str(e)
+        }), 500
+
+
+def get_export_job(user, job_id):
+    """Get the status of an export job"""
+    try:
+        job = ExportJob.query.filter_by(id=job_id, user_id=user.id).first()
+
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Export job not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get export job',
+            'error': str(e)
+        }), 500
+
+
+def download_export_job(user, job_id):
+    """Send a finished export artifact (supports HTTP Range requests)"""
+    try:
+        job = ExportJob.query.filter_by(id=job_id, user_id=user.id).first()
+
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Export job not found'
+            }), 404
+
+        if job.status != 'completed' or not job.file_path or not os.path.exists(job.file_path):
+            return jsonify({
+                'success': False,
+                'message': f'Export is not available (status: {job.status})'
+            }), 409
+
+        return send_file(
+            job.file_path,
+            mimetype=EXPORT_MIMETYPES[job.format] if job.compression != 'gzip' else 'application/gzip',
+            as_attachment=True,
+            download_name=job.filename,
+            conditional=True
+        )
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Failed to download export',
+            'error': str(e)
+        }), 500
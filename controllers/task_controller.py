@@ -1,12 +1,30 @@
 # controllers/task_controller.py
 from flask import jsonify, request
-from models.task import Task, TaskHistory
+from models.task import Task
 from models.user import User
 from extensions import db
 from utils.ai_helper import AIHelper
-from datetime import datetime, timedelta
+from utils.database import bulk_create, chunks, delete_returning
+from utils.validators import CreateTaskSchema
+from services.ai_service import ai_enrichment
+from utils.cache import analytics_cache
+from utils.rollups import (
+    CONTRIBUTION_COLUMNS, task_contribution, record_task_change, rollup_delta, merge_delta, apply_rollup_delta
+)
+from utils.completion_sketches import completion_sample, record_completion_change, record_completion_changes
+from utils.pagination import KEYSET_COLUMNS, keyset_page
+from utils.task_fields import task_projection, serialize_tasks
+from utils.search import task_search
+from utils.task_history import (
+    STATE_COLUMNS, task_state, record_history, record_deletions, flush_queued_history
+)
+from utils.task_tags import (
+    TAG_MATCHES, parse_tags, tag_filter, tag_counts, sync_task_tags, index_tasks, unindex_tasks
+)
+from datetime import datetime, timedelta, timezone
 import uuid
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, case
+from marshmallow import ValidationError
 
 # Initialize AI Helper
 ai_helper = AIHelper()
@@ -38,17 +56,15 @@ def create_task(user, data):
         )
 
         db.session.add(task)
+        record_task_change(user.id, {}, task_contribution(task))
+        index_tasks([task])
 
-        # Log history
-        history = TaskHistory(
-            task_id=task.id,
-            user_id=user.id,
-            action='created',
-            changes={'from': None, 'to': task.to_dict()}
-        )
-        db.session.add(history)
+        # Log history; flushed first so the snapshot has the column defaults
+        db.session.flush()
+        record_history(user.id, [(task.id, 'created', None, task_state(task))])
 
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         # Update user stats
         user.update_stats('task_created')
@@ -68,46 +84,53 @@ def create_task(user, data):
         }), 500
 
 
-def get_tasks(user, filters=None, sort_by='priority', order='asc', page=1, limit=20):
-    """Get tasks with filters"""
+def get_tasks(user, filters=None, sort_by='priority', order='asc', page=1, limit=20,
+              cursor=None, include_total=False, fields=None):
+    """
+    Get tasks with filters.
+
+    Pages by OFFSET unless cursor is given (an empty string for the first
+    page); then pages by key and returns a next_cursor token, counting the
+    total only when include_total is set. fields selects a sparse fieldset.
+    With a search filter, sort_by='relevance' ranks the full-text matches.
+    """
     try:
+        try:
+            projection = task_projection(fields)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+
         # Build query
-        query = Task.query.filter_by(user_id=user.id)
+        try:
+            query, relevance = _filter_tasks(user, Task.query.filter_by(user_id=user.id), filters)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
 
-        # Apply filters
-        if filters:
-            if filters.get('status'):
-                query = query.filter(Task.status == filters['status'])
-            if filters.get('priority'):
-                query = query.filter(Task.priority == int(filters['priority']))
-            if filters.get('category'):
-                query = query.filter(Task.category == filters['category'])
-            if filters.get('due_before'):
-                due_date = datetime.fromisoformat(filters['due_before'].replace('Z', '+00:00'))
-                query = query.filter(Task.due_date <= due_date)
-            if filters.get('due_after'):
-                due_date = datetime.fromisoformat(filters['due_after'].replace('Z', '+00:00'))
-                query = query.filter(Task.due_date >= due_date)
-            if filters.get('search'):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(
-                    or_(
-                        Task.title.ilike(search_term),
-                        Task.description.ilike(search_term)
-                    )
-                )
-
-        # Apply sorting
+        if cursor is not None:
+            return _get_tasks_page(query, sort_by, order, cursor, limit, include_total, projection)
+
+        # Apply sorting; id keeps rows with equal sort values in a stable order
         sort_column = getattr(Task, sort_by, Task.priority)
-        if order == 'desc':
-            query = query.order_by(sort_column.desc())
+        if sort_by == 'relevance' and relevance is not None:
+            query = query.order_by(relevance.desc(), Task.id.asc())
+        elif order == 'desc':
+            query = query.order_by(sort_column.desc(), Task.id.desc())
         else:
-            query = query.order_by(sort_column.asc())
+            query = query.order_by(sort_column.asc(), Task.id.asc())
+
+        if projection:
+            query = projection.select(query)
 
         # Pagination
         paginated = query.paginate(page=page, per_page=limit, error_out=False)
 
-        tasks_data = [task.to_dict() for task in paginated.items]
+        tasks_data = serialize_tasks(paginated.items, projection)
 
         return jsonify({
             'success': True,
@@ -128,6 +151,99 @@ def get_tasks(user, filters=None, sort_by='priority', order='asc', page=1, limit
         }), 500
 
 
+def _filter_datetime(value):
+    """A date filter: ISO string from the query string, or a datetime already parsed by a schema"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _filter_tasks(user, query, filters):
+    """
+    Apply the task list filters to query.
+
+    Returns (query, relevance), relevance being the search rank expression
+    when a search filter is given. Raises ValueError for invalid values.
+    """
+    relevance = None
+    if not filters:
+        return query, relevance
+
+    if filters.get('status'):
+        query = query.filter(Task.status == filters['status'])
+    if filters.get('priority'):
+        query = query.filter(Task.priority == int(filters['priority']))
+    if filters.get('category'):
+        query = query.filter(Task.category == filters['category'])
+    if filters.get('due_before'):
+        query = query.filter(Task.due_date <= _filter_datetime(filters['due_before']))
+    if filters.get('due_after'):
+        query = query.filter(Task.due_date >= _filter_datetime(filters['due_after']))
+    if filters.get('search'):
+        query, relevance = task_search.apply(query, filters['search'])
+    if filters.get('tags'):
+        tag_match = filters.get('tag_match') or 'any'
+        if tag_match not in TAG_MATCHES:
+            raise ValueError(f'tag_match must be one of: {", ".join(TAG_MATCHES)}')
+        tags = parse_tags(filters['tags'])
+        if tags:
+            query = query.filter(tag_filter(user.id, tags, tag_match))
+
+    return query, relevance
+
+
+def _get_tasks_page(query, sort_by, order, cursor, limit, include_total, projection=None):
+    """Keyset-paginated response for get_tasks"""
+    if projection:
+        # The next cursor is built from the last row's sort key
+        sort_key = [KEYSET_COLUMNS[sort_by]] if sort_by in KEYSET_COLUMNS else []
+        query = projection.select(query, *sort_key)
+
+    try:
+        tasks, next_cursor = keyset_page(query, sort_by, 'desc' if order == 'desc' else 'asc', cursor, limit)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    pagination = {
+        'per_page': limit,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }
+    if include_total:
+        pagination['total'] = query.order_by(None).count()
+
+    return jsonify({
+        'success': True,
+        'data': serialize_tasks(tasks, projection),
+        'pagination': pagination
+    })
+
+
+def _task_list(query, fields=None, **extra):
+    """Response listing the tasks of query, projected to fields when given"""
+    try:
+        projection = task_projection(fields)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    if projection:
+        query = projection.select(query)
+    tasks_data = serialize_tasks(query.all(), projection)
+
+    return jsonify({
+        'success': True,
+        'data': tasks_data,
+        'count': len(tasks_data),
+        **extra
+    })
+
+
 def get_task(user, task_id):
     """Get single task"""
     try:
@@ -164,7 +280,10 @@ def update_task(user, task_id, data):
             }), 404
 
         # Store old values for history
-        old_values = task.to_dict()
+        old_state = task_state(task)
+        old_contribution = task_contribution(task)
+        old_sample = completion_sample(task)
+        old_tags = list(task.tags or [])
 
         # Update fields
         update_fields = [
@@ -183,16 +302,16 @@ def update_task(user, task_id, data):
         if 'description' in data and user.preferences.get('ai_enabled', True):
             task.ai_insights = ai_helper.analyze_task(data['description'])
 
+        record_task_change(user.id, old_contribution, task_contribution(task))
+        record_completion_change(user.id, old_sample, completion_sample(task))
+        if 'tags' in data:
+            sync_task_tags(user.id, task.id, old_tags, task.tags)
+
         # Log history
-        history = TaskHistory(
-            task_id=task.id,
-            user_id=user.id,
-            action='updated',
-            changes={'from': old_values, 'to': task.to_dict()}
-        )
-        db.session.add(history)
+        record_history(user.id, [(task.id, 'updated', old_state, task_state(task))])
 
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -209,28 +328,52 @@ def update_task(user, task_id, data):
         }), 500
 
 
+def _delete_tasks(user, task_ids, chunk_size=5000):
+    """
+    Delete the user's tasks among task_ids with set-based statements.
+
+    Per chunk of ids, one INSERT ... SELECT logs a 'deleted' history row
+    holding a snapshot of each task's state, and one DELETE (with
+    RETURNING where supported) removes the tasks and hands back what the
+    rollups and completion sketches need. Ids that are missing or belong
+    to another user are ignored. Returns the deleted ids; the caller commits.
+    """
+    timestamp = datetime.utcnow()
+    returned = (Task.id, Task.category, *CONTRIBUTION_COLUMNS)
+
+    # Queued history goes in before this transaction takes its write lock
+    flush_queued_history()
+
+    deleted_ids, rollup, samples = [], {}, []
+    for chunk in chunks(dict.fromkeys(task_ids), chunk_size):
+        criteria = (Task.user_id == user.id, Task.id.in_(chunk))
+
+        # Log history before deletion
+        record_deletions(criteria, timestamp)
+        rows = delete_returning(Task, returned, *criteria)
+        unindex_tasks([row.id for row in rows])
+
+        for row in rows:
+            deleted_ids.append(row.id)
+            merge_delta(rollup, rollup_delta(task_contribution(row), {}))
+            samples.append((completion_sample(row), None))
+
+    apply_rollup_delta(user.id, rollup)
+    record_completion_changes(user.id, samples)
+    return deleted_ids
+
+
 def delete_task(user, task_id):
     """Delete a task"""
     try:
-        task = Task.query.filter_by(id=task_id, user_id=user.id).first()
-
-        if not task:
+        if not _delete_tasks(user, [task_id]):
             return jsonify({
                 'success': False,
                 'message': 'Task not found'
             }), 404
 
-        # Log history before deletion
-        history = TaskHistory(
-            task_id=task.id,
-            user_id=user.id,
-            action='deleted',
-            changes={'deleted_task': task.to_dict()}
-        )
-        db.session.add(history)
-
-        db.session.delete(task)
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -259,6 +402,9 @@ def update_task_status(user, task_id, data):
 
         old_status = task.status
         new_status = data['status']
+        old_state = task_state(task)
+        old_contribution = task_contribution(task)
+        old_sample = completion_sample(task)
 
         task.status = new_status
         task.updated_at = datetime.utcnow()
@@ -271,16 +417,14 @@ def update_task_status(user, task_id, data):
         elif new_status == 'in-progress' and old_status != 'in-progress':
             task.started_at = datetime.utcnow()
 
+        record_task_change(user.id, old_contribution, task_contribution(task))
+        record_completion_change(user.id, old_sample, completion_sample(task))
+
         # Log history
-        history = TaskHistory(
-            task_id=task.id,
-            user_id=user.id,
-            action='status_updated',
-            changes={'from': old_status, 'to': new_status}
-        )
-        db.session.add(history)
+        record_history(user.id, [(task.id, 'status_updated', old_state, task_state(task))])
 
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -308,7 +452,6 @@ def update_task_progress(user, task_id, data):
                 'message': 'Task not found'
             }), 404
 
-        old_progress = task.progress
         new_progress = data['progress']
 
         if not 0 <= new_progress <= 100:
@@ -317,6 +460,9 @@ def update_task_progress(user, task_id, data):
                 'message': 'Progress must be between 0 and 100'
             }), 400
 
+        old_state = task_state(task)
+        old_contribution = task_contribution(task)
+        old_sample = completion_sample(task)
         task.progress = new_progress
         task.updated_at = datetime.utcnow()
 
@@ -330,16 +476,14 @@ def update_task_progress(user, task_id, data):
             if not task.started_at:
                 task.started_at = datetime.utcnow()
 
+        record_task_change(user.id, old_contribution, task_contribution(task))
+        record_completion_change(user.id, old_sample, completion_sample(task))
+
         # Log history
-        history = TaskHistory(
-            task_id=task.id,
-            user_id=user.id,
-            action='progress_updated',
-            changes={'from': old_progress, 'to': new_progress}
-        )
-        db.session.add(history)
+        record_history(user.id, [(task.id, 'progress_updated', old_state, task_state(task))])
 
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -356,22 +500,15 @@ def update_task_progress(user, task_id, data):
         }), 500
 
 
-def get_tasks_by_category(user, category):
+def get_tasks_by_category(user, category, fields=None):
     """Get tasks by category"""
     try:
-        tasks = Task.query.filter_by(
+        query = Task.query.filter_by(
             user_id=user.id,
             category=category
-        ).order_by(Task.priority).all()
+        ).order_by(Task.priority)
 
-        tasks_data = [task.to_dict() for task in tasks]
-
-        return jsonify({
-            'success': True,
-            'data': tasks_data,
-            'category': category,
-            'count': len(tasks_data)
-        })
+        return _task_list(query, fields, category=category)
 
     except Exception as e:
         return jsonify({
@@ -381,7 +518,7 @@ def get_tasks_by_category(user, category):
         }), 500
 
 
-def get_tasks_by_priority(user, priority):
+def get_tasks_by_priority(user, priority, fields=None):
     """Get tasks by priority level"""
     try:
         if not 1 <= priority <= 5:
@@ -390,19 +527,12 @@ def get_tasks_by_priority(user, priority):
                 'message': 'Priority must be between 1 and 5'
             }), 400
 
-        tasks = Task.query.filter_by(
+        query = Task.query.filter_by(
             user_id=user.id,
             priority=priority
-        ).order_by(Task.due_date).all()
+        ).order_by(Task.due_date)
 
-        tasks_data = [task.to_dict() for task in tasks]
-
-        return jsonify({
-            'success': True,
-            'data': tasks_data,
-            'priority': priority,
-            'count': len(tasks_data)
-        })
+        return _task_list(query, fields, priority=priority)
 
     except Exception as e:
         return jsonify({
@@ -412,22 +542,16 @@ def get_tasks_by_priority(user, priority):
         }), 500
 
 
-def get_overdue_tasks(user):
+def get_overdue_tasks(user, fields=None):
     """Get overdue tasks"""
     try:
-        tasks = Task.query.filter(
+        query = Task.query.filter(
             Task.user_id == user.id,
             Task.status != 'completed',
             Task.due_date < datetime.utcnow()
-        ).order_by(Task.priority).all()
+        ).order_by(Task.priority)
 
-        tasks_data = [task.to_dict() for task in tasks]
-
-        return jsonify({
-            'success': True,
-            'data': tasks_data,
-            'count': len(tasks_data)
-        })
+        return _task_list(query, fields)
 
     except Exception as e:
         return jsonify({
@@ -437,31 +561,43 @@ def get_overdue_tasks(user):
         }), 500
 
 
-def get_upcoming_tasks(user):
+def get_upcoming_tasks(user, fields=None):
     """Get upcoming tasks (next 7 days)"""
     try:
         seven_days_from_now = datetime.utcnow() + timedelta(days=7)
 
-        tasks = Task.query.filter(
+        query = Task.query.filter(
             Task.user_id == user.id,
             Task.status != 'completed',
             Task.due_date >= datetime.utcnow(),
             Task.due_date <= seven_days_from_now
-        ).order_by(Task.due_date).all()
+        ).order_by(Task.due_date)
+
+        return _task_list(query, fields, timeframe='next_7_days')
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Failed to fetch upcoming tasks',
+            'error': str(e)
+        }), 500
 
-        tasks_data = [task.to_dict() for task in tasks]
+
+def get_tag_counts(user):
+    """Get the user's tags with the number of tasks carrying each"""
+    try:
+        tags = tag_counts(user.id)
 
         return jsonify({
             'success': True,
-            'data': tasks_data,
-            'count': len(tasks_data),
-            'timeframe': 'next_7_days'
+            'data': tags,
+            'count': len(tags)
         })
 
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': 'Failed to fetch upcoming tasks',
+            'message': 'Failed to fetch tag counts',
             'error': str(e)
         }), 500
 
@@ -484,6 +620,7 @@ def get_task_insights(user, task_id):
                 insights = ai_helper.analyze_task(task.description)
                 task.ai_insights = insights
                 db.session.commit()
+                analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -503,56 +640,97 @@ def get_task_insights(user, task_id):
 
 
 def bulk_create_tasks(user, tasks_data):
-    """Bulk create tasks"""
+    """
+    Bulk create tasks.
+
+    The whole batch is validated up front; invalid rows are reported by
+    index in 'failed' and the valid ones are still created. Tasks and their
+    history rows go in with chunked multi-row INSERTs, and the rollup,
+    sketches, tag index and user stats are updated in the same commit.
+    """
     try:
-        created_tasks = []
+        schema = CreateTaskSchema()
+        valid, failed = [], []
+        for index, task_data in enumerate(tasks_data):
+            try:
+                valid.append(schema.load(task_data))
+            except ValidationError as e:
+                failed.append({'index': index, 'errors': e.messages})
+
+        if not valid:
+            return jsonify({
+                'success': False,
+                'message': 'No valid tasks to create',
+                'failed': failed
+            }), 400
 
-        for task_data in tasks_data:
-            # Generate AI insights if enabled
-            ai_insights = {}
-            if user.preferences.get('ai_enabled', True):
-                ai_insights = ai_helper.analyze_task(task_data.get('description', ''))
-
-            task = Task(
-                id=str(uuid.uuid4()),
-                user_id=user.id,
-                title=task_data['title'],
-                description=task_data.get('description', ''),
-                category=task_data.get('category', 'Other'),
-                priority=task_data.get('priority', 3),
-                impact=task_data.get('impact', 5),
-                status=task_data.get('status', 'pending'),
-                progress=task_data.get('progress', 0),
-                due_date=task_data.get('due_date', datetime.utcnow()),
-                tags=task_data.get('tags', []),
-                complexity=task_data.get('complexity', 3),
-                estimated_hours=task_data.get('estimated_hours', 1.0),
-                ai_insights=ai_insights
+        # Generate AI insights if enabled, for the whole batch at once
+        batch_insights = [{}] * len(valid)
+        if user.preferences.get('ai_enabled', True):
+            batch_insights = ai_enrichment.analyze_tasks(
+                [task_data.get('description', '') for task_data in valid]
             )
 
-            db.session.add(task)
+        now = datetime.now(timezone.utc)
+        naive_now = now.replace(tzinfo=None)  # naive UTC, as tasks read back from the database
+        task_rows, history_events, created_tasks, samples = [], [], [], []
+        rollup = {}
+        for task_data, ai_insights in zip(valid, batch_insights):
+            row = {
+                'id': str(uuid.uuid4()),
+                'user_id': user.id,
+                'title': task_data['title'],
+                'description': task_data.get('description', ''),
+                'category': task_data.get('category', 'Other'),
+                'tags': task_data.get('tags', []),
+                'priority': task_data.get('priority', 3),
+                'impact': task_data.get('impact', 5),
+                'complexity': task_data.get('complexity', 3),
+                'estimated_hours': task_data.get('estimated_hours', 1.0),
+                'status': task_data.get('status', 'pending'),
+                'progress': task_data.get('progress', 0),
+                'due_date': task_data['due_date'],
+                'completed_at': None,
+                'ai_insights': ai_insights,
+                'created_at': now,
+                'updated_at': now,
+                'started_at': None
+            }
+            # Transient instance, never added to the session: only used for derived values
+            # and the response, so its timestamps match the other endpoints'
+            task = Task(**dict(row, created_at=naive_now, updated_at=naive_now))
+            task_rows.append(row)
             created_tasks.append(task)
+            merge_delta(rollup, task_contribution(task))
+            samples.append((None, completion_sample(task)))
 
             # Log history
-            history = TaskHistory(
-                task_id=task.id,
-                user_id=user.id,
-                action='created',
-                changes={'from': None, 'to': task.to_dict()}
-            )
-            db.session.add(history)
+            history_events.append((row['id'], 'created', None, task_state(task)))
 
-        db.session.commit()
+        bulk_create(Task, task_rows)
+        record_history(user.id, history_events, naive_now)
+        apply_rollup_delta(user.id, rollup)
+        record_completion_changes(user.id, samples)
+        index_tasks(created_tasks)
+
+        # Update user stats; reassigned so the JSON change is flushed with the tasks
+        stats = dict(user.stats or {})
+        stats['total_tasks'] = stats.get('total_tasks', 0) + len(task_rows)
+        user.stats = stats
 
-        # Update user stats
-        user.stats['total_tasks'] = user.stats.get('total_tasks', 0) + len(created_tasks)
         db.session.commit()
+        analytics_cache.bump_version(user.id)
+
+        message = f'Successfully created {len(created_tasks)} tasks'
+        if failed:
+            message = f'Created {len(created_tasks)} of {len(tasks_data)} tasks'
 
         return jsonify({
             'success': True,
             'data': [task.to_dict() for task in created_tasks],
-            'message': f'Successfully created {len(created_tasks)} tasks',
-            'count': len(created_tasks)
+            'message': message,
+            'count': len(created_tasks),
+            'failed': failed
         }), 201
 
     except Exception as e:
@@ -564,35 +742,118 @@ def bulk_create_tasks(user, tasks_data):
         }), 500
 
 
-def bulk_delete_tasks(user, task_ids):
-    """Bulk delete tasks"""
+def bulk_update_tasks(user, patch, task_ids=None, filters=None, chunk_size=10000):
+    """
+    Apply one field patch to many of the user's tasks.
+
+    The tasks are given by id or by the task list filters. Their current
+    values are read in one SELECT, then one UPDATE per chunk of ids applies
+    the patch, with the status side effects of update_task_status
+    (completed_at and progress on completion, started_at when work starts)
+    expressed as CASE so they only hit the rows that change state. History
+    rows, rollups, completion sketches and user stats are updated set-wise
+    in the same commit.
+    """
     try:
-        tasks = Task.query.filter(
-            Task.user_id == user.id,
-            Task.id.in_(task_ids)
-        ).all()
+        query = Task.query.filter_by(user_id=user.id)
+        try:
+            query, _ = _filter_tasks(user, query, filters)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+
+        columns = (Task.id, Task.user_id, *STATE_COLUMNS)
+        if task_ids is None:
+            rows = query.with_entities(*columns).with_for_update().all()
+        else:
+            rows = []
+            for chunk in chunks(dict.fromkeys(task_ids), chunk_size):
+                rows.extend(query.filter(Task.id.in_(chunk)).with_entities(*columns).with_for_update().all())
 
-        if not tasks:
+        if not rows:
             return jsonify({
                 'success': False,
-                'message': 'No tasks found to delete'
+                'message': 'No tasks found to update'
             }), 404
 
-        deleted_ids = []
-        for task in tasks:
-            # Log history before deletion
-            history = TaskHistory(
-                task_id=task.id,
-                user_id=user.id,
-                action='deleted',
-                changes={'deleted_task': task.to_dict()}
+        now = datetime.utcnow()
+        new_status = patch.get('status')
+        values = dict(patch, updated_at=now)
+        if new_status == 'completed':
+            values['progress'] = case((Task.status != 'completed', 100), else_=Task.progress)
+            values['completed_at'] = case((Task.status != 'completed', now), else_=Task.completed_at)
+        elif new_status == 'in-progress':
+            values['started_at'] = case((Task.status != 'in-progress', now), else_=Task.started_at)
+
+        updated_ids = [row.id for row in rows]
+        for chunk in chunks(updated_ids, chunk_size):
+            db.session.execute(
+                update(Task).where(Task.user_id == user.id, Task.id.in_(chunk)).values(**values)
+                .execution_options(synchronize_session=False)
             )
-            db.session.add(history)
 
-            deleted_ids.append(task.id)
-            db.session.delete(task)
+        history_events, samples = [], []
+        rollup = {}
+        completed_count, completed_impact = 0, 0
+        for row in rows:
+            old = row._asdict()
+            changes = dict(patch)
+            if new_status == 'completed' and row.status != 'completed':
+                changes.update(progress=100, completed_at=now)
+                completed_count += 1
+                completed_impact += row.impact or 0
+            elif new_status == 'in-progress' and row.status != 'in-progress':
+                changes['started_at'] = now
+
+            # Transient instance, never added to the session: only used for derived values
+            task = Task(**dict(old, **changes))
+            merge_delta(rollup, rollup_delta(task_contribution(row), task_contribution(task)))
+            samples.append((completion_sample(row), completion_sample(task)))
+
+            # Log history
+            history_events.append((row.id, 'updated', task_state(row), task_state(task)))
+
+        record_history(user.id, history_events, now)
+        apply_rollup_delta(user.id, rollup)
+        record_completion_changes(user.id, samples)
+        user.record_completions(completed_count, completed_impact)
+
+        db.session.commit()
+        analytics_cache.bump_version(user.id)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'updated_task_ids': updated_ids,
+                'count': len(updated_ids)
+            },
+            'message': f'Successfully updated {len(updated_ids)} tasks'
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Failed to bulk update tasks',
+            'error': str(e)
+        }), 500
+
+
+def bulk_delete_tasks(user, task_ids):
+    """Bulk delete tasks; a few statements per 5000 ids rather than several per task"""
+    try:
+        deleted_ids = _delete_tasks(user, task_ids)
+
+        if not deleted_ids:
+            return jsonify({
+                'success': False,
+                'message': 'No tasks found to delete'
+            }), 404
 
         db.session.commit()
+        analytics_cache.bump_version(user.id)
 
         return jsonify({
             'success': True,
@@ -0,0 +1,138 @@
+# middleware/query_stats.py
+"""
+Per-request SQL instrumentation.
+
+Cursor-execute hooks on every engine count each request's statements,
+total DB time and its slowest statement. In debug mode (or with
+QUERY_STATS_HEADERS) responses carry X-DB-Queries and X-DB-Time-ms.
+Requests over SLOW_REQUEST_QUERY_BUDGET statements or
+SLOW_REQUEST_DB_TIME_MS of DB time are logged as warnings.
+
+capture_queries() and assert_max_queries(n) record the statements run
+inside a block, for tests and benchmarks.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statement lists of the active capture_queries() blocks
+_collectors = []
+
+
+class QueryStats:
+    """Statement count, DB time and slowest statement of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement = None
+        self._lock = threading.Lock()
+
+    def record(self, statement, elapsed_ms):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_statement = statement
+
+
+def current_query_stats():
+    """Stats of the request being served, or None outside one"""
+    return g.get('_query_stats') if has_app_context() else None
+
+
+def bind_query_stats(stats):
+    """Count the current app context's statements into stats (e.g. a worker thread of a request)"""
+    if stats is not None:
+        g._query_stats = stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+    for statements in _collectors:
+        statements.append(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+class QueryInstrumentation:
+    """Attaches per-request SQL statistics to the app"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_STATS_ENABLED', True)
+        app.config.setdefault('QUERY_STATS_HEADERS', app.debug)
+        app.config.setdefault('SLOW_REQUEST_QUERY_BUDGET', 30)
+        app.config.setdefault('SLOW_REQUEST_DB_TIME_MS', 250)
+
+        # Listen on the Engine class once per process, for every engine
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        if current_app.config['QUERY_STATS_ENABLED']:
+            g._query_stats = QueryStats()
+
+    def _finish(self, response):
+        stats = current_query_stats()
+        if stats is None:
+            return response
+
+        config = current_app.config
+        if config['QUERY_STATS_HEADERS']:
+            response.headers['X-DB-Queries'] = str(stats.count)
+            response.headers['X-DB-Time-ms'] = f'{stats.total_ms:.2f}'
+
+        if stats.count > config['SLOW_REQUEST_QUERY_BUDGET'] or stats.total_ms > config['SLOW_REQUEST_DB_TIME_MS']:
+            logger.warning(
+                'Request over DB budget: %s %s ran %d statements in %.1f ms (slowest %.1f ms: %s)',
+                request.method, request.path, stats.count, stats.total_ms,
+                stats.slowest_ms, (stats.slowest_statement or '')[:200]
+            )
+        return response
+
+
+@contextmanager
+def capture_queries():
+    """Collect the SQL statements executed inside the block, from any thread"""
+    statements = []
+    _collectors.append(statements)
+    try:
+        yield statements
+    finally:
+        # Remove by identity; two empty lists compare equal
+        _collectors[:] = [active for active in _collectors if active is not statements]
+
+
+@contextmanager
+def assert_max_queries(n):
+    """Fail if the block executes more than n SQL statements; yields the statements"""
+    with capture_queries() as statements:
+        yield statements
+
+    if len(statements) > n:
+        listing = '\n'.join(f'  {i + 1}. {statement}' for i, statement in enumerate(statements))
+        raise AssertionError(f'Expected at most {n} queries, {len(statements)} were executed:\n{listing}')
+
+
+query_instrumentation = QueryInstrumentation()
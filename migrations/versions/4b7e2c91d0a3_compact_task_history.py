@@ -0,0 +1,131 @@
+"""compact task history into versioned deltas
+
+Revision ID: 4b7e2c91d0a3
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c91d0a3'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# The history format as of this revision. Kept here rather than imported
+# from utils.task_history, so later app changes cannot alter the rewrite.
+STATE_KEYS = (
+    'title', 'description', 'category', 'tags', 'priority', 'impact', 'complexity',
+    'estimated_hours', 'status', 'progress', 'due_date', 'completed_at', 'created_at',
+    'started_at', 'ai_insights'
+)
+SNAPSHOT_INTERVAL = 20
+
+task_history = sa.table(
+    'task_history',
+    sa.column('id', sa.Integer),
+    sa.column('task_id', sa.String),
+    sa.column('action', sa.String),
+    sa.column('version', sa.Integer),
+    sa.column('changes', sa.JSON),
+    sa.column('timestamp', sa.DateTime),
+)
+
+
+def history_changes(action, version, before, after):
+    """The changes payload of a history row: a full snapshot or the changed columns"""
+    if action in ('created', 'deleted') or version == 1 or version % SNAPSHOT_INTERVAL == 0:
+        return {'snapshot': after}
+    return {'delta': {key: value for key, value in after.items() if key not in before or before[key] != value}}
+
+
+def legacy_state(action, changes, state):
+    """State after a pre-delta history row ({'from', 'to'} or {'deleted_task'} payloads)"""
+    def project(values):
+        return {key: values[key] for key in STATE_KEYS if key in values}
+
+    if 'snapshot' in changes:
+        return dict(changes['snapshot'])
+    if 'delta' in changes:
+        return {**state, **changes['delta']}
+    if isinstance(changes.get('deleted_task'), dict):
+        return {**state, **project(changes['deleted_task'])}
+    if isinstance(changes.get('to'), dict):
+        return {**state, **project(changes['to'])}
+    if action == 'status_updated':
+        return {**state, 'status': changes.get('to')}
+    if action == 'progress_updated':
+        return {**state, 'progress': changes.get('to')}
+    return state
+
+
+def compact_history(connection, batch_size=500):
+    """Replay each task's history in timestamp order, rewriting it as numbered deltas and snapshots"""
+    statement = sa.update(task_history).where(task_history.c.id == sa.bindparam('row_id')).values(
+        version=sa.bindparam('new_version'),
+        changes=sa.bindparam('new_changes', type_=sa.JSON)
+    )
+
+    last_task_id = ''
+    while True:
+        task_ids = connection.execute(
+            sa.select(task_history.c.task_id).where(task_history.c.task_id > last_task_id)
+            .group_by(task_history.c.task_id).order_by(task_history.c.task_id).limit(batch_size)
+        ).scalars().all()
+        if not task_ids:
+            return
+        last_task_id = task_ids[-1]
+
+        rows = connection.execute(
+            sa.select(task_history.c.id, task_history.c.task_id, task_history.c.action, task_history.c.changes)
+            .where(task_history.c.task_id.in_(task_ids))
+            .order_by(task_history.c.task_id, task_history.c.timestamp, task_history.c.id)
+        ).all()
+
+        params, task_id, version, state = [], None, 0, {}
+        for row in rows:
+            if row.task_id != task_id:
+                task_id, version, state = row.task_id, 0, {}
+            version += 1
+            after = legacy_state(row.action, row.changes or {}, state)
+            params.append({
+                'row_id': row.id,
+                'new_version': version,
+                'new_changes': history_changes(row.action, version, state, after)
+            })
+            state = after
+
+        connection.execute(statement, params)
+
+
+def upgrade():
+    # The schema may come from db.create_all(), so every step checks first
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if 'version' not in {column['name'] for column in inspector.get_columns('task_history')}:
+        op.add_column('task_history', sa.Column('version', sa.Integer(), nullable=True))
+
+    # History outlives its task: drop the old foreign key to tasks (SQLite does not enforce it)
+    if bind.dialect.name != 'sqlite':
+        for foreign_key in inspector.get_foreign_keys('task_history'):
+            if foreign_key['referred_table'] == 'tasks' and foreign_key.get('name'):
+                op.drop_constraint(foreign_key['name'], 'task_history', type_='foreignkey')
+
+    indexes = {index['name'] for index in inspector.get_indexes('task_history')}
+    if 'ix_task_history_task_id' in indexes:
+        op.drop_index('ix_task_history_task_id', table_name='task_history')
+    if 'idx_task_history_task_version' not in indexes:
+        op.create_index('idx_task_history_task_version', 'task_history', ['task_id', 'version'])
+
+    compact_history(bind)
+
+
+def downgrade():
+    # The compacted payloads cannot be expanded back into full to_dict() snapshots
+    op.drop_index('idx_task_history_task_version', table_name='task_history')
+    with op.batch_alter_table('task_history') as batch_op:
+        batch_op.drop_column('version')
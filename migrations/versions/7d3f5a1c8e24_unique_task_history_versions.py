@@ -0,0 +1,56 @@
+"""make task history versions unique per task
+
+Revision ID: 7d3f5a1c8e24
+Revises: 4b7e2c91d0a3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f5a1c8e24'
+down_revision = '4b7e2c91d0a3'
+branch_labels = None
+depends_on = None
+
+task_history = sa.table(
+    'task_history',
+    sa.column('id', sa.Integer),
+    sa.column('task_id', sa.String),
+    sa.column('version', sa.Integer),
+)
+
+
+def renumber_duplicates(connection):
+    """Renumber the history of tasks whose versions collided, keeping the row order"""
+    duplicated = connection.execute(
+        sa.select(task_history.c.task_id).where(task_history.c.version.isnot(None))
+        .group_by(task_history.c.task_id, task_history.c.version).having(sa.func.count() > 1)
+    ).scalars().all()
+    if not duplicated:
+        return
+
+    statement = sa.update(task_history).where(task_history.c.id == sa.bindparam('row_id')).values(
+        version=sa.bindparam('new_version')
+    )
+    for task_id in dict.fromkeys(duplicated):
+        rows = connection.execute(
+            sa.select(task_history.c.id).where(task_history.c.task_id == task_id)
+            .order_by(task_history.c.version, task_history.c.id)
+        ).scalars().all()
+        connection.execute(statement, [
+            {'row_id': row_id, 'new_version': version} for version, row_id in enumerate(rows, start=1)
+        ])
+
+
+def upgrade():
+    renumber_duplicates(op.get_bind())
+    op.drop_index('idx_task_history_task_version', table_name='task_history')
+    op.create_index('idx_task_history_task_version', 'task_history', ['task_id', 'version'], unique=True)
+
+
+def downgrade():
+    op.drop_index('idx_task_history_task_version', table_name='task_history')
+    op.create_index('idx_task_history_task_version', 'task_history', ['task_id', 'version'])
@@ -0,0 +1,71 @@
+"""keyset pagination indexes on tasks; non-null sort columns
+
+Revision ID: 9a4c6e2f1b57
+Revises: 7d3f5a1c8e24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e2f1b57'
+down_revision = '7d3f5a1c8e24'
+branch_labels = None
+depends_on = None
+
+tasks = sa.table(
+    'tasks',
+    sa.column('priority', sa.Integer),
+    sa.column('category', sa.String),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+
+# name: (columns before, columns after this revision); None where absent
+INDEXES = {
+    'idx_user_priority': (['user_id', 'priority'], ['user_id', 'priority', 'id']),
+    'idx_user_due_date': (['user_id', 'due_date'], ['user_id', 'due_date', 'id']),
+    'idx_user_category': (['user_id', 'category'], ['user_id', 'category', 'id']),
+    'idx_user_created_at': (None, ['user_id', 'created_at', 'id']),
+}
+
+# Keyset pagination sort columns, with the value backfilled into NULLs
+SORT_COLUMNS = (
+    ('priority', sa.Integer(), sa.literal(3)),
+    ('category', sa.String(length=50), sa.literal('Other')),
+    ('created_at', sa.DateTime(timezone=True), sa.func.coalesce(tasks.c.updated_at, sa.func.current_timestamp())),
+)
+
+
+def replace_indexes(columns_of):
+    """Recreate each index with the columns columns_of picks, skipping those already so"""
+    existing = {index['name']: index['column_names'] for index in sa.inspect(op.get_bind()).get_indexes('tasks')}
+    for name, definitions in INDEXES.items():
+        columns = columns_of(definitions)
+        if existing.get(name) == columns:
+            continue
+        if name in existing:
+            op.drop_index(name, table_name='tasks')
+        if columns:
+            op.create_index(name, 'tasks', columns)
+
+
+def upgrade():
+    # Databases made with db.create_all() may already have the new indexes
+    replace_indexes(lambda definitions: definitions[1])
+
+    for name, type_, backfill in SORT_COLUMNS:
+        op.execute(tasks.update().where(tasks.c[name].is_(None)).values({name: backfill}))
+    with op.batch_alter_table('tasks') as batch_op:
+        for name, type_, backfill in SORT_COLUMNS:
+            batch_op.alter_column(name, existing_type=type_, nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks') as batch_op:
+        for name, type_, backfill in SORT_COLUMNS:
+            batch_op.alter_column(name, existing_type=type_, nullable=True)
+
+    replace_indexes(lambda definitions: definitions[0])
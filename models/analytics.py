@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from extensions import db
+
+
+class UserDailyStats(db.Model):
+    """Per-user daily rollup of task activity, maintained on every task write"""
+    __tablename__ = 'user_daily_stats'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    # Keyed by the day the task was created
+    tasks_created = db.Column(db.Integer, nullable=False, default=0)
+    impact_created = db.Column(db.Integer, nullable=False, default=0)
+    high_priority_created = db.Column(db.Integer, nullable=False, default=0)
+
+    # Keyed by the day the task was completed
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0)
+    impact_completed = db.Column(db.Integer, nullable=False, default=0)
+    high_priority_completed = db.Column(db.Integer, nullable=False, default=0)
+    tasks_on_time = db.Column(db.Integer, nullable=False, default=0)
+    completion_hours = db.Column(db.Float, nullable=False, default=0.0)  # started_at -> completed_at
+    timed_completions = db.Column(db.Integer, nullable=False, default=0)  # completions with a start time
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat() if self.day else None,
+            'tasks_created': self.tasks_created,
+            'impact_created': self.impact_created,
+            'high_priority_created': self.high_priority_created,
+            'tasks_completed': self.tasks_completed,
+            'impact_completed': self.impact_completed,
+            'high_priority_completed': self.high_priority_completed,
+            'tasks_on_time': self.tasks_on_time,
+            'completion_hours': self.completion_hours,
+            'timed_completions': self.timed_completions
+        }
+
+    def __repr__(self):
+        return f'<UserDailyStats {self.user_id} {self.day}>'
+
+
+class CompletionSketch(db.Model):
+    """Per-user, per-category quantile sketch of task completion hours (started_at -> completed_at)"""
+    __tablename__ = 'completion_sketches'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+
+    sketch = db.Column(db.JSON, nullable=False)  # DDSketch.to_dict()
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        """Convert sketch row to dictionary"""
+        return {
+            'user_id': self.user_id,
+            'category': self.category,
+            'sketch': self.sketch,
+            'count': self.count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<CompletionSketch {self.user_id} {self.category}>'
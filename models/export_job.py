@@ -0,0 +1,45 @@
+from datetime import datetime
+from extensions import db
+import uuid
+
+
+class ExportJob(db.Model):
+    """Background export of a user's tasks to a downloadable artifact"""
+    __tablename__ = 'export_jobs'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+
+    format = db.Column(db.String(10), nullable=False)  # csv, ndjson, pdf
+    compression = db.Column(db.String(10))  # gzip or None
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed, expired
+    error = db.Column(db.Text)
+
+    # Artifact
+    file_path = db.Column(db.String(500))
+    filename = db.Column(db.String(200))
+    size_bytes = db.Column(db.BigInteger)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
+
+    def to_dict(self):
+        """Convert export job to dictionary"""
+        return {
+            'id': self.id,
+            'format': self.format,
+            'compression': self.compression,
+            'status': self.status,
+            'error': self.error,
+            'filename': self.filename,
+            'size_bytes': self.size_bytes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.status}>'
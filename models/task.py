@@ -13,11 +13,11 @@ class Task(db.Model):
     # Task details
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    category = db.Column(db.String(50), default='Other')
+    category = db.Column(db.String(50), nullable=False, default='Other')
     tags = db.Column(db.JSON, default=list)
 
     # Task metrics
-    priority = db.Column(db.Integer, default=3)  # 1-5, 1=highest
+    priority = db.Column(db.Integer, nullable=False, default=3)  # 1-5, 1=highest
     impact = db.Column(db.Integer, default=5)  # 1-10
     complexity = db.Column(db.Integer, default=3)  # 1-5
     estimated_hours = db.Column(db.Float, default=1.0)
@@ -37,17 +37,19 @@ class Task(db.Model):
     })
 
     # Metadata
-    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))  # CHANGED
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False,
+                           default=lambda: datetime.now(timezone.utc))  # CHANGED
     updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
                            onupdate=lambda: datetime.now(timezone.utc))  # CHANGED
     started_at = db.Column(db.DateTime(timezone=True))  # CHANGED: Added timezone=True
 
-    # Indexes
+    # Indexes; the trailing id lets cursor pagination seek on (column, id)
     __table_args__ = (
         db.Index('idx_user_status', 'user_id', 'status'),
-        db.Index('idx_user_priority', 'user_id', 'priority'),
-        db.Index('idx_user_due_date', 'user_id', 'due_date'),
-        db.Index('idx_user_category', 'user_id', 'category'),
+        db.Index('idx_user_priority', 'user_id', 'priority', 'id'),
+        db.Index('idx_user_due_date', 'user_id', 'due_date', 'id'),
+        db.Index('idx_user_category', 'user_id', 'category', 'id'),
+        db.Index('idx_user_created_at', 'user_id', 'created_at', 'id'),
     )
 
     def __init__(self, **kwargs):
@@ -145,15 +147,40 @@ class Task(db.Model):
         return f'<Task {self.title}>'
 
 class TaskHistory(db.Model):
-    """Track task history for audit and analytics"""
+    """Track task history for audit and analytics (delta-encoded, see utils/task_history.py)"""
     __tablename__ = 'task_history'
 
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=False)
+    # Not a foreign key: history rows, including the 'deleted' snapshot, outlive their task
+    task_id = db.Column(db.String(36), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     action = db.Column(db.String(50), nullable=False)  # created, updated, completed, deleted
-    changes = db.Column(db.JSON)  # Store what changed
+    version = db.Column(db.Integer)  # 1, 2, ... per task
+    changes = db.Column(db.JSON)  # {'delta': changed columns} or {'snapshot': all columns}
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
-    task = db.relationship('Task', backref=db.backref('history', lazy=True))
-    user = db.relationship('User', backref=db.backref('task_history', lazy=True))
\ No newline at end of file
+    __table_args__ = (
+        db.Index('idx_task_history_task_version', 'task_id', 'version', unique=True),
+    )
+
+    task = db.relationship(
+        'Task', primaryjoin='foreign(TaskHistory.task_id) == Task.id', viewonly=True,
+        backref=db.backref('history', lazy=True, viewonly=True)
+    )
+    user = db.relationship('User', backref=db.backref('task_history', lazy=True))
+
+
+class TaskTag(db.Model):
+    """Normalized task tags (lower-cased), indexed for tag filters and counts"""
+    __tablename__ = 'task_tags'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    tag = db.Column(db.String(50), primary_key=True)
+    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True)
+
+    __table_args__ = (
+        db.Index('idx_task_tags_task', 'task_id'),
+    )
+
+    def __repr__(self):
+        return f'<TaskTag {self.tag} {self.task_id}>'
@@ -66,6 +66,18 @@ class User(db.Model):
 
         self.updated_at = datetime.utcnow()
 
+    def record_completions(self, count, total_impact=0):
+        """Batch form of update_stats('task_completed'); reassigns stats so the JSON change is saved"""
+        if not count:
+            return
+
+        stats = dict(self.stats or {})
+        completed = stats.get('completed_tasks', 0)
+        stats['completed_tasks'] = completed + count
+        stats['avg_impact'] = (stats.get('avg_impact', 0) * completed + total_impact) / (completed + count)
+        self.stats = stats
+        self.updated_at = datetime.utcnow()
+
     def to_dict(self):
         """Convert user object to dictionary"""
         return {
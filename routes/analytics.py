@@ -5,20 +5,26 @@ from controllers.analytics_controller import (
     get_priority_distribution, get_timeline_data,
     get_performance_metrics, get_productivity_score,
     get_ai_recommendations, get_optimization_tips,
-    get_risk_analysis, export_analytics_data
+    get_risk_analysis, export_analytics_data,
+    create_export_job, get_export_job, download_export_job,
+    get_analytics_bundle
 )
-from middleware.auth_middleware import jwt_required
+from middleware.auth_middleware import jwt_required, validate_request
+from utils.validators import ExportJobSchema
+from utils.cache import analytics_cache
 
 analytics_bp = Blueprint('analytics', __name__)
 
 @analytics_bp.route('/dashboard', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def dashboard_stats():
     """Get dashboard statistics"""
     return get_dashboard_stats(request.user)
 
 @analytics_bp.route('/completion-rate', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def completion_rate():
     """Get completion rate over time"""
     period = request.args.get('period', 'week')
@@ -26,54 +32,73 @@ def completion_rate():
 
 @analytics_bp.route('/category-breakdown', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def category_breakdown():
     """Get category breakdown"""
     return get_category_breakdown(request.user)
 
 @analytics_bp.route('/impact-analysis', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def impact_analysis():
     """Get impact analysis"""
     return get_impact_analysis(request.user)
 
 @analytics_bp.route('/priority-distribution', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def priority_distribution():
     """Get priority distribution"""
     return get_priority_distribution(request.user)
 
 @analytics_bp.route('/timeline', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def timeline():
     """Get timeline data"""
-    return get_timeline_data(request.user)
+    granularity = request.args.get('granularity', 'day')
+    return get_timeline_data(request.user, granularity)
 
 @analytics_bp.route('/performance', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def performance():
     """Get performance metrics"""
     return get_performance_metrics(request.user)
 
 @analytics_bp.route('/productivity', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def productivity():
     """Get productivity score"""
     return get_productivity_score(request.user)
 
+@analytics_bp.route('/bundle', methods=['GET'])
+@jwt_required
+@analytics_cache.cached
+def bundle():
+    """Get several analytics panels in one response"""
+    panels = request.args.get('panels')
+    granularity = request.args.get('granularity', 'day')
+    return get_analytics_bundle(request.user, panels, granularity)
+
 @analytics_bp.route('/ai/recommendations', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def ai_recommendations():
     """Get AI recommendations"""
     return get_ai_recommendations(request.user)
 
 @analytics_bp.route('/ai/optimization', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def optimization_tips():
     """Get optimization tips"""
     return get_optimization_tips(request.user)
 
 @analytics_bp.route('/ai/risk-analysis', methods=['GET'])
 @jwt_required
+@analytics_cache.cached
 def risk_analysis():
     """Get risk analysis"""
     return get_risk_analysis(request.user)
@@ -83,4 +108,25 @@ def risk_analysis():
 def export():
     """Export analytics data"""
     format_type = request.args.get('format', 'json')
-    return export_analytics_data(request.user, format_type)
\ No newline at end of file
+    envelope = request.args.get('envelope', 'false').lower() == 'true'
+    compression = request.args.get('compression')
+    return export_analytics_data(request.user, format_type, envelope, compression)
+
+@analytics_bp.route('/export/jobs', methods=['POST'])
+@jwt_required
+@validate_request(ExportJobSchema())
+def create_export():
+    """Queue a background export"""
+    return create_export_job(request.user, request.validated_data)
+
+@analytics_bp.route('/export/jobs/<job_id>', methods=['GET'])
+@jwt_required
+def export_status(job_id):
+    """Get export job status"""
+    return get_export_job(request.user, job_id)
+
+@analytics_bp.route('/export/jobs/<job_id>/download', methods=['GET'])
+@jwt_required
+def export_download(job_id):
+    """Download a finished export"""
+    return download_export_job(request.user, job_id)
\ No newline at end of file
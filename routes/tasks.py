@@ -4,14 +4,14 @@ from controllers.task_controller import (
     update_task, delete_task, update_task_status,
     update_task_progress, get_tasks_by_category,
     get_tasks_by_priority, get_overdue_tasks,
-    get_upcoming_tasks, get_task_insights,
-    bulk_create_tasks, bulk_delete_tasks
+    get_upcoming_tasks, get_task_insights, get_tag_counts,
+    bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks
 )
 from middleware.auth_middleware import jwt_required, validate_request
 from utils.validators import (
     CreateTaskSchema, UpdateTaskSchema,
     TaskStatusSchema, TaskProgressSchema,
-    BulkTaskSchema
+    BulkTaskSchema, BulkUpdateTaskSchema
 )
 
 tasks_bp = Blueprint('tasks', __name__)
@@ -34,16 +34,24 @@ def list_tasks():
         'priority': request.args.get('priority'),
         'category': request.args.get('category'),
         'tags': request.args.get('tags'),
+        'tag_match': request.args.get('tag_match'),
         'due_before': request.args.get('due_before'),
         'due_after': request.args.get('due_after'),
         'search': request.args.get('search'),
     }
-    sort_by = request.args.get('sort_by', 'priority')
     order = request.args.get('order', 'asc')
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
+    # Present (even empty) to page by key instead of by offset
+    cursor = request.args.get('cursor')
+    # Search results are ranked by relevance unless another sort is asked for;
+    # cursor pages cannot seek on a rank, so they keep the priority default
+    ranked = filters['search'] and cursor is None
+    sort_by = request.args.get('sort_by') or ('relevance' if ranked else 'priority')
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
 
-    return get_tasks(request.user, filters, sort_by, order, page, limit)
+    return get_tasks(request.user, filters, sort_by, order, page, limit, cursor, include_total,
+                     request.args.get('fields'))
 
 
 @tasks_bp.route('/<task_id>', methods=['GET'])
@@ -88,28 +96,35 @@ def update_progress(task_id):
 @jwt_required
 def by_category(category):
     """Get tasks by category"""
-    return get_tasks_by_category(request.user, category)
+    return get_tasks_by_category(request.user, category, request.args.get('fields'))
 
 
 @tasks_bp.route('/priority/<int:priority>', methods=['GET'])
 @jwt_required
 def by_priority(priority):
     """Get tasks by priority level"""
-    return get_tasks_by_priority(request.user, priority)
+    return get_tasks_by_priority(request.user, priority, request.args.get('fields'))
+
+
+@tasks_bp.route('/tags', methods=['GET'])
+@jwt_required
+def tags():
+    """Get tag usage counts"""
+    return get_tag_counts(request.user)
 
 
 @tasks_bp.route('/overdue', methods=['GET'])
 @jwt_required
 def overdue():
     """Get overdue tasks"""
-    return get_overdue_tasks(request.user)
+    return get_overdue_tasks(request.user, request.args.get('fields'))
 
 
 @tasks_bp.route('/upcoming', methods=['GET'])
 @jwt_required
 def upcoming():
     """Get upcoming tasks (next 7 days)"""
-    return get_upcoming_tasks(request.user)
+    return get_upcoming_tasks(request.user, request.args.get('fields'))
 
 
 @tasks_bp.route('/<task_id>/insights', methods=['GET'])
@@ -127,6 +142,15 @@ def bulk_create():
     return bulk_create_tasks(request.user, request.validated_data['tasks'])
 
 
+@tasks_bp.route('/bulk', methods=['PATCH'])
+@jwt_required
+@validate_request(BulkUpdateTaskSchema())
+def bulk_update():
+    """Apply one field patch to many tasks, by id or by the list filters"""
+    data = request.validated_data
+    return bulk_update_tasks(request.user, data['patch'], data.get('task_ids'), data.get('filter'))
+
+
 @tasks_bp.route('/bulk', methods=['DELETE'])
 @jwt_required
 def bulk_delete():
@@ -2,6 +2,9 @@
 from app import create_app
 from models.user import User
 from models.task import Task
+from utils.rollups import rebuild_rollups
+from utils.completion_sketches import rebuild_sketches
+from utils.task_tags import rebuild_task_tags
 from extensions import db  # Changed from utils.database
 from datetime import datetime, timedelta
 import random
@@ -103,6 +106,10 @@ def seed_database():
                     user.stats['completed_tasks'] = user.stats.get('completed_tasks', 0) + 1
                 user.stats['total_tasks'] = user.stats.get('total_tasks', 0) + 1
 
+        db.session.flush()
+        rebuild_rollups()
+        rebuild_sketches()
+        rebuild_task_tags()
         db.session.commit()
 
         print("✅ Database seeded successfully!")
@@ -0,0 +1,80 @@
+# services/ai_service.py
+"""
+Concurrent AI enrichment of task batches.
+
+analyze_tasks() fans the AI calls of a batch out over one process-wide
+thread pool. AI_MAX_CONCURRENCY caps the calls in flight across all
+requests. Each call is bounded by AI_REQUEST_TIMEOUT. Descriptions still
+pending after AI_BATCH_TIMEOUT get the default insights, so a batch takes
+about one AI latency instead of one per task. The OpenAI client keeps a
+pooled HTTP session per thread, so the workers reuse their connections.
+Identical descriptions in a batch are analyzed once.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+from utils.ai_helper import AIHelper
+
+logger = logging.getLogger(__name__)
+
+
+class AIEnrichment:
+    """Runs AI task analysis on a bounded, shared thread pool"""
+
+    def __init__(self, app=None, helper=None):
+        self.helper = helper or AIHelper()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_MAX_CONCURRENCY', 8)
+        app.config.setdefault('AI_REQUEST_TIMEOUT', 10)
+        app.config.setdefault('AI_BATCH_TIMEOUT', 15)
+        app.extensions['ai_enrichment'] = {'executor': None}
+
+    def _executor(self, app):
+        state = app.extensions['ai_enrichment']
+        with self._lock:
+            if state['executor'] is None:
+                state['executor'] = ThreadPoolExecutor(
+                    max_workers=max(int(app.config['AI_MAX_CONCURRENCY']), 1),
+                    thread_name_prefix='ai-enrichment'
+                )
+        return state['executor']
+
+    def _analyze(self, app, description):
+        with app.app_context():
+            return self.helper.analyze_task(description)
+
+    def analyze_tasks(self, descriptions):
+        """AI insights for each description, in order"""
+        app = current_app._get_current_object()
+        if not app.config.get('OPENAI_API_KEY'):
+            return [self.helper.analyze_task(description) for description in descriptions]
+
+        executor = self._executor(app)
+        futures = {
+            description: executor.submit(self._analyze, app, description)
+            for description in dict.fromkeys(descriptions) if description
+        }
+        done, pending = wait(futures.values(), timeout=float(app.config['AI_BATCH_TIMEOUT']))
+
+        if pending:
+            logger.warning('AI enrichment: %d of %d calls timed out, using default insights',
+                           len(pending), len(futures))
+            for future in pending:
+                future.cancel()
+
+        insights = {
+            description: future.result() if future in done else self.helper._get_default_insights()
+            for description, future in futures.items()
+        }
+        return [
+            dict(insights.get(description) or self.helper._get_default_insights())
+            for description in descriptions
+        ]
+
+
+ai_enrichment = AIEnrichment()
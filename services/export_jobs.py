@@ -0,0 +1,179 @@
+# services/export_jobs.py
+"""
+Background export jobs.
+
+Jobs are recorded in the export_jobs table, so any worker can report a job's
+status or serve its artifact. The export runs on a thread pool in the
+process that accepted it and writes to EXPORT_STORAGE_DIR. Finished and
+failed jobs are expired by the retention sweep after EXPORT_RETENTION_HOURS,
+and jobs still running after EXPORT_JOB_TIMEOUT_MINUTES (their worker died)
+are expired too; their files are deleted. Jobs still queued after that
+timeout are marked failed. The sweep runs whenever a job is
+submitted and through `flask sweep-exports`.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_
+from extensions import db
+from models.export_job import ExportJob
+from models.user import User
+from utils.export import iter_csv, iter_ndjson, gzip_chunks, write_pdf, export_filename
+
+logger = logging.getLogger(__name__)
+
+CHUNK_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+}
+
+
+def _extension(job):
+    return job.format + ('.gz' if job.compression == 'gzip' else '')
+
+
+class ExportJobRunner:
+    """Runs export jobs on a per-process thread pool"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EXPORT_STORAGE_DIR', os.path.join(app.instance_path, 'exports'))
+        app.config.setdefault('EXPORT_JOB_WORKERS', 2)  # 0 runs jobs inline
+        app.config.setdefault('EXPORT_RETENTION_HOURS', 24)
+        app.config.setdefault('EXPORT_JOB_TIMEOUT_MINUTES', 30)
+        app.extensions['export_jobs'] = {'executor': None}
+
+    def _executor(self, app):
+        state = app.extensions['export_jobs']
+        if state['executor'] is None:
+            state['executor'] = ThreadPoolExecutor(
+                max_workers=int(app.config['EXPORT_JOB_WORKERS']),
+                thread_name_prefix='export-job'
+            )
+        return state['executor']
+
+    def submit(self, user, format_type, compression=None):
+        """Record a queued job for user and schedule it; returns the job"""
+        app = current_app._get_current_object()
+        self.sweep()
+
+        job = ExportJob(user_id=user.id, format=format_type, compression=compression, status='queued')
+        db.session.add(job)
+        db.session.commit()
+
+        if int(app.config['EXPORT_JOB_WORKERS']) > 0:
+            self._executor(app).submit(self._run, app, job.id)
+        else:
+            self._run(app, job.id)
+            db.session.refresh(job)
+        return job
+
+    @staticmethod
+    def _artifact_path(app, job):
+        """Where a job's artifact goes; it is written to this path plus '.part' first"""
+        return os.path.join(app.config['EXPORT_STORAGE_DIR'], f'{job.id}.{_extension(job)}')
+
+    def _run(self, app, job_id):
+        with app.app_context():
+            job = db.session.get(ExportJob, job_id)
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+            path = self._artifact_path(app, job)
+            partial = path + '.part'
+
+            try:
+                os.makedirs(app.config['EXPORT_STORAGE_DIR'], exist_ok=True)
+                self._write_artifact(job, partial)
+                os.replace(partial, path)
+
+                now = datetime.utcnow()
+                job.status = 'completed'
+                job.file_path = path
+                job.filename = export_filename(_extension(job))
+                job.size_bytes = os.path.getsize(path)
+                job.finished_at = now
+                job.expires_at = now + timedelta(hours=app.config['EXPORT_RETENTION_HOURS'])
+
+            except Exception as e:
+                logger.exception('Export job %s failed', job_id)
+                if os.path.exists(partial):
+                    os.remove(partial)
+                db.session.rollback()
+                job = db.session.get(ExportJob, job_id)
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+
+            finally:
+                db.session.commit()
+                db.session.remove()
+
+    def _write_artifact(self, job, path):
+        user = db.session.get(User, job.user_id)
+
+        if job.format == 'pdf':
+            write_pdf(user, path)
+            if job.compression == 'gzip':
+                with open(path, 'rb') as source:
+                    data = source.read()
+                with open(path, 'wb') as target:
+                    for chunk in gzip_chunks([data]):
+                        target.write(chunk)
+            return
+
+        chunks = CHUNK_WRITERS[job.format](user.id)
+        if job.compression == 'gzip':
+            chunks = gzip_chunks(chunks)
+        with open(path, 'wb') as target:
+            for chunk in chunks:
+                target.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+
+    def sweep(self, now=None):
+        """
+        Expire finished jobs past retention and jobs running past the timeout.
+
+        Their artifacts (or partial files) are deleted and the jobs marked
+        expired. Jobs still queued past the timeout lost their worker before
+        it started them and are marked failed. Returns how many jobs changed.
+        """
+        app = current_app._get_current_object()
+        now = now or datetime.utcnow()
+        failed_before = now - timedelta(hours=app.config['EXPORT_RETENTION_HOURS'])
+        stalled_before = now - timedelta(minutes=app.config['EXPORT_JOB_TIMEOUT_MINUTES'])
+        expired = ExportJob.query.filter(or_(
+            and_(ExportJob.status == 'completed', ExportJob.expires_at < now),
+            and_(ExportJob.status == 'failed', ExportJob.finished_at < failed_before),
+            and_(ExportJob.status == 'running', ExportJob.started_at < stalled_before)
+        )).all()
+        abandoned = ExportJob.query.filter(
+            ExportJob.status == 'queued',
+            ExportJob.created_at < stalled_before
+        ).all()
+
+        for job in abandoned:
+            job.status = 'failed'
+            job.error = 'Export was never started'
+            job.finished_at = now
+
+        for job in expired:
+            for path in (job.file_path, self._artifact_path(app, job) + '.part'):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            if job.status == 'running':
+                job.error = 'Export timed out'
+                job.finished_at = now
+            job.status = 'expired'
+            job.file_path = None
+
+        if expired or abandoned:
+            db.session.commit()
+        return len(expired) + len(abandoned)
+
+
+export_jobs = ExportJobRunner()
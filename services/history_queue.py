@@ -0,0 +1,397 @@
+# services/history_queue.py
+"""
+Write-behind queue for task history.
+
+Opt-in with TASK_HISTORY_WRITE_BEHIND. Task writers then leave the history
+INSERT out of their request: record_history stashes the events on the
+session, and they are queued only once that transaction commits (a
+rollback drops them). A background flusher inserts the queue in batches
+of up to TASK_HISTORY_FLUSH_MAX_EVENTS, at least every
+TASK_HISTORY_FLUSH_INTERVAL_MS, in its own transaction.
+
+Every queued event is first appended to a per-process spool file in
+TASK_HISTORY_SPOOL_DIR. After each committed batch a marker line is
+appended; the spool is truncated whenever the queue drains, and rewritten
+with just the queued events once it outgrows SPOOL_COMPACT_BYTES. On start,
+spools left by processes that died (their file lock is free) are read back
+and their unflushed events queued again. Delivery is at-least-once: a
+crash between a batch's commit and its marker replays that batch.
+
+A batch that fails with a database error other than a connection error
+is split in halves until the failing events are isolated; those are
+appended to DEAD_LETTER_FILE in the spool directory and the rest are
+written. Connection errors leave the batch queued for a retry.
+
+The queue holds at most TASK_HISTORY_QUEUE_MAX_EVENTS. Room for a
+transaction's events is reserved before it commits: a writer that finds
+the queue full waits up to TASK_HISTORY_QUEUE_TIMEOUT seconds, then
+flushes batches itself. If that makes no room, the events are written
+synchronously in the writer's own transaction instead, unless events of
+the same tasks are still queued (their versions would come out of order):
+then HistoryQueueFull aborts the commit. Only events recovered from dead
+processes' spools may exceed the bound. The queue is drained at
+interpreter exit.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.exc import InterfaceError, OperationalError
+from extensions import db
+from utils.task_history import write_history
+
+try:
+    import fcntl
+except ImportError:  # no spool locking outside POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SPOOL_PATTERN = 'history-*.jsonl'
+
+# Events that cannot be written, one JSON line each with the error
+DEAD_LETTER_FILE = 'dead-letter.jsonl'
+
+# A spool larger than this is rewritten with only the events still queued
+SPOOL_COMPACT_BYTES = 4 * 1024 * 1024
+
+
+def _lock(handle):
+    """Take the exclusive lock of an open spool file; False when another process holds it"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _spool_line(seq, entry):
+    return json.dumps({'seq': seq, **entry, 'timestamp': entry['timestamp'].isoformat()})
+
+
+class HistoryQueueFull(RuntimeError):
+    """The history queue has no room and could not be flushed"""
+
+
+def _read_spool(handle):
+    """Unflushed events of a spool file, in order"""
+    events, flushed = [], 0
+    for line in handle:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # a line cut short by a crash
+        if 'flushed' in record:
+            flushed = max(flushed, record['flushed'])
+        else:
+            events.append(record)
+    return [record for record in events if record['seq'] > flushed]
+
+
+class HistoryQueue:
+    """One process's bounded history queue, its spool file and its flusher thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self.flush_interval = float(app.config['TASK_HISTORY_FLUSH_INTERVAL_MS']) / 1000
+        self.batch_size = max(int(app.config['TASK_HISTORY_FLUSH_MAX_EVENTS']), 1)
+        self.max_events = max(int(app.config['TASK_HISTORY_QUEUE_MAX_EVENTS']), self.batch_size)
+        self.put_timeout = float(app.config['TASK_HISTORY_QUEUE_TIMEOUT'])
+        self.fsync = app.config['TASK_HISTORY_SPOOL_FSYNC']
+
+        self._events = deque()  # (seq, entry), oldest first
+        self._reserved = 0  # room held for transactions about to commit
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+
+        spool_dir = app.config['TASK_HISTORY_SPOOL_DIR']
+        os.makedirs(spool_dir, exist_ok=True)
+        self.spool_path = os.path.join(spool_dir, f'history-{os.getpid()}.jsonl')
+        self.dead_letter_path = os.path.join(spool_dir, DEAD_LETTER_FILE)
+        self._spool = open(self.spool_path, 'a+', encoding='utf-8')
+        _lock(self._spool)
+        self._recover(spool_dir)
+
+        self._thread = threading.Thread(target=self._run, name='history-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._events)
+
+    # Producers
+
+    def defer(self, session, entries):
+        """Queue entries once session's transaction commits"""
+        session.info.setdefault('deferred_history', []).append((self, entries))
+
+    def reserve(self, count):
+        """
+        Hold room for count events, waiting and then flushing inline when full.
+
+        Returns False when no room could be made (the flush failed, or count
+        exceeds the queue); the caller must then not queue the events.
+        """
+        if count > self.max_events:
+            return False
+        deadline = time.monotonic() + self.put_timeout
+        while True:
+            with self._cond:
+                while self._free() < count and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        break
+                if self._free() >= count or self._closed:
+                    self._reserved += count
+                    return True
+
+            logger.warning('History queue full (%d events); flushing inline', len(self._events))
+            if not self.flush():
+                return False
+
+    def release(self, count):
+        """Give back room reserved for a transaction that rolled back"""
+        with self._cond:
+            self._reserved = max(self._reserved - count, 0)
+            self._cond.notify_all()
+
+    def write_through(self, entries):
+        """
+        Write entries in the current transaction instead of queueing them.
+
+        Raises HistoryQueueFull when events of the same tasks are still
+        queued, as the entries would be numbered before them.
+        """
+        task_ids = {entry['task_id'] for entry in entries}
+        with self._cond:
+            if any(entry['task_id'] in task_ids for seq, entry in self._events):
+                raise HistoryQueueFull(f'History queue full ({len(self._events)} events)')
+        logger.warning('History queue full; writing %d events synchronously', len(entries))
+        write_history(entries)
+
+    def put(self, entries, reserved=False):
+        """Spool and queue entries; without a reservation, raises HistoryQueueFull when there is no room"""
+        if not entries:
+            return
+        if not reserved and not self.reserve(len(entries)):
+            raise HistoryQueueFull(f'History queue full ({len(self._events)} events)')
+        self._append(entries, len(entries))
+
+    def _free(self):
+        return self.max_events - len(self._events) - self._reserved
+
+    def _append(self, entries, reserved):
+        with self._cond:
+            records = []
+            for entry in entries:
+                self._seq += 1
+                records.append((self._seq, entry))
+            self._write_spool(_spool_line(seq, entry) for seq, entry in records)
+            self._events.extend(records)
+            self._reserved = max(self._reserved - reserved, 0)
+            if len(self._events) >= self.batch_size or self._closed:
+                self._cond.notify_all()
+
+        if self._closed:
+            self.drain()
+
+    # Flushing
+
+    def flush(self):
+        """Insert the oldest batch; returns how many events left the queue (written or dead-lettered)"""
+        with self._flush_lock:
+            with self._cond:
+                batch = [self._events[i] for i in range(min(self.batch_size, len(self._events)))]
+            if not batch:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    handled, dead = self._insert(batch)
+                finally:
+                    db.session.remove()
+            if dead:
+                self._dead_letter(dead)
+            if not handled:
+                return 0
+
+            with self._cond:
+                for _ in range(handled):
+                    self._events.popleft()
+                if not self._events:
+                    self._spool.seek(0)
+                    self._spool.truncate()
+                elif self._spool.tell() > SPOOL_COMPACT_BYTES:
+                    self._rewrite_spool()
+                else:
+                    self._write_spool([json.dumps({'flushed': batch[handled - 1][0]})])
+                self._cond.notify_all()
+            return handled
+
+    def _insert(self, batch):
+        """
+        Write batch, splitting it in halves around failures.
+
+        Returns (handled, dead): how many leading events of batch were
+        written or given up on, and the (record, error) pairs given up on.
+        A connection error stops the batch there, to be retried.
+        """
+        handled, dead = 0, []
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                write_history([entry for seq, entry in part])
+                db.session.commit()
+            except (OperationalError, InterfaceError):
+                db.session.rollback()
+                logger.exception('Writing %d history events failed; will retry', len(part))
+                break
+            except Exception as e:
+                db.session.rollback()
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    parts.extend([part[middle:], part[:middle]])  # the first half is written first
+                    continue
+                logger.error('History event %d cannot be written, dead-lettered: %s', part[0][0], e)
+                dead.append((part[0], e))
+            handled += len(part)
+        return handled, dead
+
+    def _dead_letter(self, dead):
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as handle:
+            for (seq, entry), error in dead:
+                record = json.loads(_spool_line(seq, entry))
+                handle.write(json.dumps({**record, 'error': str(error)}) + '\n')
+
+    def drain(self):
+        """Flush until the queue is empty (or a batch fails)"""
+        while self.flush():
+            pass
+
+    def close(self):
+        """Stop the flusher and write out everything queued"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=10)
+        self.drain()
+        if not self._events:
+            os.remove(self.spool_path)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._events) >= self.batch_size, timeout=self.flush_interval
+                )
+                if self._closed:
+                    return
+            self.drain()
+
+    # Spool
+
+    def _write_spool(self, lines):
+        self._spool.seek(0, os.SEEK_END)
+        self._spool.writelines(line + '\n' for line in lines)
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def _rewrite_spool(self):
+        """Replace the spool with one holding only the queued events (caller holds the condition)"""
+        partial = self.spool_path + '.tmp'
+        handle = open(partial, 'w+', encoding='utf-8')
+        _lock(handle)  # the lock moves with the file, so no other process can claim it
+        handle.writelines(_spool_line(seq, entry) + '\n' for seq, entry in self._events)
+        handle.flush()
+        os.fsync(handle.fileno())
+        os.replace(partial, self.spool_path)
+        self._spool.close()
+        self._spool = handle
+
+    def _recover(self, spool_dir):
+        """Queue the unflushed events of spools whose process is gone, moving them into this spool"""
+        recovered = []
+        for path in sorted(glob.glob(os.path.join(spool_dir, SPOOL_PATTERN))):
+            if path == self.spool_path:
+                self._spool.seek(0)
+                recovered.extend(_read_spool(self._spool))  # a previous process with this pid
+                self._spool.seek(0)
+                self._spool.truncate()
+                continue
+            with open(path, 'r', encoding='utf-8') as handle:
+                if not _lock(handle):
+                    continue  # a live process owns it
+                recovered.extend(_read_spool(handle))
+            os.remove(path)
+
+        if recovered:
+            logger.info('Recovered %d spooled history events', len(recovered))
+            entries = []
+            for record in recovered:
+                del record['seq']
+                record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+                entries.append(record)
+            self._append(entries, 0)  # already on disk: may exceed the bound
+
+
+@event.listens_for(db.session, 'before_commit')
+def _reserve_deferred_history(session):
+    reserved = session.info.setdefault('reserved_history', [])
+    for queue, entries in session.info.pop('deferred_history', ()):
+        if queue.reserve(len(entries)):
+            reserved.append((queue, entries))
+        else:
+            queue.write_through(entries)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _queue_deferred_history(session):
+    for queue, entries in session.info.pop('reserved_history', ()):
+        queue.put(entries, reserved=True)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _drop_deferred_history(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('deferred_history', None)
+        for queue, entries in session.info.pop('reserved_history', ()):
+            queue.release(len(entries))
+
+
+class HistoryWriteBehind:
+    """Flask extension that installs a HistoryQueue when TASK_HISTORY_WRITE_BEHIND is on"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TASK_HISTORY_WRITE_BEHIND', False)
+        app.config.setdefault('TASK_HISTORY_FLUSH_INTERVAL_MS', 200)
+        app.config.setdefault('TASK_HISTORY_FLUSH_MAX_EVENTS', 500)
+        app.config.setdefault('TASK_HISTORY_QUEUE_MAX_EVENTS', 10000)
+        app.config.setdefault('TASK_HISTORY_QUEUE_TIMEOUT', 5)
+        app.config.setdefault('TASK_HISTORY_SPOOL_DIR', os.path.join(app.instance_path, 'history-spool'))
+        app.config.setdefault('TASK_HISTORY_SPOOL_FSYNC', False)
+
+        previous = app.extensions.get('history_queue')
+        if previous is not None:
+            previous.close()
+        app.extensions['history_queue'] = HistoryQueue(app) if app.config['TASK_HISTORY_WRITE_BEHIND'] else None
+
+
+history_writer = HistoryWriteBehind()
@@ -0,0 +1,81 @@
+# tests/conftest.py
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+# The app reads DATABASE_URL at import time, so point it at a throwaway database first
+os.environ['DATABASE_URL'] = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models.user import User  # noqa: E402
+from models.task import Task  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config['TESTING'] = True
+    # Shared cache versions go to a throwaway file, not the instance folder
+    app.config['ANALYTICS_CACHE_PATH'] = str(tmp_path / 'analytics_cache.sqlite3')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    with app.app_context():
+        user = User(
+            id=str(uuid.uuid4()),
+            email='tester@example.com',
+            username='tester',
+            name='Test User'
+        )
+        user.set_password('test123')
+        db.session.add(user)
+        db.session.commit()
+        db.session.refresh(user)
+        db.session.expunge(user)
+    return user
+
+
+@pytest.fixture
+def auth_headers(app, user):
+    with app.app_context():
+        token = create_access_token(identity=user.id)
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def make_tasks(app, user):
+    """Insert count tasks for the test user; keyword arguments override column values"""
+    def _make(count=1, **fields):
+        now = datetime.utcnow()
+        with app.app_context():
+            tasks = []
+            for i in range(count):
+                values = {
+                    'id': str(uuid.uuid4()),
+                    'user_id': user.id,
+                    'title': f'Task {i}',
+                    'description': f'Description {i}',
+                    'due_date': now + timedelta(days=7),
+                    'created_at': now,
+                }
+                values.update(fields)
+                tasks.append(Task(**values))
+            db.session.add_all(tasks)
+            db.session.commit()
+            return [task.id for task in tasks]
+
+    return _make
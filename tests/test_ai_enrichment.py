@@ -0,0 +1,70 @@
+# tests/test_ai_enrichment.py
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.fake_ai import FakeAIServer, INSIGHTS, SLOW_MARKER
+from controllers.task_controller import bulk_create_tasks
+from extensions import db
+from models.user import User
+from services.ai_service import ai_enrichment
+
+
+@pytest.fixture
+def fake_ai(app):
+    with FakeAIServer(latency=0.3, slow_latency=5) as server:
+        app.config.update(OPENAI_API_KEY='test-key', OPENAI_API_BASE=server.base_url)
+        yield server
+
+
+def test_batch_takes_about_one_latency(app, fake_ai):
+    app.config['AI_MAX_CONCURRENCY'] = 16
+    descriptions = [f'Task number {i}' for i in range(12)]
+
+    with app.app_context():
+        started = time.perf_counter()
+        insights = ai_enrichment.analyze_tasks(descriptions)
+        elapsed = time.perf_counter() - started
+
+    assert len(insights) == 12
+    assert all(item['complexity_score'] == INSIGHTS['complexity_score'] for item in insights)
+    assert fake_ai.requests == 12
+    assert fake_ai.max_in_flight > 1
+    assert elapsed < 12 * fake_ai.latency / 2
+
+
+def test_concurrency_is_capped(app, fake_ai):
+    app.config['AI_MAX_CONCURRENCY'] = 3
+
+    with app.app_context():
+        ai_enrichment.analyze_tasks([f'Task number {i}' for i in range(9)])
+
+    assert fake_ai.max_in_flight <= 3
+
+
+def test_stragglers_get_default_insights(app, fake_ai):
+    app.config.update(AI_MAX_CONCURRENCY=4, AI_REQUEST_TIMEOUT=1, AI_BATCH_TIMEOUT=1)
+
+    with app.app_context():
+        started = time.perf_counter()
+        fast, slow, empty = ai_enrichment.analyze_tasks(['Quick task', f'Stuck task {SLOW_MARKER}', ''])
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 3
+    assert fast['confidence_score'] == INSIGHTS['confidence_score']
+    assert slow == empty == ai_enrichment.helper._get_default_insights()
+
+
+def test_bulk_create_enriches_every_task(app, user, fake_ai):
+    app.config['AI_MAX_CONCURRENCY'] = 8
+    due = (datetime.utcnow() + timedelta(days=3)).isoformat()
+    tasks = [{'title': f'Task {i}', 'description': f'Describe {i % 3}', 'due_date': due} for i in range(6)]
+
+    with app.test_request_context():
+        response, status = bulk_create_tasks(db.session.get(User, user.id), tasks)
+
+    assert status == 201
+    data = response.get_json()['data']
+    assert all(task['ai_insights']['estimated_completion_time'] == INSIGHTS['estimated_hours'] for task in data)
+    assert fake_ai.requests == 3  # identical descriptions are analyzed once
@@ -0,0 +1,200 @@
+# tests/test_analytics.py
+from datetime import datetime, timedelta
+
+from extensions import db
+from middleware.query_stats import assert_max_queries
+from utils.rollups import rebuild_rollups
+
+
+API = '/api/v1/analytics'
+
+
+def test_dashboard_stats_values(client, auth_headers, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(2, priority=1, impact=8, status='pending')
+    make_tasks(1, priority=2, impact=4, status='in-progress', due_date=now - timedelta(days=1))
+    make_tasks(1, priority=5, impact=6, status='completed',
+               started_at=now - timedelta(hours=5), completed_at=now - timedelta(hours=1))
+
+    response = client.get(f'{API}/dashboard', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['total_tasks'] == 4
+    assert data['completed_tasks'] == 1
+    assert data['pending_tasks'] == 2
+    assert data['in_progress_tasks'] == 1
+    assert data['overdue_tasks'] == 1
+    assert data['avg_completion_time'] == 4.0
+    assert data['avg_impact'] == 6.5
+    assert data['completion_rate'] == 25.0
+    assert data['priority_distribution'] == {
+        'priority_1': 2, 'priority_2': 1, 'priority_3': 0, 'priority_4': 0, 'priority_5': 1
+    }
+
+
+def test_dashboard_stats_empty(client, auth_headers):
+    response = client.get(f'{API}/dashboard', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['total_tasks'] == 0
+    assert data['avg_completion_time'] == 0
+    assert data['priority_distribution']['priority_3'] == 0
+
+
+def test_dashboard_stats_query_count(client, auth_headers, make_tasks):
+    make_tasks(25, status='completed', started_at=datetime.utcnow() - timedelta(hours=2),
+               completed_at=datetime.utcnow())
+    make_tasks(25, status='pending')
+
+    # One statement to load the user, one for every dashboard aggregate
+    with assert_max_queries(2):
+        response = client.get(f'{API}/dashboard', headers=auth_headers)
+
+    assert response.status_code == 200
+
+
+def test_completion_rate_year_has_one_bucket_per_month(app, client, auth_headers, user, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(2, status='completed', impact=4, completed_at=now)
+    make_tasks(1, status='completed', impact=10, completed_at=now - timedelta(days=45))
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+    with assert_max_queries(2):
+        response = client.get(f'{API}/completion-rate?period=year', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    months = [bucket['date'] for bucket in data['timeline']]
+    assert len(months) == len(set(months)) == 13
+    assert months == sorted(months)
+    assert months[-1] == now.strftime('%Y-%m')
+    assert data['timeline'][-1] == {'date': now.strftime('%Y-%m'), 'completed_tasks': 2, 'avg_impact': 4.0}
+    assert data['total_completed'] == 3
+
+
+def test_risk_analysis_counts_and_titles(client, auth_headers, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(4, status='pending', priority=3, due_date=now - timedelta(days=2))
+    make_tasks(2, status='pending', priority=1, due_date=now + timedelta(days=3))
+    make_tasks(1, status='completed', priority=1, due_date=now - timedelta(days=1))
+    make_tasks(1, status='pending', priority=4, due_date=now + timedelta(days=30))
+
+    # User, one aggregate, one title query per reported risk
+    with assert_max_queries(5):
+        response = client.get(f'{API}/ai/risk-analysis', headers=auth_headers)
+
+    assert response.status_code == 200
+    risks = {risk['type']: risk for risk in response.get_json()['data']['risks']}
+    assert risks['overdue']['message'] == '4 tasks are overdue'
+    assert len(risks['overdue']['tasks']) == 3
+    assert risks['high_priority_pending']['message'] == '2 critical priority tasks pending'
+    assert len(risks['high_priority_pending']['tasks']) == 2
+    assert risks['upcoming_deadlines']['message'] == '6 tasks due within 7 days'
+    assert response.get_json()['data']['risk_score'] == 60
+
+
+def test_risk_analysis_empty(client, auth_headers):
+    response = client.get(f'{API}/ai/risk-analysis', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['risks'] == []
+    assert data['risk_level'] == 'Low'
+
+
+def test_optimization_tips_from_aggregates(client, auth_headers, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(2, status='pending', due_date=now - timedelta(days=1), estimated_hours=12)
+    for category in ('Work', 'Personal', 'Health', 'Finance', 'Learning', 'Other'):
+        make_tasks(1, category=category, due_date=now + timedelta(days=5))
+
+    with assert_max_queries(2):
+        response = client.get(f'{API}/ai/optimization', headers=auth_headers)
+
+    assert response.status_code == 200
+    tips = response.get_json()['data']['tips']
+    assert tips[0] == 'You have 2 overdue tasks. Consider rescheduling or breaking them down.'
+    assert tips[1].startswith('You have tasks in many different categories')
+    assert tips[2].startswith('You have 2 tasks estimated over 8 hours')
+
+
+def test_productivity_score_single_statement(app, client, auth_headers, user, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(2, status='completed', impact=6, due_date=now + timedelta(days=1),
+               completed_at=now - timedelta(days=2))
+    make_tasks(1, status='completed', impact=2, due_date=now - timedelta(days=5),
+               completed_at=now - timedelta(days=3))
+    make_tasks(1, status='pending', impact=4)
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+    # One statement to load the user, one for totals and the 7-day histogram
+    with assert_max_queries(2):
+        response = client.get(f'{API}/productivity', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['components'] == {
+        'completion_rate': 75.0,
+        'on_time_rate': 66.67,
+        'impact_efficiency': 77.78,
+        'consistency_score': 28.57
+    }
+    assert sum(data['daily_completions']) == 3
+    assert data['recommendations'] == ['Improve time management - try setting realistic deadlines']
+
+
+def test_productivity_counts_todays_completions(client, auth_headers, make_tasks):
+    for task_id in make_tasks(3):
+        client.patch(f'/api/v1/tasks/{task_id}/status', json={'status': 'completed'}, headers=auth_headers)
+
+    data = client.get(f'{API}/productivity', headers=auth_headers).get_json()['data']
+
+    assert data['daily_completions'] == [0, 0, 0, 0, 0, 0, 3]
+    assert data['components']['consistency_score'] == 14.29
+
+
+def test_priority_distribution_grouped(client, auth_headers, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(1, priority=1, impact=8, status='completed',
+               started_at=now - timedelta(hours=6), completed_at=now - timedelta(hours=2))
+    make_tasks(1, priority=1, impact=6, status='completed',
+               started_at=now - timedelta(hours=10), completed_at=now - timedelta(hours=2))
+    make_tasks(2, priority=1, impact=4, status='pending')
+    make_tasks(3, priority=4, impact=5, status='in-progress')
+
+    with assert_max_queries(2):
+        response = client.get(f'{API}/priority-distribution', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['total_tasks'] == 7
+    assert data['priorities'][0] == {
+        'priority_level': 1, 'count': 4, 'avg_impact': 5.5, 'completion_rate': 50.0, 'avg_completion_time': 6.0
+    }
+    assert data['priorities'][1] == {
+        'priority_level': 2, 'count': 0, 'avg_impact': 0, 'completion_rate': 0, 'avg_completion_time': 0
+    }
+    assert data['priorities'][3]['count'] == 3
+
+
+def test_impact_analysis_grouped(client, auth_headers, make_tasks):
+    make_tasks(3, impact=9, priority=2)
+    make_tasks(1, impact=2)
+
+    # User, impact histogram, high impact titles, recent average, overall average
+    with assert_max_queries(5):
+        response = client.get(f'{API}/impact-analysis', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['impact_distribution'] == {
+        '1': 0, '2': 1, '3': 0, '4': 0, '5': 0, '6': 0, '7': 0, '8': 0, '9': 3, '10': 0
+    }
+    assert len(data['high_impact_tasks']) == 3
+    assert data['overall_avg_impact'] == 7.25
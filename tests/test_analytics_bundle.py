@@ -0,0 +1,112 @@
+# tests/test_analytics_bundle.py
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from extensions import db
+from middleware.query_stats import assert_max_queries, capture_queries
+from models.task import Task
+from models.user import User
+from utils.rollups import rebuild_rollups
+
+
+API = '/api/v1/analytics'
+PANELS = ['dashboard', 'category-breakdown', 'impact-analysis', 'priority-distribution',
+          'timeline', 'performance', 'productivity']
+
+
+def _seed(app, user_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        for i in range(12):
+            status = ['pending', 'in-progress', 'completed'][i % 3]
+            db.session.add(Task(
+                id=str(uuid.uuid4()), user_id=user_id, title=f'Task {i}',
+                category=['Work', 'Personal', 'Health'][i % 3],
+                priority=i % 5 + 1, impact=i % 10 + 1, status=status,
+                due_date=now + timedelta(days=i - 4), created_at=now - timedelta(days=i),
+                started_at=now - timedelta(days=i, hours=-1) if status == 'completed' else None,
+                completed_at=now - timedelta(days=i // 2) if status == 'completed' else None
+            ))
+        db.session.flush()
+        rebuild_rollups(user_id)
+        db.session.commit()
+
+
+def test_bundle_matches_individual_endpoints(app, client, auth_headers, user):
+    app.config['ANALYTICS_CACHE_ENABLED'] = False
+    _seed(app, user.id)
+
+    expected = {}
+    with capture_queries() as separate:
+        for panel in PANELS:
+            response = client.get(f'{API}/{panel}', headers=auth_headers)
+            assert response.status_code == 200, panel
+            expected[panel] = response.get_json()['data']
+
+    with assert_max_queries(len(separate) - 1) as statements:
+        response = client.get(f'{API}/bundle', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == expected
+    # One user load, and shared sources are only queried once
+    assert sum('FROM users' in statement for statement in statements) == 1
+    assert sum('FROM user_daily_stats' in statement for statement in statements) == 2
+
+
+def test_bundle_selected_panels(client, auth_headers):
+    response = client.get(f'{API}/bundle?panels=dashboard, timeline&granularity=week', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert list(data) == ['dashboard', 'timeline']
+    assert data['timeline']['granularity'] == 'week'
+
+
+def test_bundle_rejects_unknown_panels(client, auth_headers):
+    response = client.get(f'{API}/bundle?panels=dashboard,weather', headers=auth_headers)
+
+    assert response.status_code == 400
+    assert 'weather' in response.get_json()['message']
+
+
+def test_bundle_runs_sources_on_pooled_connections(tmp_path, monkeypatch):
+    # In-memory SQLite shares one connection, so use a file database with a real pool
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "bundle.db"}')
+    from app import create_app
+
+    app = create_app()
+    app.config.update(TESTING=True, ANALYTICS_CACHE_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        user = User(id=str(uuid.uuid4()), email='pool@example.com', name='Pool User')
+        user.set_password('test123')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    _seed(app, user_id)
+
+    threads = set()
+    with app.app_context():
+        engine = db.engine
+
+    def _record(*args):
+        threads.add(threading.get_ident())
+
+    client = app.test_client()
+    app.config['ANALYTICS_BUNDLE_WORKERS'] = 0
+    inline = client.get(f'{API}/bundle', headers=headers).get_json()['data']
+
+    app.config['ANALYTICS_BUNDLE_WORKERS'] = 4
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        concurrent = client.get(f'{API}/bundle', headers=headers).get_json()['data']
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
+
+    assert concurrent == inline
+    assert len(threads) > 1
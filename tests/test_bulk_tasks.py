@@ -0,0 +1,256 @@
+# tests/test_bulk_tasks.py
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from middleware.query_stats import assert_max_queries
+from models.analytics import UserDailyStats
+from models.task import Task, TaskHistory, TaskTag
+from models.user import User
+from utils.completion_sketches import rebuild_sketches, user_sketches
+from utils.database import sqlite_max_parameters
+from utils.rollups import rebuild_rollups
+
+
+API = '/api/v1/tasks/bulk'
+
+
+def _due(days=3):
+    return (datetime.utcnow() + timedelta(days=days)).isoformat()
+
+
+def test_bulk_create_reports_invalid_rows_and_creates_the_rest(app, client, auth_headers, user):
+    response = client.post(API, json={'tasks': [
+        {'title': 'Valid', 'due_date': _due(), 'tags': ['import']},
+        {'title': '', 'due_date': _due()},
+        {'title': 'Past', 'due_date': _due(-3)},
+        {'title': 'Also valid', 'due_date': _due(), 'priority': 1, 'status': 'completed'},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['count'] == 2
+    assert [row['index'] for row in body['failed']] == [1, 2]
+    assert 'title' in body['failed'][0]['errors']
+    assert 'due_date' in body['failed'][1]['errors']
+
+    with app.app_context():
+        tasks = Task.query.order_by(Task.title).all()
+        assert [task.title for task in tasks] == ['Also valid', 'Valid']
+        assert isinstance(tasks[0].due_date, datetime)
+        assert TaskHistory.query.filter_by(action='created').count() == 2
+        assert [row.tag for row in TaskTag.query] == ['import']
+        assert db.session.get(User, user.id).stats['total_tasks'] == 2
+
+        stats = UserDailyStats.query.filter_by(user_id=user.id).one()
+        assert (stats.tasks_created, stats.tasks_completed, stats.high_priority_created) == (2, 1, 1)
+
+
+def test_bulk_create_rejects_a_batch_without_valid_rows(client, auth_headers):
+    response = client.post(API, json={'tasks': [{'title': 'No due date'}]}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['failed'][0]['index'] == 0
+
+
+def test_bulk_create_returns_timestamps_like_single_create(client, auth_headers):
+    single = client.post('/api/v1/tasks', json={'title': 'One', 'due_date': _due()}, headers=auth_headers)
+    bulk = client.post(API, json={'tasks': [{'title': 'Many', 'due_date': _due()}]}, headers=auth_headers)
+
+    single_task, bulk_task = single.get_json()['data'], bulk.get_json()['data'][0]
+    for field in ('created_at', 'updated_at'):
+        assert datetime.fromisoformat(bulk_task[field]).tzinfo is None
+        assert datetime.fromisoformat(single_task[field]).tzinfo is None
+
+
+def test_sqlite_parameter_limit_follows_the_library_version():
+    assert sqlite_max_parameters((3, 31, 1)) == 999
+    assert sqlite_max_parameters((3, 32, 0)) == 32766
+
+
+def test_bulk_create_uses_set_based_statements(app, client, auth_headers):
+    tasks = [{'title': f'Task {i}', 'due_date': _due(), 'tags': ['bulk']} for i in range(1500)]
+
+    # Loading the user (twice), 2 task and 2 history chunks, rollup, tags and the stats update
+    with assert_max_queries(9):
+        response = client.post(API, json={'tasks': tasks}, headers=auth_headers)
+
+    assert response.status_code == 201
+    with app.app_context():
+        assert Task.query.count() == 1500
+        assert TaskHistory.query.count() == 1500
+
+
+def test_bulk_delete_logs_history_and_updates_derived_state(app, client, auth_headers, user, make_tasks):
+    created = client.post(API, json={'tasks': [
+        {'title': 'Keep', 'due_date': _due(), 'tags': ['keep']},
+        {'title': 'Drop', 'due_date': _due(), 'tags': ['drop'], 'priority': 1},
+    ]}, headers=auth_headers).get_json()['data']
+    keep_id, drop_id = (task['id'] for task in created)
+    now = datetime.utcnow()
+    timed = make_tasks(2, category='Work', status='completed', started_at=now - timedelta(hours=2), completed_at=now)
+    with app.app_context():
+        rebuild_rollups(user.id)
+        rebuild_sketches(user.id)
+        db.session.commit()
+
+    response = client.delete(API, json={'task_ids': [drop_id, timed[0], drop_id, 'missing']}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert sorted(response.get_json()['data']['deleted_task_ids']) == sorted([drop_id, timed[0]])
+    with app.app_context():
+        assert {task.id for task in Task.query} == {keep_id, timed[1]}
+        assert [row.tag for row in TaskTag.query] == ['keep']
+        assert user_sketches(user.id)['Work'].count == 1
+
+        history = TaskHistory.query.filter_by(task_id=drop_id, action='deleted').one()
+        snapshot = history.changes['snapshot']
+        assert (snapshot['title'], snapshot['priority'], snapshot['tags']) == ('Drop', 1, ['drop'])
+
+        stats = UserDailyStats.query.filter_by(user_id=user.id).one()
+        assert (stats.tasks_created, stats.tasks_completed, stats.high_priority_created) == (2, 1, 0)
+
+
+def test_bulk_delete_only_touches_the_users_tasks(app, client, auth_headers):
+    with app.app_context():
+        other = User(id=str(uuid.uuid4()), email='other@example.com', username='other', name='Other')
+        other.set_password('secret')
+        db.session.add(other)
+        task = Task(user_id=other.id, title='Not yours', due_date=datetime.utcnow() + timedelta(days=1))
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    response = client.delete(API, json={'task_ids': [task_id]}, headers=auth_headers)
+
+    assert response.status_code == 404
+    with app.app_context():
+        assert db.session.get(Task, task_id) is not None
+        assert TaskHistory.query.count() == 0
+
+
+def test_bulk_delete_uses_set_based_statements(app, client, auth_headers, make_tasks):
+    task_ids = make_tasks(6000)
+
+    # Loading the user (twice), 2 chunks of history INSERT ... SELECT, DELETE ... RETURNING and tag cleanup, the rollup
+    with assert_max_queries(9):
+        response = client.delete(API, json={'task_ids': task_ids}, headers=auth_headers)
+
+    assert response.get_json()['data']['count'] == 6000
+    with app.app_context():
+        assert Task.query.count() == 0
+        assert TaskHistory.query.filter_by(action='deleted').count() == 6000
+
+
+def test_delete_task_keeps_its_history(app, client, auth_headers):
+    task_id = client.post(API, json={'tasks': [{'title': 'Short lived', 'due_date': _due()}]},
+                          headers=auth_headers).get_json()['data'][0]['id']
+
+    assert client.delete(f'/api/v1/tasks/{task_id}', headers=auth_headers).status_code == 200
+    assert client.delete(f'/api/v1/tasks/{task_id}', headers=auth_headers).status_code == 404
+    with app.app_context():
+        assert [row.action for row in TaskHistory.query.filter_by(task_id=task_id).order_by(TaskHistory.id)] == [
+            'created', 'deleted'
+        ]
+
+
+def test_bulk_update_by_ids_applies_status_side_effects(app, client, auth_headers, user):
+    created = client.post(API, json={'tasks': [
+        {'title': 'Open', 'due_date': _due(), 'impact': 4},
+        {'title': 'Done', 'due_date': _due(), 'impact': 8, 'status': 'completed'},
+        {'title': 'Untouched', 'due_date': _due()},
+    ]}, headers=auth_headers).get_json()['data']
+    open_id, done_id, untouched_id = (task['id'] for task in created)
+
+    response = client.patch(API, json={
+        'task_ids': [open_id, done_id], 'patch': {'status': 'completed', 'priority': 1}
+    }, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['count'] == 2
+    with app.app_context():
+        tasks = {task.id: task for task in Task.query}
+        assert (tasks[open_id].status, tasks[open_id].progress, tasks[open_id].priority) == ('completed', 100, 1)
+        assert tasks[open_id].completed_at is not None
+        assert tasks[done_id].completed_at is None  # already completed: no new completion
+        assert tasks[untouched_id].priority == 3
+
+        history = TaskHistory.query.filter_by(task_id=open_id, action='updated').one()
+        assert history.version == 2
+        assert set(history.changes['delta']) == {'status', 'priority', 'progress', 'completed_at'}
+        assert TaskHistory.query.filter_by(action='updated').count() == 2
+
+        stats = UserDailyStats.query.filter_by(user_id=user.id).one()
+        assert (stats.tasks_completed, stats.high_priority_created, stats.impact_completed) == (2, 2, 12)
+        user_stats = db.session.get(User, user.id).stats
+        assert (user_stats['completed_tasks'], user_stats['avg_impact']) == (1, 4)
+
+
+def test_bulk_update_by_filter(app, client, auth_headers, make_tasks):
+    make_tasks(3, category='Work')
+    make_tasks(2, category='Health')
+    due = datetime.utcnow() + timedelta(days=30)
+
+    response = client.patch(API, json={
+        'filter': {'category': 'Work'}, 'patch': {'category': 'Career', 'due_date': due.isoformat()}
+    }, headers=auth_headers)
+
+    assert response.get_json()['data']['count'] == 3
+    with app.app_context():
+        assert sorted(task.category for task in Task.query) == ['Career'] * 3 + ['Health'] * 2
+        assert all(task.due_date.date() == due.date() for task in Task.query.filter_by(category='Career'))
+
+
+@pytest.mark.parametrize('body', [
+    {'patch': {'status': 'completed'}},
+    {'task_ids': ['x'], 'filter': {}, 'patch': {'status': 'completed'}},
+    {'task_ids': ['x'], 'patch': {'title': 'Not bulk-editable'}},
+    {'task_ids': ['x'], 'patch': {'status': 'finished'}},
+])
+def test_bulk_update_validation(client, auth_headers, body):
+    assert client.patch(API, json=body, headers=auth_headers).status_code == 400
+
+
+@pytest.mark.parametrize('task_filter, field', [
+    ({'statuss': 'pending'}, 'statuss'),
+    ({}, '_schema'),
+    ({'tag_match': 'all'}, '_schema'),
+    ({'priority': 'abc'}, 'priority'),
+    ({'status': 'finished'}, 'status'),
+    ({'due_before': 'next week'}, 'due_before'),
+])
+def test_bulk_update_rejects_bad_filters(app, client, auth_headers, make_tasks, task_filter, field):
+    make_tasks(3)
+
+    response = client.patch(API, json={'filter': task_filter, 'patch': {'priority': 1}}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert field in response.get_json()['errors']['filter']
+    with app.app_context():
+        assert Task.query.filter_by(priority=1).count() == 0
+
+
+def test_bulk_update_by_due_date_filter(app, client, auth_headers, make_tasks):
+    make_tasks(2, due_date=datetime.utcnow() + timedelta(days=2))
+    make_tasks(3, due_date=datetime.utcnow() + timedelta(days=20))
+
+    response = client.patch(API, json={
+        'filter': {'due_before': _due(10)}, 'patch': {'priority': 1}
+    }, headers=auth_headers)
+
+    assert response.get_json()['data']['count'] == 2
+
+
+def test_bulk_update_uses_set_based_statements(app, client, auth_headers, make_tasks):
+    task_ids = make_tasks(3000)
+
+    # Loading the user (twice), the SELECT, one UPDATE, history versions and 3 chunks, the rollup and the stats update
+    with assert_max_queries(10):
+        response = client.patch(API, json={'task_ids': task_ids, 'patch': {'status': 'completed'}},
+                                headers=auth_headers)
+
+    assert response.get_json()['data']['count'] == 3000
+    with app.app_context():
+        assert Task.query.filter_by(status='completed', progress=100).count() == 3000
@@ -0,0 +1,128 @@
+# tests/test_cache.py
+import os
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from middleware.query_stats import assert_max_queries
+from utils.cache import MemoryCacheBackend, SQLiteCacheBackend, analytics_cache
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')
+    backend.set('c', 3, ttl=60)
+
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+    assert backend.get('c') == 3
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryCacheBackend()
+    backend.set('a', {'x': 1}, ttl=-1)
+
+    assert backend.get('a') is None
+    assert len(backend) == 0
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    worker_a = SQLiteCacheBackend(path, max_entries=2)
+    worker_b = SQLiteCacheBackend(path, max_entries=2)
+
+    worker_a.set('key', {'total': 3}, ttl=60)
+    assert worker_b.get('key') == {'total': 3}
+
+    assert worker_a.incr('version:u1') == 1
+    assert worker_b.incr('version:u1') == 2
+    assert worker_a.get_counter('version:u1') == 2
+
+    time.sleep(0.01)
+    worker_b.set('second', 2, ttl=60)
+    time.sleep(0.01)
+    worker_b.set('third', 3, ttl=60)
+    assert len(worker_a) == 2
+    assert worker_a.get('key') is None
+
+
+def test_dashboard_is_served_from_cache_until_a_write(app, client, auth_headers, make_tasks):
+    make_tasks(3)
+
+    first = client.get('/api/v1/analytics/dashboard', headers=auth_headers)
+    with assert_max_queries(1):  # loading the user
+        second = client.get('/api/v1/analytics/dashboard', headers=auth_headers)
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+
+    created = client.post('/api/v1/tasks', headers=auth_headers, json={
+        'title': 'New task', 'due_date': (datetime.utcnow() + timedelta(days=2)).isoformat() + 'Z'
+    })
+    assert created.status_code == 201
+
+    third = client.get('/api/v1/analytics/dashboard', headers=auth_headers)
+    assert third.headers['X-Cache'] == 'MISS'
+    assert third.get_json()['data']['total_tasks'] == 4
+
+    with app.app_context():
+        stats = analytics_cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+
+def test_query_params_are_part_of_the_key(client, auth_headers):
+    week = client.get('/api/v1/analytics/completion-rate?period=week', headers=auth_headers)
+    year = client.get('/api/v1/analytics/completion-rate?period=year', headers=auth_headers)
+
+    assert week.headers['X-Cache'] == 'MISS'
+    assert year.headers['X-Cache'] == 'MISS'
+    assert year.get_json()['data']['period'] == 'year'
+
+
+def test_memory_caches_of_all_workers_see_version_bumps(tmp_path, monkeypatch):
+    monkeypatch.setenv('ANALYTICS_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    worker_a, worker_b = create_app(), create_app()
+
+    with worker_b.app_context():
+        key = analytics_cache.make_key('u1', 'analytics.dashboard', [])
+        analytics_cache.backend.set(key, {'total_tasks': 3}, ttl=60)
+    with worker_a.app_context():
+        analytics_cache.bump_version('u1')
+
+    with worker_b.app_context():
+        assert analytics_cache.make_key('u1', 'analytics.dashboard', []) != key
+        assert analytics_cache.data_version('u1') == 1
+
+
+def test_clear_keeps_versions_monotonic(tmp_path, monkeypatch):
+    monkeypatch.setenv('ANALYTICS_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    worker_a, worker_b = create_app(), create_app()
+
+    with worker_b.app_context():
+        stale_key = analytics_cache.make_key('u1', 'analytics.dashboard', [])
+        analytics_cache.backend.set(stale_key, {'total_tasks': 3}, ttl=60)
+        analytics_cache.bump_version('u1')
+        fresh_key = analytics_cache.make_key('u1', 'analytics.dashboard', [])
+        analytics_cache.backend.set(fresh_key, {'total_tasks': 4}, ttl=60)
+    with worker_a.app_context():
+        analytics_cache.clear()  # e.g. flask rebuild-rollups
+
+    with worker_b.app_context():
+        assert analytics_cache.data_version('u1') == 1
+        key = analytics_cache.make_key('u1', 'analytics.dashboard', [])
+        assert key not in (stale_key, fresh_key)
+        assert analytics_cache.backend.get(key) is None
+
+
+def test_disabled_cache_keeps_no_versions(app, client, auth_headers, make_tasks):
+    app.config['ANALYTICS_CACHE_ENABLED'] = False
+    task_id, = make_tasks(1)
+
+    client.put(f'/api/v1/tasks/{task_id}', json={'priority': 1}, headers=auth_headers)
+
+    assert app.extensions['analytics_cache']['versions'] is None
+    assert not os.path.exists(app.config['ANALYTICS_CACHE_PATH'])
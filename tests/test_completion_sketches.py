@@ -0,0 +1,98 @@
+# tests/test_completion_sketches.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.analytics import CompletionSketch
+from utils.completion_sketches import rebuild_sketches, user_sketches
+from utils.ddsketch import DDSketch
+
+
+API = '/api/v1/analytics'
+TASKS = '/api/v1/tasks'
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_ddsketch_relative_accuracy_and_merge():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(1.5, 1.2) for _ in range(5000)]
+    left, right = DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+
+    left.merge(right)
+    restored = DDSketch.from_dict(left.to_dict())
+
+    assert restored.count == 5000
+    for q in (0.5, 0.9, 0.99):
+        assert restored.quantile(q) == pytest.approx(_exact_quantile(values, q), rel=0.011)
+
+
+def test_ddsketch_remove():
+    sketch = DDSketch()
+    for value in (1.0, 2.0, 40.0):
+        sketch.add(value)
+
+    sketch.remove(40.0)
+
+    assert sketch.count == 2
+    assert sketch.quantile(1.0) == pytest.approx(2.0, rel=0.01)
+    assert DDSketch().quantile(0.5) is None
+
+
+def _create(client, auth_headers, category):
+    response = client.post(TASKS, headers=auth_headers, json={
+        'title': f'{category} task', 'category': category,
+        'due_date': (datetime.utcnow() + timedelta(days=3)).isoformat() + 'Z'
+    })
+    return response.get_json()['data']['id']
+
+
+def test_sketches_follow_status_changes(app, client, auth_headers, user):
+    work = _create(client, auth_headers, 'Work')
+    health = _create(client, auth_headers, 'Health')
+    for task_id in (work, health):
+        client.patch(f'{TASKS}/{task_id}/status', headers=auth_headers, json={'status': 'in-progress'})
+    client.patch(f'{TASKS}/{work}/status', headers=auth_headers, json={'status': 'completed'})
+    client.patch(f'{TASKS}/{health}/progress', headers=auth_headers, json={'progress': 100})
+
+    with app.app_context():
+        counts = {category: sketch.count for category, sketch in user_sketches(user.id).items()}
+    assert counts == {'Work': 1, 'Health': 1}
+
+    # Reopening removes the completion again
+    client.patch(f'{TASKS}/{work}/status', headers=auth_headers, json={'status': 'in-progress'})
+    with app.app_context():
+        assert db.session.get(CompletionSketch, (user.id, 'Work')).count == 0
+
+
+def test_rebuild_matches_incremental_and_percentiles_exposed(app, client, auth_headers, user, make_tasks):
+    now = datetime.utcnow()
+    for hours in (1, 2, 3, 4, 100):
+        make_tasks(1, category='Work', status='completed',
+                   started_at=now - timedelta(hours=hours), completed_at=now)
+    make_tasks(1, category='Health', status='completed',
+               started_at=now - timedelta(hours=10), completed_at=now)
+    make_tasks(1, category='Health', status='completed', completed_at=now)  # untimed
+
+    with app.app_context():
+        assert rebuild_sketches(user.id) == 2
+        db.session.commit()
+        sketches = user_sketches(user.id)
+        assert sketches['Work'].count == 5
+        assert sketches['Health'].count == 1
+
+    performance = client.get(f'{API}/performance', headers=auth_headers).get_json()['data']
+    p = performance['completion_time_percentiles']
+    assert p['p50'] == pytest.approx(3.0, rel=0.01)
+    assert p['p99'] == pytest.approx(10.0, rel=0.01)  # lower rank of six values
+
+    breakdown = client.get(f'{API}/category-breakdown', headers=auth_headers).get_json()['data']
+    by_category = dict(zip(breakdown['categories'], breakdown['completion_time_percentiles']))
+    assert by_category['Health']['p90'] == pytest.approx(10.0, rel=0.01)
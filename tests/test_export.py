@@ -0,0 +1,84 @@
+# tests/test_export.py
+import csv
+import gzip
+import json
+from io import StringIO
+
+from utils.export import iter_csv
+
+
+EXPORT = '/api/v1/analytics/export'
+
+
+def test_csv_export_streams_a_download(client, auth_headers, make_tasks):
+    make_tasks(3, status='completed', progress=100)
+
+    response = client.get(f'{EXPORT}?format=csv', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="decisionai_export_')
+    rows = list(csv.reader(StringIO(response.get_data(as_text=True))))
+    assert rows[0][:3] == ['ID', 'Title', 'Category']
+    assert len(rows) == 4
+    assert {row[6] for row in rows[1:]} == {'100%'}
+
+
+def test_csv_export_legacy_envelope(client, auth_headers, make_tasks):
+    make_tasks(2)
+
+    response = client.get(f'{EXPORT}?format=csv&envelope=true', headers=auth_headers)
+
+    body = response.get_json()
+    assert body['format'] == 'csv'
+    assert body['filename'].endswith('.csv')
+    assert len(list(csv.reader(StringIO(body['data'])))) == 3
+
+
+def test_iter_csv_yields_bounded_chunks(app, user, make_tasks):
+    make_tasks(25)
+
+    with app.app_context():
+        chunks = list(iter_csv(user.id, batch_size=10))
+
+    assert len(chunks) == 3
+    assert sum(chunk.count('\n') for chunk in chunks) == 26
+
+
+def test_ndjson_export_streams_one_task_per_line(client, auth_headers, make_tasks):
+    ids = make_tasks(3)
+
+    response = client.get(f'{EXPORT}?format=ndjson', headers=auth_headers)
+
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert sorted(json.loads(line)['id'] for line in lines) == sorted(ids)
+
+
+def test_gzip_compressed_export(client, auth_headers, make_tasks):
+    make_tasks(5)
+
+    response = client.get(f'{EXPORT}?format=ndjson&compression=gzip', headers=auth_headers)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert len(lines) == 5
+
+
+def test_json_export_is_streamed_with_sql_summary(client, auth_headers, make_tasks):
+    make_tasks(2, status='completed')
+    make_tasks(3, status='pending')
+
+    streamed = client.get(EXPORT, headers=auth_headers)
+    legacy = client.get(f'{EXPORT}?envelope=true', headers=auth_headers)
+
+    assert streamed.is_streamed
+    body = json.loads(streamed.get_data(as_text=True))
+    assert body['success'] is True
+    assert body['format'] == 'json'
+    summary = body['data']['summary']
+    assert (summary['total_tasks'], summary['completed_tasks'], summary['pending_tasks']) == (5, 2, 3)
+    assert len(body['data']['tasks']) == 5
+    assert legacy.get_json()['data']['summary']['total_tasks'] == 5
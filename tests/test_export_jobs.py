@@ -0,0 +1,140 @@
+# tests/test_export_jobs.py
+import gzip
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.export_job import ExportJob
+from services.export_jobs import export_jobs
+
+
+JOBS = '/api/v1/analytics/export/jobs'
+
+
+@pytest.fixture
+def inline_jobs(app, tmp_path):
+    app.config['EXPORT_JOB_WORKERS'] = 0
+    app.config['EXPORT_STORAGE_DIR'] = str(tmp_path / 'exports')
+    return app
+
+
+def test_csv_job_produces_a_downloadable_artifact(inline_jobs, client, auth_headers, make_tasks):
+    make_tasks(4)
+
+    queued = client.post(JOBS, headers=auth_headers, json={'format': 'csv'})
+    assert queued.status_code == 202
+    job_id = queued.get_json()['data']['id']
+
+    status = client.get(f'{JOBS}/{job_id}', headers=auth_headers).get_json()['data']
+    assert status['status'] == 'completed'
+    assert status['size_bytes'] > 0
+
+    download = client.get(f'{JOBS}/{job_id}/download', headers=auth_headers)
+    assert download.status_code == 200
+    assert download.mimetype == 'text/csv'
+    assert 'attachment' in download.headers['Content-Disposition']
+    assert len(download.get_data(as_text=True).strip().splitlines()) == 5
+    download.close()
+
+
+def test_download_supports_range_requests(inline_jobs, client, auth_headers, make_tasks):
+    make_tasks(4)
+    job_id = client.post(JOBS, headers=auth_headers, json={'format': 'ndjson'}).get_json()['data']['id']
+
+    partial = client.get(f'{JOBS}/{job_id}/download', headers={**auth_headers, 'Range': 'bytes=0-9'})
+
+    assert partial.status_code == 206
+    assert partial.headers['Accept-Ranges'] == 'bytes'
+    assert len(partial.get_data()) == 10
+    partial.close()
+
+
+def test_pdf_and_gzip_jobs(inline_jobs, client, auth_headers, make_tasks):
+    make_tasks(3, title='Café planning')
+
+    pdf_id = client.post(JOBS, headers=auth_headers, json={'format': 'pdf'}).get_json()['data']['id']
+    gz_id = client.post(JOBS, headers=auth_headers, json={'format': 'csv', 'compression': 'gzip'}).get_json()['data']['id']
+
+    pdf = client.get(f'{JOBS}/{pdf_id}/download', headers=auth_headers)
+    assert pdf.get_data().startswith(b'%PDF')
+    pdf.close()
+    archive = client.get(f'{JOBS}/{gz_id}/download', headers=auth_headers)
+    assert gzip.decompress(archive.get_data()).decode().startswith('ID,Title')
+    archive.close()
+
+
+def test_invalid_format_is_rejected(client, auth_headers):
+    response = client.post(JOBS, headers=auth_headers, json={'format': 'xlsx'})
+
+    assert response.status_code == 400
+
+
+def test_sweep_expires_old_artifacts(inline_jobs, client, auth_headers, make_tasks):
+    make_tasks(1)
+    job_id = client.post(JOBS, headers=auth_headers, json={'format': 'csv'}).get_json()['data']['id']
+
+    with inline_jobs.app_context():
+        path = db.session.get(ExportJob, job_id).file_path
+        assert os.path.exists(path)
+        assert export_jobs.sweep(now=datetime.utcnow() + timedelta(days=2)) == 1
+        assert not os.path.exists(path)
+
+    assert client.get(f'{JOBS}/{job_id}', headers=auth_headers).get_json()['data']['status'] == 'expired'
+    assert client.get(f'{JOBS}/{job_id}/download', headers=auth_headers).status_code == 409
+
+
+def test_failed_jobs_leave_no_partial_file(inline_jobs, client, auth_headers, make_tasks, monkeypatch):
+    make_tasks(2)
+
+    def _fail(job, path):
+        with open(path, 'wb') as target:
+            target.write(b'half an export')
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(export_jobs, '_write_artifact', _fail)
+    job = client.post(JOBS, headers=auth_headers, json={'format': 'csv'}).get_json()['data']
+
+    assert job['status'] == 'failed'
+    assert os.listdir(inline_jobs.config['EXPORT_STORAGE_DIR']) == []
+
+
+def test_sweep_expires_failed_and_stalled_jobs(inline_jobs, user):
+    storage = inline_jobs.config['EXPORT_STORAGE_DIR']
+    os.makedirs(storage)
+    now = datetime.utcnow()
+
+    with inline_jobs.app_context():
+        jobs = {
+            'old_failure': ExportJob(user_id=user.id, format='csv', status='failed', finished_at=now - timedelta(days=2)),
+            'new_failure': ExportJob(user_id=user.id, format='csv', status='failed', finished_at=now),
+            'stalled': ExportJob(user_id=user.id, format='csv', status='running', started_at=now - timedelta(hours=2)),
+            'running': ExportJob(user_id=user.id, format='csv', status='running', started_at=now),
+        }
+        db.session.add_all(jobs.values())
+        db.session.commit()
+        stalled_partial = os.path.join(storage, f'{jobs["stalled"].id}.csv.part')
+        open(stalled_partial, 'w').close()
+
+        assert export_jobs.sweep(now=now) == 2
+        assert {name: job.status for name, job in jobs.items()} == {
+            'old_failure': 'expired', 'new_failure': 'failed', 'stalled': 'expired', 'running': 'running'
+        }
+        assert not os.path.exists(stalled_partial)
+
+
+def test_sweep_fails_jobs_that_never_started(inline_jobs, client, auth_headers, user):
+    now = datetime.utcnow()
+    with inline_jobs.app_context():
+        lost = ExportJob(user_id=user.id, format='csv', status='queued', created_at=now - timedelta(hours=2))
+        waiting = ExportJob(user_id=user.id, format='csv', status='queued', created_at=now)
+        db.session.add_all([lost, waiting])
+        db.session.commit()
+        lost_id, waiting_id = lost.id, waiting.id
+
+        assert export_jobs.sweep(now=now) == 1
+
+    lost = client.get(f'{JOBS}/{lost_id}', headers=auth_headers).get_json()['data']
+    assert (lost['status'], lost['error']) == ('failed', 'Export was never started')
+    assert client.get(f'{JOBS}/{waiting_id}', headers=auth_headers).get_json()['data']['status'] == 'queued'
@@ -0,0 +1,193 @@
+# tests/test_history_queue.py
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app
+from controllers.task_controller import _delete_tasks
+from extensions import db
+from models.task import TaskHistory
+from models.user import User
+from services.history_queue import HistoryQueueFull, history_writer
+from utils.task_history import record_history, task_state_at
+
+
+API = '/api/v1/tasks'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # A file database: the flusher writes from its own connection
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setenv('TASK_HISTORY_WRITE_BEHIND', 'true')
+    monkeypatch.setenv('TASK_HISTORY_SPOOL_DIR', str(tmp_path / 'spool'))
+    monkeypatch.setenv('TASK_HISTORY_FLUSH_INTERVAL_MS', '60000')
+    monkeypatch.setenv('ANALYTICS_CACHE_PATH', str(tmp_path / 'analytics_cache.sqlite3'))
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    app.extensions['history_queue'].close()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _create(client, auth_headers, title='Queued task'):
+    due = (datetime.utcnow() + timedelta(days=5)).isoformat()
+    return client.post(API, json={'title': title, 'due_date': due}, headers=auth_headers).get_json()['data']['id']
+
+
+def _history_count(app):
+    with app.app_context():
+        return TaskHistory.query.count()
+
+
+def _entry(task_id, action='created'):
+    return {'user_id': 'u', 'task_id': task_id, 'action': action, 'before': None,
+            'after': {'title': task_id}, 'timestamp': datetime.utcnow()}
+
+
+def test_history_is_written_behind_the_request(app, client, auth_headers):
+    queue = app.extensions['history_queue']
+    _create(client, auth_headers)
+
+    assert _history_count(app) == 0
+    assert len(queue) == 1
+    with open(queue.spool_path) as spool:
+        assert json.loads(spool.readline())['action'] == 'created'
+
+    queue.drain()
+    assert _history_count(app) == 1
+    assert len(queue) == 0
+    with open(queue.spool_path) as spool:
+        assert spool.read() == ''
+
+
+def test_rolled_back_events_are_dropped(app):
+    queue = app.extensions['history_queue']
+    with app.app_context():
+        record_history('u', [('task-1', 'created', None, {'title': 'Never saved'})])
+        db.session.rollback()
+
+    assert len(queue) == 0
+
+
+def test_flusher_writes_batches_in_the_background(app, client, auth_headers):
+    app.config.update(TASK_HISTORY_FLUSH_INTERVAL_MS=20, TASK_HISTORY_FLUSH_MAX_EVENTS=2)
+    history_writer.init_app(app)
+    for i in range(3):
+        _create(client, auth_headers, f'Task {i}')
+
+    deadline = time.monotonic() + 5
+    while _history_count(app) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert _history_count(app) == 3
+
+
+def test_full_queue_pushes_back_on_writers(app):
+    app.config.update(TASK_HISTORY_QUEUE_MAX_EVENTS=2, TASK_HISTORY_FLUSH_MAX_EVENTS=2, TASK_HISTORY_QUEUE_TIMEOUT=0.05)
+    history_writer.init_app(app)
+    queue = app.extensions['history_queue']
+
+    queue.put([_entry('a'), _entry('b')])
+    queue.put([_entry('c')])  # returns only once a batch made room
+
+    assert _history_count(app) == 2
+    assert len(queue) == 1
+
+
+def test_bad_events_are_dead_lettered_without_blocking_the_queue(app):
+    queue = app.extensions['history_queue']
+    queue.put([_entry('a'), _entry('b'), _entry('poisoned', action=None), _entry('c')])
+
+    assert queue.flush() == 4
+    assert len(queue) == 0
+    with app.app_context():
+        assert sorted(row.task_id for row in TaskHistory.query) == ['a', 'b', 'c']
+    with open(queue.dead_letter_path) as dead:
+        records = [json.loads(line) for line in dead]
+    assert [record['task_id'] for record in records] == ['poisoned']
+    assert 'error' in records[0]
+
+
+def test_full_queue_never_grows_past_its_bound(app, monkeypatch):
+    app.config.update(TASK_HISTORY_QUEUE_MAX_EVENTS=2, TASK_HISTORY_FLUSH_MAX_EVENTS=2, TASK_HISTORY_QUEUE_TIMEOUT=0.01)
+    history_writer.init_app(app)
+    queue = app.extensions['history_queue']
+    monkeypatch.setattr(queue, 'flush', lambda: 0)  # the database is unreachable
+    queue.put([_entry('a'), _entry('b')])
+
+    with pytest.raises(HistoryQueueFull):
+        queue.put([_entry('c')])
+    assert len(queue) == 2
+
+
+def test_full_queue_writes_a_commit_through(app, client, auth_headers, monkeypatch):
+    app.config.update(TASK_HISTORY_QUEUE_MAX_EVENTS=2, TASK_HISTORY_FLUSH_MAX_EVENTS=2, TASK_HISTORY_QUEUE_TIMEOUT=0.01)
+    history_writer.init_app(app)
+    queue = app.extensions['history_queue']
+    task_id = _create(client, auth_headers)
+    monkeypatch.setattr(queue, 'flush', lambda: 0)
+    queue.put([_entry('other')])
+
+    # No queued events of the new task: its history is written with the commit
+    _create(client, auth_headers, 'Written through')
+    assert len(queue) == 2
+    assert _history_count(app) == 1
+
+    # The first task's event is still queued: writing through would number it first
+    response = client.put(f'{API}/{task_id}', json={'priority': 1}, headers=auth_headers)
+    assert response.status_code == 500
+    assert len(queue) == 2
+    with app.app_context():
+        assert TaskHistory.query.filter_by(task_id=task_id).count() == 0
+
+
+def test_spools_of_dead_processes_are_recovered(app):
+    queue = app.extensions['history_queue']
+    orphan = queue.spool_path.replace('history-', 'history-0')
+    with open(orphan, 'w') as spool:
+        for seq, task_id in enumerate(('flushed-task', 'pending-task'), start=1):
+            spool.write(json.dumps({'seq': seq, **_entry(task_id), 'timestamp': datetime.utcnow().isoformat()}) + '\n')
+        spool.write(json.dumps({'flushed': 1}) + '\n')
+        spool.write('{"seq": 3, "task_id": "cut sh')
+
+    history_writer.init_app(app)
+    app.extensions['history_queue'].drain()
+
+    with app.app_context():
+        assert [row.task_id for row in TaskHistory.query] == ['pending-task']
+
+
+def test_deletes_flush_queued_events_first(app, client, auth_headers):
+    task_id = _create(client, auth_headers)
+    client.put(f'{API}/{task_id}', json={'priority': 1}, headers=auth_headers)
+    client.delete(f'{API}/{task_id}', headers=auth_headers)
+    app.extensions['history_queue'].drain()
+
+    with app.app_context():
+        rows = TaskHistory.query.filter_by(task_id=task_id).order_by(TaskHistory.version).all()
+        assert [(row.action, row.version) for row in rows] == [('created', 1), ('updated', 2), ('deleted', 3)]
+        assert task_state_at(task_id)['priority'] == 1
+
+
+def test_multi_chunk_deletes_flush_before_writing(app, client, auth_headers, user):
+    task_ids = [_create(client, auth_headers, f'Task {i}') for i in range(3)]
+
+    started = time.monotonic()
+    with app.test_request_context():
+        _delete_tasks(db.session.get(User, user.id), task_ids, chunk_size=1)
+        db.session.commit()
+    assert time.monotonic() - started < 2  # no wait on the request's own write lock
+
+    with app.app_context():
+        rows = TaskHistory.query.order_by(TaskHistory.task_id, TaskHistory.version).all()
+        assert [(row.action, row.version) for row in rows] == [('created', 1), ('deleted', 2)] * 3
+
+
+def test_queue_timeout_is_read_from_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setenv('TASK_HISTORY_QUEUE_TIMEOUT', '0.25')
+    assert create_app().config['TASK_HISTORY_QUEUE_TIMEOUT'] == 0.25
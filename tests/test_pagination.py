@@ -0,0 +1,108 @@
+# tests/test_pagination.py
+from datetime import datetime, timedelta
+
+from extensions import db
+from middleware.query_stats import assert_max_queries
+from models.task import Task
+from utils.pagination import KEYSET_COLUMNS
+
+
+API = '/api/v1/tasks'
+
+
+def _walk(client, auth_headers, query, limit=4):
+    """Every task id of a cursor-paginated listing, page by page"""
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get(f'{API}?{query}&limit={limit}&cursor={cursor}', headers=auth_headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.extend(task['id'] for task in body['data'])
+        cursor = body['pagination']['next_cursor']
+        pages += 1
+    return ids, pages
+
+
+def test_cursor_pages_cover_every_task_once_in_order(app, client, auth_headers, make_tasks):
+    for priority in (1, 2, 3):
+        make_tasks(5, priority=priority)
+
+    ids, pages = _walk(client, auth_headers, 'sort_by=priority&order=desc')
+
+    with app.app_context():
+        expected = [task.id for task in Task.query.order_by(Task.priority.desc(), Task.id.desc())]
+    assert ids == expected
+    assert pages == 4
+
+
+def test_cursor_pages_by_datetime_with_filters(app, client, auth_headers, make_tasks):
+    now = datetime.utcnow()
+    for i in range(6):
+        make_tasks(1, due_date=now + timedelta(days=i), status='pending' if i % 2 else 'completed')
+
+    ids, _ = _walk(client, auth_headers, 'sort_by=due_date&status=pending', limit=2)
+
+    with app.app_context():
+        expected = [task.id for task in Task.query.filter_by(status='pending').order_by(Task.due_date, Task.id)]
+    assert ids == expected
+
+
+def test_inserts_between_pages_do_not_repeat_rows(client, auth_headers, make_tasks):
+    make_tasks(4, priority=3)
+    first = client.get(f'{API}?sort_by=priority&limit=2&cursor=', headers=auth_headers).get_json()
+
+    # New tasks sorting before the cursor do not shift the next page
+    make_tasks(3, priority=1)
+    second = client.get(
+        f'{API}?sort_by=priority&limit=2&cursor={first["pagination"]["next_cursor"]}', headers=auth_headers
+    ).get_json()
+
+    seen = [task['id'] for task in first['data'] + second['data']]
+    assert len(set(seen)) == 4
+    assert all(task['priority'] == 3 for task in second['data'])
+    assert second['pagination']['has_more'] is False
+
+
+def test_total_is_counted_only_on_request(client, auth_headers, make_tasks):
+    make_tasks(3)
+
+    with assert_max_queries(2):  # the user and the page
+        plain = client.get(f'{API}?cursor=', headers=auth_headers).get_json()
+    counted = client.get(f'{API}?cursor=&include_total=true', headers=auth_headers).get_json()
+
+    assert 'total' not in plain['pagination']
+    assert counted['pagination']['total'] == 3
+
+
+def test_invalid_cursors_are_rejected(client, auth_headers, make_tasks):
+    make_tasks(3)
+    cursor = client.get(f'{API}?limit=1&cursor=', headers=auth_headers).get_json()['pagination']['next_cursor']
+
+    garbage = client.get(f'{API}?cursor=not-a-cursor', headers=auth_headers)
+    other_sort = client.get(f'{API}?sort_by=due_date&cursor={cursor}', headers=auth_headers)
+    unsupported = client.get(f'{API}?sort_by=title&cursor=', headers=auth_headers)
+
+    assert garbage.status_code == 400
+    assert other_sort.status_code == 400
+    assert unsupported.status_code == 400
+
+
+def test_seek_uses_the_composite_indexes(app):
+    with app.app_context():
+        for name, column in KEYSET_COLUMNS.items():
+            index = {idx.name: [c.name for c in idx.columns] for idx in Task.__table__.indexes}
+            assert any(columns == ['user_id', column.key, 'id'] for columns in index.values()), name
+
+        plan = db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE user_id = 'u' "
+            "AND (priority, id) > (3, 'x') ORDER BY priority, id LIMIT 20"
+        )).all()
+        detail = ' '.join(row[-1] for row in plan)
+        assert 'idx_user_priority' in detail
+        assert 'TEMP B-TREE' not in detail
+
+
+def test_keyset_columns_are_not_nullable():
+    # A row-value seek skips rows whose sort column is NULL
+    for name, column in KEYSET_COLUMNS.items():
+        assert not column.nullable, name
@@ -0,0 +1,47 @@
+# tests/test_query_stats.py
+import logging
+
+import pytest
+
+from middleware.query_stats import assert_max_queries, capture_queries
+from models.task import Task
+
+
+def test_responses_report_query_count_and_db_time(app, client, auth_headers, make_tasks):
+    app.config['QUERY_STATS_HEADERS'] = True
+    make_tasks(3)
+
+    with capture_queries() as statements:
+        response = client.get('/api/v1/tasks', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) == len(statements) > 0
+    assert float(response.headers['X-DB-Time-ms']) >= 0
+
+
+def test_headers_can_be_turned_off(app, client, auth_headers):
+    app.config['QUERY_STATS_HEADERS'] = False
+    response = client.get('/api/v1/tasks', headers=auth_headers)
+
+    assert 'X-DB-Queries' not in response.headers
+
+
+def test_requests_over_budget_are_logged(app, client, auth_headers, caplog):
+    app.config['SLOW_REQUEST_QUERY_BUDGET'] = 0
+
+    with caplog.at_level(logging.WARNING, logger='middleware.query_stats'):
+        client.get('/api/v1/tasks', headers=auth_headers)
+
+    assert 'GET /api/v1/tasks' in caplog.text
+
+
+def test_assert_max_queries_lists_statements_over_budget(app):
+    with app.app_context():
+        with pytest.raises(AssertionError, match='at most 1 queries, 2 were executed'):
+            with assert_max_queries(1):
+                Task.query.count()
+                Task.query.count()
+
+        with assert_max_queries(1) as statements:
+            Task.query.count()
+        assert len(statements) == 1
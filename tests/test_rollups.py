@@ -0,0 +1,104 @@
+# tests/test_rollups.py
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.analytics import UserDailyStats
+from models.task import Task
+from utils.rollups import rebuild_rollups, rollup_totals, record_task_change, task_contribution
+
+
+TASKS = '/api/v1/tasks'
+
+
+def _due():
+    return (datetime.utcnow() + timedelta(days=3)).isoformat() + 'Z'
+
+
+def _snapshot(app, user):
+    with app.app_context():
+        rows = UserDailyStats.query.filter_by(user_id=user.id).order_by(UserDailyStats.day).all()
+        return [
+            {k: (round(v, 6) if isinstance(v, float) else v) for k, v in row.to_dict().items()}
+            for row in rows
+        ]
+
+
+def test_rollup_follows_task_writes(app, client, auth_headers, user):
+    ids = []
+    for priority, impact in [(1, 8), (3, 4), (5, 6)]:
+        response = client.post(TASKS, headers=auth_headers, json={
+            'title': f'Task p{priority}', 'priority': priority, 'impact': impact, 'due_date': _due()
+        })
+        assert response.status_code == 201
+        ids.append(response.get_json()['data']['id'])
+
+    client.patch(f'{TASKS}/{ids[0]}/status', headers=auth_headers, json={'status': 'in-progress'})
+    client.patch(f'{TASKS}/{ids[0]}/status', headers=auth_headers, json={'status': 'completed'})
+    client.patch(f'{TASKS}/{ids[1]}/progress', headers=auth_headers, json={'progress': 100})
+    client.put(f'{TASKS}/{ids[1]}', headers=auth_headers, json={'impact': 9})
+
+    with app.app_context():
+        totals = rollup_totals(user.id)
+
+    assert totals['tasks_created'] == 3
+    assert totals['impact_created'] == 23
+    assert totals['high_priority_created'] == 1
+    assert totals['tasks_completed'] == 2
+    assert totals['impact_completed'] == 17
+    assert totals['high_priority_completed'] == 1
+    assert totals['tasks_on_time'] == 2
+    assert totals['timed_completions'] == 1
+
+
+def test_rebuild_matches_incremental(app, client, auth_headers, user):
+    ids = []
+    for i in range(6):
+        response = client.post(TASKS, headers=auth_headers, json={
+            'title': f'Task {i}', 'impact': i + 1, 'priority': 1 + i % 5, 'due_date': _due()
+        })
+        ids.append(response.get_json()['data']['id'])
+    client.patch(f'{TASKS}/{ids[0]}/progress', headers=auth_headers, json={'progress': 100})
+    client.patch(f'{TASKS}/{ids[1]}/status', headers=auth_headers, json={'status': 'completed'})
+    client.patch(f'{TASKS}/{ids[1]}/status', headers=auth_headers, json={'status': 'pending'})
+    client.put(f'{TASKS}/{ids[2]}', headers=auth_headers, json={'status': 'completed', 'priority': 1})
+
+    incremental = _snapshot(app, user)
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+    assert incremental
+    assert _snapshot(app, user) == incremental
+
+
+def test_removed_task_is_subtracted(app, user, make_tasks):
+    task_id, = make_tasks(1, status='completed', impact=7, completed_at=datetime.utcnow())
+    with app.app_context():
+        rebuild_rollups(user.id)
+        task = db.session.get(Task, task_id)
+        record_task_change(user.id, task_contribution(task), {})
+        totals = rollup_totals(user.id)
+
+    assert all(value == 0 for value in totals.values())
+
+
+def test_analytics_read_rollups(app, client, auth_headers, user, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(3, status='pending')
+    make_tasks(2, status='completed', impact=6, completed_at=now, started_at=now - timedelta(hours=3))
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+    timeline = client.get('/api/v1/analytics/timeline', headers=auth_headers).get_json()['data']
+    assert timeline['total_created'] == 5
+    assert timeline['total_completed'] == 2
+
+    performance = client.get('/api/v1/analytics/performance', headers=auth_headers).get_json()['data']
+    assert performance['completion_rate'] == 40.0
+    assert performance['avg_time_to_completion'] == 3.0
+    assert performance['total_impact_achieved'] == 12
+
+    rate = client.get('/api/v1/analytics/completion-rate?period=week', headers=auth_headers).get_json()['data']
+    assert rate['total_completed'] == 2
+    assert rate['timeline'][-1]['avg_impact'] == 6.0
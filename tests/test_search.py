@@ -0,0 +1,95 @@
+# tests/test_search.py
+from extensions import db
+from middleware.query_stats import capture_queries
+from models.task import Task
+from utils.search import task_search
+
+
+API = '/api/v1/tasks'
+
+
+def _titles(client, auth_headers, query):
+    response = client.get(f'{API}?{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return [task['title'] for task in response.get_json()['data']]
+
+
+def test_search_ranks_title_matches_first(client, auth_headers, make_tasks):
+    make_tasks(1, title='Quarterly budget', description='Numbers for the review')
+    make_tasks(1, title='Review the design', description='Budget impact')
+    make_tasks(1, title='Water plants', description='Nothing to see')
+
+    with capture_queries() as statements:
+        titles = _titles(client, auth_headers, 'search=budget')
+
+    assert titles == ['Quarterly budget', 'Review the design']
+    assert any('tasks_fts MATCH' in statement for statement in statements)
+    assert not any('LIKE' in statement.upper() for statement in statements)
+
+
+def test_search_matches_word_prefixes(client, auth_headers, make_tasks):
+    make_tasks(1, title='Design review', description='')
+    make_tasks(1, title='Designer hiring', description='')
+
+    assert _titles(client, auth_headers, 'search=desi rev') == ['Design review']
+    assert sorted(_titles(client, auth_headers, 'search=desig')) == ['Design review', 'Designer hiring']
+
+
+def test_index_follows_updates_and_deletes(app, client, auth_headers, make_tasks):
+    task_id, other_id = make_tasks(2, title='Draft proposal')
+
+    client.put(f'{API}/{task_id}', json={'title': 'Final report'}, headers=auth_headers)
+    with app.app_context():
+        db.session.delete(db.session.get(Task, other_id))
+        db.session.commit()
+
+    assert _titles(client, auth_headers, 'search=proposal') == []
+    assert _titles(client, auth_headers, 'search=report') == ['Final report']
+
+
+def test_explicit_sort_and_filters_apply_to_search(client, auth_headers, make_tasks):
+    make_tasks(1, title='Budget one', priority=4, status='pending')
+    make_tasks(1, title='Budget two', priority=1, status='pending')
+    make_tasks(1, title='Budget three', priority=2, status='completed')
+
+    assert _titles(client, auth_headers, 'search=budget&status=pending&sort_by=priority') == ['Budget two', 'Budget one']
+
+
+def test_search_pages_by_cursor_in_priority_order(client, auth_headers, make_tasks):
+    make_tasks(1, title='Budget one', priority=4)
+    make_tasks(1, title='Budget two', priority=1)
+    make_tasks(1, title='Budget three', priority=2)
+    make_tasks(1, title='Water plants', priority=1)
+
+    first = client.get(f'{API}?search=budget&limit=2&cursor=', headers=auth_headers)
+    assert first.status_code == 200
+    body = first.get_json()
+    second = _titles(client, auth_headers, f'search=budget&limit=2&cursor={body["pagination"]["next_cursor"]}')
+
+    assert [task['title'] for task in body['data']] + second == ['Budget two', 'Budget three', 'Budget one']
+
+
+def test_falls_back_to_ilike_without_the_index(app, client, auth_headers, make_tasks):
+    make_tasks(1, title='C++ refactor')
+    app.config['TASK_SEARCH_ENABLED'] = False
+
+    with capture_queries() as statements:
+        titles = _titles(client, auth_headers, 'search=c%2B%2B')
+
+    assert titles == ['C++ refactor']
+    assert not any('tasks_fts' in statement for statement in statements)
+
+
+def test_rebuild_restores_a_missing_index(app, make_tasks):
+    make_tasks(1, title='Existing task')
+
+    with app.app_context():
+        db.session.execute(db.text('DROP TABLE tasks_fts'))
+        db.session.commit()
+        app.extensions['task_search']['available'] = None
+        assert not task_search.available
+
+        task_search.rebuild()
+        assert task_search.available
+        query, relevance = task_search.apply(Task.query, 'existing')
+        assert [task.title for task in query] == ['Existing task']
@@ -0,0 +1,66 @@
+# tests/test_task_fields.py
+from datetime import datetime, timedelta
+
+from middleware.query_stats import capture_queries
+from models.task import Task
+from utils.task_fields import TASK_FIELDS, task_projection
+
+
+API = '/api/v1/tasks'
+
+
+def test_projection_covers_every_to_dict_field(app, make_tasks):
+    make_tasks(1, status='in-progress', started_at=datetime.utcnow())
+
+    with app.app_context():
+        task = Task.query.one()
+        projection = task_projection(','.join(TASK_FIELDS))
+        row = projection.select(Task.query).one()
+
+        assert list(TASK_FIELDS) == list(task.to_dict())
+        assert projection.serialize(row) == task.to_dict()
+
+
+def test_fields_select_only_the_needed_columns(client, auth_headers, make_tasks):
+    make_tasks(3, description='x' * 500)
+
+    with capture_queries() as statements:
+        response = client.get(f'{API}?fields=title,status,is_overdue', headers=auth_headers)
+
+    assert response.status_code == 200
+    for task in response.get_json()['data']:
+        assert set(task) == {'id', 'title', 'status', 'is_overdue'}
+        assert task['is_overdue'] is False
+
+    select = next(statement for statement in statements if 'FROM tasks' in statement)
+    assert 'tasks.due_date' in select
+    assert 'tasks.description' not in select
+    assert 'tasks.ai_insights' not in select
+
+
+def test_fields_with_cursor_pagination(client, auth_headers, make_tasks):
+    make_tasks(3)
+
+    first = client.get(f'{API}?fields=title&sort_by=due_date&limit=2&cursor=', headers=auth_headers).get_json()
+    cursor = first['pagination']['next_cursor']
+    second = client.get(f'{API}?fields=title&sort_by=due_date&limit=2&cursor={cursor}', headers=auth_headers)
+
+    assert set(first['data'][0]) == {'id', 'title'}
+    assert len(first['data']) + len(second.get_json()['data']) == 3
+
+
+def test_fields_on_filtered_lists(client, auth_headers, make_tasks):
+    make_tasks(2, category='Work', priority=2, due_date=datetime.utcnow() + timedelta(days=2))
+    make_tasks(1, category='Work', due_date=datetime.utcnow() - timedelta(days=1))
+
+    for path, count in (('category/Work', 3), ('priority/2', 2), ('upcoming', 2), ('overdue', 1)):
+        body = client.get(f'{API}/{path}?fields=due_date,days_until_due', headers=auth_headers).get_json()
+        assert body['count'] == count, path
+        assert all(set(task) == {'id', 'due_date', 'days_until_due'} for task in body['data'])
+
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    response = client.get(f'{API}/overdue?fields=title,secret', headers=auth_headers)
+
+    assert response.status_code == 400
+    assert 'secret' in response.get_json()['message']
@@ -0,0 +1,127 @@
+# tests/test_task_history.py
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.task import Task, TaskHistory
+from utils.task_history import SNAPSHOT_INTERVAL, compact_history, task_state, task_state_at
+
+
+API = '/api/v1/tasks'
+
+
+def _create(client, auth_headers, **fields):
+    due = (datetime.utcnow() + timedelta(days=5)).isoformat()
+    response = client.post(API, json={'title': 'Write report', 'due_date': due, **fields}, headers=auth_headers)
+    return response.get_json()['data']['id']
+
+
+def _history(task_id):
+    return TaskHistory.query.filter_by(task_id=task_id).order_by(TaskHistory.version).all()
+
+
+def test_updates_store_only_changed_columns(app, client, auth_headers):
+    task_id = _create(client, auth_headers)
+    client.put(f'{API}/{task_id}', json={'title': 'Write final report', 'priority': 1}, headers=auth_headers)
+    client.patch(f'{API}/{task_id}/status', json={'status': 'in-progress'}, headers=auth_headers)
+
+    with app.app_context():
+        created, updated, started = _history(task_id)
+        assert (created.version, set(created.changes)) == (1, {'snapshot'})
+        assert updated.changes == {'delta': {'title': 'Write final report', 'priority': 1}}
+        assert started.version == 3
+        assert set(started.changes['delta']) == {'status', 'started_at'}
+
+
+def test_periodic_snapshots_reconstruct_state(app, client, auth_headers):
+    task_id = _create(client, auth_headers)
+    for progress in range(1, SNAPSHOT_INTERVAL + 5):
+        client.patch(f'{API}/{task_id}/progress', json={'progress': progress}, headers=auth_headers)
+
+    with app.app_context():
+        rows = _history(task_id)
+        assert [row.version for row in rows] == list(range(1, SNAPSHOT_INTERVAL + 6))
+        assert [row.version for row in rows if 'snapshot' in row.changes] == [1, SNAPSHOT_INTERVAL]
+
+        assert task_state_at(task_id) == task_state(db.session.get(Task, task_id))
+        assert task_state_at(task_id, version=7)['progress'] == 6
+        assert task_state_at(task_id, version=SNAPSHOT_INTERVAL + 2)['progress'] == SNAPSHOT_INTERVAL + 1
+
+
+def test_deleted_tasks_keep_a_final_snapshot(app, client, auth_headers):
+    task_id = _create(client, auth_headers, category='Work')
+    client.put(f'{API}/{task_id}', json={'priority': 2}, headers=auth_headers)
+    client.delete(f'{API}/{task_id}', headers=auth_headers)
+
+    with app.app_context():
+        deleted = _history(task_id)[-1]
+        assert (deleted.action, deleted.version) == ('deleted', 3)
+        assert task_state_at(task_id)['category'] == 'Work'
+        assert task_state_at(task_id)['priority'] == 2
+
+
+def test_state_replays_across_a_delete(app, client, auth_headers):
+    task_id = _create(client, auth_headers)
+    client.patch(f'{API}/{task_id}/status', json={'status': 'in-progress'}, headers=auth_headers)
+    client.patch(f'{API}/{task_id}/progress', json={'progress': 100}, headers=auth_headers)
+    with app.app_context():
+        live = task_state(db.session.get(Task, task_id))
+
+    client.delete(f'{API}/{task_id}', headers=auth_headers)
+
+    with app.app_context():
+        rows = _history(task_id)
+        assert [row.action for row in rows][-1] == 'deleted'
+        assert task_state_at(task_id) == live
+        assert task_state_at(task_id, version=rows[-2].version) == live
+        for row in rows:
+            state = row.changes.get('snapshot') or row.changes['delta']
+            for key in ('due_date', 'completed_at', 'created_at', 'started_at'):
+                if state.get(key):
+                    assert datetime.fromisoformat(state[key]).isoformat(timespec='microseconds') == state[key]
+
+
+def test_versions_are_unique_per_task(app, client, auth_headers, user):
+    task_id = _create(client, auth_headers)
+
+    with app.app_context():
+        db.session.add(TaskHistory(task_id=task_id, user_id=user.id, action='updated', version=1,
+                                   changes={'delta': {'priority': 1}}))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+
+
+def test_compact_history_rewrites_legacy_rows(app, user):
+    now = datetime.utcnow()
+    task = Task(id='legacy-task', user_id=user.id, title='Old', due_date=now + timedelta(days=3),
+                status='pending', progress=0, priority=3, impact=5, complexity=3, ai_insights={'summary': 'x' * 500})
+    before = {**task.to_dict(), 'is_overdue': False, 'days_until_due': 3}
+    after = {**before, 'title': 'Renamed', 'days_until_due': 2}
+    legacy = [
+        ('created', {'from': None, 'to': before}),
+        ('updated', {'from': before, 'to': after}),
+        ('status_updated', {'from': 'pending', 'to': 'completed'}),
+    ]
+
+    with app.app_context():
+        for minutes, (action, changes) in enumerate(legacy):
+            db.session.add(TaskHistory(task_id=task.id, user_id=user.id, action=action, changes=changes,
+                                       timestamp=now + timedelta(minutes=minutes)))
+        db.session.commit()
+        legacy_size = sum(len(json.dumps(row.changes)) for row in _history(task.id))
+
+        assert compact_history(db.session.connection(), batch_size=1) == 3
+        db.session.commit()
+        db.session.expire_all()
+
+        rows = _history(task.id)
+        assert [row.version for row in rows] == [1, 2, 3]
+        assert rows[1].changes == {'delta': {'title': 'Renamed'}}
+        assert rows[2].changes == {'delta': {'status': 'completed'}}
+        assert sum(len(json.dumps(row.changes)) for row in rows) < legacy_size / 2
+
+        state = task_state_at(task.id)
+        assert (state['title'], state['status'], state['priority']) == ('Renamed', 'completed', 3)
@@ -0,0 +1,134 @@
+# tests/test_task_snapshot.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from middleware.query_stats import assert_max_queries
+from utils.aggregates import task_aggregates, dashboard_metrics
+from utils.rollups import rebuild_rollups, rollup_totals
+
+pytest.importorskip('numpy')
+
+from utils.task_snapshot import TaskSnapshot, task_snapshots  # noqa: E402
+
+
+API = '/api/v1/analytics'
+TASKS = '/api/v1/tasks'
+
+
+@pytest.fixture
+def mixed_tasks(app, user, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(3, priority=1, impact=9, status='pending', due_date=now - timedelta(days=2),
+               created_at=now - timedelta(days=10))
+    make_tasks(2, priority=2, impact=4, status='in-progress', created_at=now - timedelta(days=40))
+    make_tasks(2, priority=1, impact=7, status='completed', due_date=now + timedelta(days=1),
+               created_at=now - timedelta(days=5), started_at=now - timedelta(hours=30),
+               completed_at=now - timedelta(hours=6))
+    make_tasks(1, priority=5, impact=3, status='completed', due_date=now - timedelta(days=3),
+               created_at=now - timedelta(days=20), completed_at=now - timedelta(days=1))
+    make_tasks(1, priority=4, impact=6, status='blocked', created_at=now)
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+
+def test_snapshot_matches_sql_aggregates(app, user, mixed_tasks):
+    with app.app_context():
+        snapshot = TaskSnapshot.load(user.id)
+
+        assert len(snapshot) == 9
+        expected = task_aggregates(user.id, dashboard_metrics())
+        assert snapshot.dashboard_metrics() == pytest.approx(expected)
+        assert snapshot.rollup_totals() == pytest.approx(rollup_totals(user.id))
+
+
+def test_snapshot_distributions(app, user, mixed_tasks):
+    with app.app_context():
+        snapshot = TaskSnapshot.load(user.id)
+
+        priorities = {item['priority_level']: item for item in snapshot.priority_distribution()}
+        assert priorities[1]['count'] == 5
+        assert priorities[1]['completion_rate'] == 40.0
+        assert priorities[1]['avg_completion_time'] == 24.0
+        assert priorities[3] == {
+            'priority_level': 3, 'count': 0, 'avg_impact': 0, 'completion_rate': 0, 'avg_completion_time': 0
+        }
+        assert snapshot.impact_distribution() == {
+            1: 0, 2: 0, 3: 1, 4: 2, 5: 0, 6: 1, 7: 2, 8: 0, 9: 3, 10: 0
+        }
+
+
+def test_snapshot_time_series_matches_rollup(app, client, auth_headers, mixed_tasks):
+    # Same timeline and completion-rate responses with and without the engine
+    expected = [
+        client.get(f'{API}/timeline?granularity={granularity}', headers=auth_headers).get_json()['data']
+        for granularity in ('day', 'week', 'month')
+    ]
+    expected_year = client.get(f'{API}/completion-rate?period=year', headers=auth_headers).get_json()['data']
+
+    app.config['ANALYTICS_SNAPSHOT_ENABLED'] = True
+    app.config['ANALYTICS_CACHE_ENABLED'] = False
+    actual = [
+        client.get(f'{API}/timeline?granularity={granularity}', headers=auth_headers).get_json()['data']
+        for granularity in ('day', 'week', 'month')
+    ]
+    actual_year = client.get(f'{API}/completion-rate?period=year', headers=auth_headers).get_json()['data']
+
+    assert actual == expected
+    for key in ('timeline', 'total_completed', 'total_created', 'completion_rate'):
+        assert actual_year[key] == expected_year[key]
+
+
+def test_snapshot_reloaded_after_write(app, client, auth_headers, mixed_tasks):
+    app.config['ANALYTICS_SNAPSHOT_ENABLED'] = True
+    app.config['ANALYTICS_CACHE_ENABLED'] = False
+
+    assert client.get(f'{API}/dashboard', headers=auth_headers).get_json()['data']['total_tasks'] == 9
+    # The user lookup and the completion sketches; counters come from the cached snapshot
+    with assert_max_queries(2):
+        assert client.get(f'{API}/performance', headers=auth_headers).status_code == 200
+
+    response = client.post(TASKS, headers=auth_headers, json={
+        'title': 'One more', 'due_date': (datetime.utcnow() + timedelta(days=2)).isoformat() + 'Z'
+    })
+    assert response.status_code == 201
+
+    assert client.get(f'{API}/dashboard', headers=auth_headers).get_json()['data']['total_tasks'] == 10
+    with app.app_context():
+        stats = app.extensions['task_snapshots']
+        assert stats['loads'] == 2
+        assert stats['hits'] == 1
+
+
+def test_snapshot_disabled_by_default(app):
+    with app.app_context():
+        assert not task_snapshots.enabled
+
+
+def test_distribution_endpoints_on_snapshot(app, client, auth_headers, mixed_tasks):
+    app.config['ANALYTICS_SNAPSHOT_ENABLED'] = True
+
+    impact = client.get(f'{API}/impact-analysis', headers=auth_headers)
+    priority = client.get(f'{API}/priority-distribution', headers=auth_headers)
+
+    assert impact.status_code == 200
+    assert impact.get_json()['data']['impact_distribution']['9'] == 3
+    assert priority.status_code == 200
+    assert priority.get_json()['data']['total_tasks'] == 9
+
+
+def test_empty_snapshot_is_used_for_users_without_tasks(app, client, auth_headers):
+    app.config['ANALYTICS_SNAPSHOT_ENABLED'] = True
+    app.config['ANALYTICS_CACHE_ENABLED'] = False
+
+    assert client.get(f'{API}/dashboard', headers=auth_headers).get_json()['data']['total_tasks'] == 0
+    # An empty snapshot is still a snapshot: no fallback to the SQL aggregates
+    with assert_max_queries(2):
+        assert client.get(f'{API}/performance', headers=auth_headers).status_code == 200
+    for endpoint in ('impact-analysis', 'priority-distribution', 'timeline', 'completion-rate'):
+        assert client.get(f'{API}/{endpoint}', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        assert app.extensions['task_snapshots']['loads'] == 1
@@ -0,0 +1,85 @@
+# tests/test_task_tags.py
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.task import Task, TaskTag
+from utils.task_tags import index_tasks, unindex_tasks, rebuild_task_tags
+
+
+API = '/api/v1/tasks'
+
+
+def _create(client, auth_headers, title, tags):
+    response = client.post(API, json={
+        'title': title,
+        'due_date': (datetime.utcnow() + timedelta(days=3)).isoformat(),
+        'tags': tags
+    }, headers=auth_headers)
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+
+def _titles(client, auth_headers, query):
+    response = client.get(f'{API}?{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return sorted(task['title'] for task in response.get_json()['data'])
+
+
+def _index(app):
+    with app.app_context():
+        return sorted((row.tag, row.task_id) for row in TaskTag.query.all())
+
+
+def test_tag_filters_any_and_all(client, auth_headers):
+    _create(client, auth_headers, 'A', ['urgent', 'Home'])
+    _create(client, auth_headers, 'B', ['urgent'])
+    _create(client, auth_headers, 'C', ['home'])
+    _create(client, auth_headers, 'D', [])
+
+    assert _titles(client, auth_headers, 'tags=urgent,home') == ['A', 'B', 'C']
+    assert _titles(client, auth_headers, 'tags=urgent,home&tag_match=all') == ['A']
+    assert _titles(client, auth_headers, 'tags=HOME') == ['A', 'C']
+    assert client.get(f'{API}?tags=home&tag_match=some', headers=auth_headers).status_code == 400
+
+
+def test_index_follows_updates(app, client, auth_headers):
+    task_id = _create(client, auth_headers, 'Keep', ['work', 'q3'])
+
+    client.put(f'{API}/{task_id}', json={'tags': ['work', 'q4']}, headers=auth_headers)
+
+    assert _index(app) == [('q4', task_id), ('work', task_id)]
+
+
+def test_index_and_unindex_tasks(app, make_tasks):
+    first, second = make_tasks(2, tags=['work', 'Work ', 'home'])
+
+    with app.app_context():
+        index_tasks(Task.query.all())
+        unindex_tasks([first])
+        db.session.commit()
+
+    assert _index(app) == [('home', second), ('work', second)]
+
+
+def test_tag_counts(client, auth_headers):
+    _create(client, auth_headers, 'A', ['urgent', 'home'])
+    _create(client, auth_headers, 'B', ['urgent'])
+
+    response = client.get(f'{API}/tags', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == [{'tag': 'urgent', 'count': 2}, {'tag': 'home', 'count': 1}]
+
+
+def test_rebuild_matches_incremental_index(app, client, auth_headers, make_tasks):
+    _create(client, auth_headers, 'A', ['x', ' Y '])
+    make_tasks(2, tags=['z'])  # written without the index, as before the table existed
+    incremental = _index(app)
+
+    with app.app_context():
+        assert rebuild_task_tags() == 4
+        db.session.commit()
+
+    rebuilt = _index(app)
+    assert set(incremental) < set(rebuilt)
+    assert [tag for tag, _ in rebuilt] == ['x', 'y', 'z', 'z']
@@ -0,0 +1,69 @@
+# tests/test_time_buckets.py
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from extensions import db
+from middleware.query_stats import assert_max_queries
+from models.task import Task
+from utils.rollups import rebuild_rollups
+from utils.time_buckets import bucket_range, bucket_start, time_series, fill_buckets
+
+
+def test_bucket_range_steps_calendar_months():
+    buckets = bucket_range(date(2024, 1, 31), date(2024, 5, 2), 'month')
+
+    assert buckets == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1), date(2024, 4, 1), date(2024, 5, 1)]
+
+
+def test_bucket_range_crosses_year_end():
+    assert bucket_range(date(2023, 11, 15), date(2024, 1, 3), 'month') == [
+        date(2023, 11, 1), date(2023, 12, 1), date(2024, 1, 1)
+    ]
+
+
+def test_week_buckets_start_on_monday():
+    assert bucket_start(date(2024, 3, 24), 'week') == date(2024, 3, 18)  # Sunday
+    assert bucket_start(datetime(2024, 3, 18, 23, 59), 'week') == date(2024, 3, 18)
+    assert len(bucket_range(date(2024, 3, 18), date(2024, 4, 1), 'week')) == 3
+
+
+def test_time_series_groups_in_sql(app, user, make_tasks):
+    make_tasks(2, created_at=datetime(2024, 3, 18, 9), impact=4)   # Monday
+    make_tasks(1, created_at=datetime(2024, 3, 24, 22), impact=10)  # Sunday, same week
+    make_tasks(1, created_at=datetime(2024, 4, 2, 12), impact=6)
+
+    start, end = datetime(2024, 3, 1), datetime(2024, 4, 30)
+    metrics = {'count': func.count(Task.id), 'impact': func.sum(Task.impact)}
+    with app.app_context():
+        weekly = time_series(Task.created_at, metrics, start, end, 'week', criteria=(Task.user_id == user.id,))
+        monthly = time_series(Task.created_at, metrics, start, end, 'month', criteria=(Task.user_id == user.id,))
+
+    assert weekly == {date(2024, 3, 18): {'count': 3, 'impact': 18}, date(2024, 4, 1): {'count': 1, 'impact': 6}}
+    assert monthly == {date(2024, 3, 1): {'count': 3, 'impact': 18}, date(2024, 4, 1): {'count': 1, 'impact': 6}}
+
+    filled = fill_buckets(monthly, start, end, 'month', defaults={'count': 0})
+    assert [values['count'] for _, values in filled] == [3, 1]
+
+
+def test_timeline_uses_one_query(app, client, auth_headers, user, make_tasks):
+    now = datetime.utcnow()
+    make_tasks(4, created_at=now - timedelta(days=2))
+    make_tasks(3, status='completed', created_at=now - timedelta(days=40), completed_at=now)
+    with app.app_context():
+        rebuild_rollups(user.id)
+        db.session.commit()
+
+    with assert_max_queries(2):
+        response = client.get('/api/v1/analytics/timeline', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert len(data['timeline']) == 31
+    assert data['total_created'] == 4
+    assert data['total_completed'] == 3
+    assert data['timeline'][-1]['completed'] == 3
+
+    weekly = client.get('/api/v1/analytics/timeline?granularity=week', headers=auth_headers).get_json()['data']
+    assert weekly['granularity'] == 'week'
+    assert sum(bucket['created'] for bucket in weekly['timeline']) == 4
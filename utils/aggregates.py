@@ -0,0 +1,157 @@
+# utils/aggregates.py
+"""
+Conditional-aggregation helpers for analytics queries.
+
+Each metric is a named SQL aggregate expression; a set of metrics is evaluated
+over a user's tasks in a single SELECT, so dashboards cost one round-trip
+no matter how many counters they show.  Works on SQLite and PostgreSQL.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, and_, cast, BigInteger
+from extensions import db
+from models.task import Task
+
+
+def dialect_name():
+    """Name of the dialect bound to the current session (e.g. 'sqlite', 'postgresql')"""
+    return db.session.get_bind().dialect.name
+
+
+def hours_between(start, end):
+    """SQL expression for the number of hours between two datetime columns"""
+    if dialect_name() == 'postgresql':
+        return func.extract('epoch', end - start) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+
+def epoch_seconds(column):
+    """SQL expression for a datetime column as whole Unix seconds (NULL stays NULL)"""
+    if dialect_name() == 'postgresql':
+        return cast(func.extract('epoch', column), BigInteger)
+    return cast(func.strftime('%s', column), BigInteger)
+
+
+def count_if(condition):
+    """Number of rows matching condition"""
+    return func.sum(case((condition, 1), else_=0))
+
+
+def sum_if(condition, value):
+    """Sum of value over rows matching condition"""
+    return func.sum(case((condition, value), else_=0))
+
+
+def avg_if(condition, value):
+    """Average of value over rows matching condition (NULL when none match)"""
+    return func.avg(case((condition, value), else_=None))
+
+
+def task_aggregates(user_id, metrics, *criteria):
+    """
+    Evaluate named aggregate expressions over a user's tasks in one statement.
+
+    metrics maps result names to SQL aggregate expressions; extra criteria
+    narrow the scanned rows.  Missing aggregates (no rows) come back as 0.
+    """
+    names = list(metrics)
+    row = db.session.query(
+        *[metrics[name].label(name) for name in names]
+    ).filter(
+        Task.user_id == user_id,
+        *criteria
+    ).one()
+
+    return {name: float(getattr(row, name) or 0) for name in names}
+
+
+def grouped_task_aggregates(user_id, group_by, metrics, *criteria):
+    """
+    Evaluate named aggregate expressions over a user's tasks per value of group_by.
+
+    Returns {group value: {metric: value}} for the groups that have rows, in
+    one GROUP BY statement; callers zero-fill the groups they expect.
+    """
+    names = list(metrics)
+    rows = db.session.query(
+        group_by.label('group_key'),
+        *[metrics[name].label(name) for name in names]
+    ).filter(
+        Task.user_id == user_id,
+        *criteria
+    ).group_by(group_by).all()
+
+    return {
+        row.group_key: {name: float(getattr(row, name) or 0) for name in names}
+        for row in rows
+    }
+
+
+def completion_hours():
+    """Hours from start to completion of a task"""
+    return hours_between(Task.started_at, Task.completed_at)
+
+
+def is_timed_completion():
+    """Completed tasks that carry both start and completion timestamps"""
+    return and_(
+        Task.status == 'completed',
+        Task.completed_at.isnot(None),
+        Task.started_at.isnot(None)
+    )
+
+
+def is_overdue(now=None):
+    """Open tasks whose due date has passed"""
+    return and_(Task.status != 'completed', Task.due_date < (now or datetime.utcnow()))
+
+
+def dashboard_metrics(now=None):
+    """Aggregates behind the analytics dashboard"""
+    now = now or datetime.utcnow()
+
+    metrics = {
+        'total_tasks': func.count(Task.id),
+        'completed_tasks': count_if(Task.status == 'completed'),
+        'pending_tasks': count_if(Task.status == 'pending'),
+        'in_progress_tasks': count_if(Task.status == 'in-progress'),
+        'overdue_tasks': count_if(is_overdue(now)),
+        'avg_completion_time': avg_if(is_timed_completion(), completion_hours()),
+        'avg_impact': func.avg(Task.impact),
+    }
+    for priority in range(1, 6):
+        metrics[f'priority_{priority}'] = count_if(Task.priority == priority)
+
+    return metrics
+
+
+def risk_metrics(now=None):
+    """Counters behind the risk analysis"""
+    now = now or datetime.utcnow()
+    return {
+        'overdue': count_if(is_overdue(now)),
+        'high_priority_pending': count_if(and_(Task.priority == 1, Task.status == 'pending')),
+        'upcoming_deadlines': count_if(and_(
+            Task.status != 'completed',
+            Task.due_date <= now + timedelta(days=7)
+        )),
+    }
+
+
+def optimization_metrics(now=None):
+    """Counters behind the optimization tips"""
+    return {
+        'total_tasks': func.count(Task.id),
+        'overdue_tasks': count_if(is_overdue(now)),
+        'categories': func.count(func.distinct(Task.category)),
+        'long_tasks': count_if(Task.estimated_hours > 8),
+    }
+
+
+def task_titles(user_id, condition, order_by, limit=3):
+    """Titles of the first limit tasks of a user matching condition"""
+    rows = db.session.query(Task.title).filter(
+        Task.user_id == user_id,
+        condition
+    ).order_by(order_by).limit(limit).all()
+
+    return [row.title for row in rows]
@@ -25,8 +25,6 @@ class AIHelper:
             if not api_key:
                 return self._get_default_insights()
 
-            openai.api_key = api_key
-            
             prompt = f"""Analyze the following task and provide insights in JSON format:
 Task: {description}
 
@@ -40,11 +38,15 @@ Provide response as JSON with these fields (use numbers where applicable):
 
 Return ONLY valid JSON, no other text."""
 
+            # Credentials per call rather than module-wide, so concurrent callers are safe
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                api_key=api_key,
+                api_base=current_app.config.get('OPENAI_API_BASE'),
+                request_timeout=current_app.config.get('AI_REQUEST_TIMEOUT')
             )
             
             content = response.choices[0].message.content.strip()
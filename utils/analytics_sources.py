@@ -0,0 +1,208 @@
+# utils/analytics_sources.py
+"""
+Shared inputs of the analytics panels.
+
+AnalyticsSources wraps the aggregate queries that the analytics panels are
+built from. Each source is loaded at most once per instance, so panels
+served together share intermediate results such as the dashboard counters
+or the last 30 days of the daily rollup. prefetch() loads several sources
+concurrently. Each worker thread runs in its own app context, so it gets
+its own session and pooled connection. Sources come from the task
+snapshot instead of SQL when the vectorized engine is enabled.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.pool import StaticPool, SingletonThreadPool
+from extensions import db
+from middleware.query_stats import current_query_stats, bind_query_stats
+from models.analytics import UserDailyStats
+from models.task import Task
+from utils.aggregates import (
+    task_aggregates, grouped_task_aggregates, dashboard_metrics,
+    count_if, avg_if, is_timed_completion, completion_hours
+)
+from utils.rollups import rollup_summary
+from utils.completion_sketches import user_sketches
+from utils.task_snapshot import task_snapshots
+from utils.time_buckets import time_series
+
+# Days of daily rollup kept by the recent_days source
+RECENT_DAYS = 30
+
+
+def _has_connection_pool():
+    """False for engines that share a single connection (e.g. in-memory SQLite)"""
+    return not isinstance(db.engine.pool, (StaticPool, SingletonThreadPool))
+
+
+class AnalyticsSources:
+    """Memoized analytics inputs for one user"""
+
+    SOURCES = (
+        'task_stats', 'category_counts', 'impact_counts', 'priority_stats',
+        'high_impact_tasks', 'recent_avg_impact', 'rollup_summary', 'recent_days',
+        'completion_sketches'
+    )
+
+    def __init__(self, user_id, now=None):
+        self.user_id = user_id
+        self.now = now or datetime.utcnow()
+        self._results = {}
+
+    @property
+    def snapshot(self):
+        """The user's task snapshot when the vectorized engine is enabled, else None"""
+        return task_snapshots.get(self.user_id) if task_snapshots.enabled else None
+
+    def get(self, name):
+        """Value of a source, loading it on first use"""
+        if name not in self._results:
+            self._results[name] = getattr(self, f'_load_{name}')()
+        return self._results[name]
+
+    def prefetch(self, names):
+        """
+        Load several sources at once.
+
+        Sources run concurrently on up to ANALYTICS_BUNDLE_WORKERS threads.
+        They run inline instead when the engine has no connection pool to
+        spread them over, or when they come from the in-memory snapshot.
+        """
+        pending = [name for name in dict.fromkeys(names) if name not in self._results]
+        workers = min(int(current_app.config.get('ANALYTICS_BUNDLE_WORKERS', 4)), len(pending))
+
+        if workers < 2 or task_snapshots.enabled or not _has_connection_pool():
+            for name in pending:
+                self.get(name)
+            return
+
+        app = current_app._get_current_object()
+        stats = current_query_stats()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analytics-sources') as executor:
+            futures = {name: executor.submit(self._load_in_app_context, app, name, stats) for name in pending}
+
+        for name, future in futures.items():
+            self._results[name] = future.result()
+
+    def _load_in_app_context(self, app, name, stats=None):
+        with app.app_context():
+            bind_query_stats(stats)
+            try:
+                return getattr(self, f'_load_{name}')()
+            finally:
+                db.session.remove()
+
+    # Loaders; each returns plain data so results can cross threads
+
+    def _load_task_stats(self):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.dashboard_metrics(self.now)
+        return task_aggregates(self.user_id, dashboard_metrics(self.now))
+
+    def _load_category_counts(self):
+        rows = db.session.query(
+            Task.category,
+            func.count(Task.id).label('count'),
+            func.avg(Task.impact).label('avg_impact'),
+            func.avg(Task.priority).label('avg_priority')
+        ).filter_by(
+            user_id=self.user_id
+        ).group_by(
+            Task.category
+        ).all()
+
+        return [tuple(row) for row in rows]
+
+    def _load_impact_counts(self):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.impact_distribution()
+
+        counts = grouped_task_aggregates(self.user_id, Task.impact, {'count': func.count(Task.id)})
+        return {impact: int(counts.get(impact, {}).get('count', 0)) for impact in range(1, 11)}
+
+    def _load_priority_stats(self):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.priority_distribution()
+
+        groups = grouped_task_aggregates(self.user_id, Task.priority, {
+            'count': func.count(Task.id),
+            'avg_impact': func.avg(Task.impact),
+            'completed': count_if(Task.status == 'completed'),
+            'avg_completion_time': avg_if(is_timed_completion(), completion_hours())
+        })
+
+        priority_data = []
+        for priority in range(1, 6):
+            stats = groups.get(priority)
+            count = int(stats['count']) if stats else 0
+
+            priority_data.append({
+                'priority_level': priority,
+                'count': count,
+                'avg_impact': round(stats['avg_impact'], 2) if count else 0,
+                'completion_rate': round(stats['completed'] / count * 100, 2) if count else 0,
+                'avg_completion_time': round(stats['avg_completion_time'], 2) if count else 0
+            })
+
+        return priority_data
+
+    def _load_high_impact_tasks(self):
+        rows = db.session.query(
+            Task.id, Task.title, Task.impact, Task.priority, Task.status
+        ).filter(
+            Task.user_id == self.user_id,
+            Task.impact >= 8
+        ).order_by(Task.priority).limit(10).all()
+
+        return [row._asdict() for row in rows]
+
+    def _load_recent_avg_impact(self):
+        impacts = db.session.query(Task.impact).filter_by(
+            user_id=self.user_id
+        ).order_by(Task.created_at.desc()).limit(20).all()
+
+        return round(sum(row.impact for row in impacts) / len(impacts) if impacts else 0, 2)
+
+    def last_week(self):
+        """The seven days ending today, oldest first"""
+        start = self.now - timedelta(days=6)
+        return [(start + timedelta(days=i)).date() for i in range(7)]
+
+    def _load_rollup_summary(self):
+        days = self.last_week()
+
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return {'totals': snapshot.rollup_totals(), 'daily_completions': snapshot.daily_completions(days)}
+
+        totals, daily_completions = rollup_summary(self.user_id, days)
+        return {'totals': totals, 'daily_completions': daily_completions}
+
+    def _load_recent_days(self):
+        start = (self.now - timedelta(days=RECENT_DAYS)).date()
+        end = self.now.date()
+
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.time_series(start, end, 'day')
+
+        return time_series(
+            UserDailyStats.day,
+            {
+                'created': func.sum(UserDailyStats.tasks_created),
+                'completed': func.sum(UserDailyStats.tasks_completed),
+                'impact': func.sum(UserDailyStats.impact_completed)
+            },
+            start,
+            end,
+            'day',
+            criteria=(UserDailyStats.user_id == self.user_id,)
+        )
+
+    def _load_completion_sketches(self):
+        return user_sketches(self.user_id)
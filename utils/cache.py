@@ -0,0 +1,276 @@
+# utils/cache.py
+"""
+Per-user analytics response cache.
+
+Entries are keyed by (user, endpoint, query params, user data version).
+Task writers bump the user's data version after committing, which makes
+every cached analytics response for that user unreachable at once; stale
+entries then age out through LRU eviction and TTL expiry.
+
+Backends:
+    memory - in-process LRU dict (default; one cache per worker)
+    sqlite - local SQLite file shared by every worker on the host
+
+The data versions always live in the SQLite file at ANALYTICS_CACHE_PATH,
+whichever backend holds the entries: a write handled by one worker must
+invalidate the memory caches of the others too. Versions only ever grow;
+clear() bumps a global generation that is part of every key, so entries
+cached by any worker before it are unreachable. The file is opened on first
+use, and versions are not kept at all while neither the response cache nor
+the task snapshots (which key on them too) are enabled.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, jsonify, request
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        """Drop every entry; counters are kept, so versions never go back"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """LRU cache with per-entry expiry stored in a local SQLite file, shared across processes"""
+
+    def __init__(self, path, max_entries=1024):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), now + ttl, now)
+        )
+        conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (now,))
+        overflow = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)',
+                (overflow,)
+            )
+
+    def get_counter(self, key):
+        row = self._connect().execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key):
+        conn = self._connect()
+        conn.execute(
+            'INSERT INTO cache_counters (key, value) VALUES (?, 1) '
+            'ON CONFLICT(key) DO UPDATE SET value = value + 1',
+            (key,)
+        )
+        return self.get_counter(key)
+
+    def clear(self):
+        """Drop every entry; counters are kept, so versions never go back"""
+        self._connect().execute('DELETE FROM cache_entries')
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+
+class AnalyticsCache:
+    """Versioned per-user response cache for the analytics routes"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ANALYTICS_CACHE_ENABLED', True)
+        app.config.setdefault('ANALYTICS_CACHE_BACKEND', 'memory')
+        app.config.setdefault('ANALYTICS_CACHE_PATH', os.path.join(app.instance_path, 'analytics_cache.sqlite3'))
+        app.config.setdefault('ANALYTICS_CACHE_TTL', 60)
+        app.config.setdefault('ANALYTICS_CACHE_MAX_ENTRIES', 1024)
+
+        max_entries = int(app.config['ANALYTICS_CACHE_MAX_ENTRIES'])
+        if app.config['ANALYTICS_CACHE_BACKEND'] == 'sqlite':
+            backend = versions = SQLiteCacheBackend(app.config['ANALYTICS_CACHE_PATH'], max_entries)
+        else:
+            backend, versions = MemoryCacheBackend(max_entries), None
+
+        app.extensions['analytics_cache'] = {
+            'backend': backend,
+            'versions': versions,  # opened on first use with the memory backend
+            'hits': 0,
+            'misses': 0
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions['analytics_cache']
+
+    @property
+    def backend(self):
+        return self._state['backend']
+
+    @property
+    def _versions(self):
+        state = self._state
+        if state['versions'] is None:
+            state['versions'] = SQLiteCacheBackend(
+                current_app.config['ANALYTICS_CACHE_PATH'], int(current_app.config['ANALYTICS_CACHE_MAX_ENTRIES'])
+            )
+        return state['versions']
+
+    @property
+    def versioned(self):
+        """Whether data versions are kept: the response cache and the task snapshots key on them"""
+        config = current_app.config
+        return 'analytics_cache' in current_app.extensions and bool(
+            config.get('ANALYTICS_CACHE_ENABLED', True) or config.get('ANALYTICS_SNAPSHOT_ENABLED', False)
+        )
+
+    def data_version(self, user_id):
+        """Current data version of a user, shared by every worker on the host"""
+        if not self.versioned:
+            return 0
+        return self._versions.get_counter(f'version:{user_id}')
+
+    def bump_version(self, user_id):
+        """Invalidate every cached analytics response for a user, in every worker"""
+        if self.versioned:
+            self._versions.incr(f'version:{user_id}')
+
+    def make_key(self, user_id, endpoint, params):
+        """Cache key for one user's response to endpoint with the given query params"""
+        query = urlencode(sorted(params))
+        generation = self._versions.get_counter('generation')
+        return f'analytics:{generation}:{user_id}:{self.data_version(user_id)}:{endpoint}:{query}'
+
+    def stats(self):
+        """Hit/miss counters of this process and the number of cached entries"""
+        state = self._state
+        lookups = state['hits'] + state['misses']
+        return {
+            'hits': state['hits'],
+            'misses': state['misses'],
+            'hit_rate': round(state['hits'] / lookups * 100, 2) if lookups else 0,
+            'entries': len(state['backend'])
+        }
+
+    def clear(self):
+        """Invalidate every cached response, in every worker"""
+        if self.versioned:
+            self._versions.incr('generation')
+        self.backend.clear()
+
+    def cached(self, fn):
+        """
+        Cache successful JSON responses of a route for request.user.
+
+        Must be applied below jwt_required so request.user is set.
+        """
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('ANALYTICS_CACHE_ENABLED', True):
+                return fn(*args, **kwargs)
+
+            state = self._state
+            key = self.make_key(request.user.id, request.endpoint, request.args.items(multi=True))
+            payload = state['backend'].get(key)
+            if payload is not None:
+                state['hits'] += 1
+                response = jsonify(payload)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            state['misses'] += 1
+            result = fn(*args, **kwargs)
+            response, status = (result[0], result[1]) if isinstance(result, tuple) else (result, 200)
+            if status == 200 and response.is_json:
+                state['backend'].set(key, response.get_json(), current_app.config['ANALYTICS_CACHE_TTL'])
+                response.headers['X-Cache'] = 'MISS'
+            return result
+
+        return wrapper
+
+
+analytics_cache = AnalyticsCache()
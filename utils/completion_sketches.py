@@ -0,0 +1,151 @@
+# utils/completion_sketches.py
+"""
+Completion-time quantile sketches per user and category.
+
+Each (user, category) row of completion_sketches holds a DDSketch of the
+hours from started_at to completed_at of the user's completed tasks.
+Writers take a task's completion sample before changing it and record the
+change afterwards, inside the caller's transaction. A completion adds one
+value, and reopening or deleting a completed task removes it, so an update
+touches one row and one bin. Reads merge the user's category sketches,
+so percentiles never scan tasks.
+"""
+from sqlalchemy import select
+from extensions import db
+from models.analytics import CompletionSketch
+from models.task import Task
+from utils.ddsketch import DDSketch
+from utils.time_buckets import as_utc
+
+RELATIVE_ACCURACY = 0.01
+
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+
+
+def completion_sample(task):
+    """(category, completion hours) a task contributes, or None when it is not a timed completion"""
+    if task is None or task.status != 'completed':
+        return None
+
+    completed_at = as_utc(task.completed_at)
+    started_at = as_utc(task.started_at)
+    if not completed_at or not started_at:
+        return None
+
+    hours = max((completed_at - started_at).total_seconds() / 3600, 0.0)
+    return task.category or 'Other', hours
+
+
+def _sketch_row(user_id, category):
+    """The user's sketch row for category, locked for update, or a new pending row"""
+    row = CompletionSketch.query.filter_by(
+        user_id=user_id, category=category
+    ).with_for_update().first()
+
+    if row is None:
+        row = CompletionSketch(
+            user_id=user_id, category=category, sketch=DDSketch(RELATIVE_ACCURACY).to_dict(), count=0
+        )
+        db.session.add(row)
+    return row
+
+
+def _apply(user_id, category, hours, weight):
+    row = _sketch_row(user_id, category)
+    sketch = DDSketch.from_dict(row.sketch)
+    sketch.add(hours, weight)
+    row.sketch = sketch.to_dict()
+    row.count = sketch.count
+
+
+def record_completion_change(user_id, before, after):
+    """Move a task's sample between sketches when its completion changed"""
+    if before == after:
+        return
+    if before is not None:
+        _apply(user_id, before[0], before[1], -1)
+    if after is not None:
+        _apply(user_id, after[0], after[1], 1)
+
+
+def record_completion_changes(user_id, changes):
+    """
+    Batch form of record_completion_change for (before, after) sample pairs.
+
+    Loads and writes each affected category's sketch once, so bulk
+    operations cost one row per category rather than one per task.
+    """
+    by_category = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for sample, weight in ((before, -1), (after, 1)):
+            if sample is not None:
+                by_category.setdefault(sample[0], []).append((sample[1], weight))
+
+    for category, values in by_category.items():
+        row = _sketch_row(user_id, category)
+        sketch = DDSketch.from_dict(row.sketch)
+        for hours, weight in values:
+            sketch.add(hours, weight)
+        row.sketch = sketch.to_dict()
+        row.count = sketch.count
+
+
+def user_sketches(user_id):
+    """The user's sketches keyed by category"""
+    rows = CompletionSketch.query.filter_by(user_id=user_id).all()
+    return {row.category: DDSketch.from_dict(row.sketch) for row in rows}
+
+
+def merged_sketch(sketches):
+    """One sketch counting every value of sketches"""
+    merged = DDSketch(RELATIVE_ACCURACY)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def percentiles(sketch):
+    """p50/p90/p99 completion hours of a sketch, 0 when it is empty"""
+    return {
+        name: round(sketch.quantile(q), 2) if sketch and sketch.count else 0
+        for name, q in PERCENTILES
+    }
+
+
+def rebuild_sketches(user_id=None, batch_size=1000):
+    """
+    Recompute sketches exactly from the tasks table.
+
+    Deletes the affected rows and re-adds every timed completion; the caller
+    commits. Returns the number of sketch rows written.
+    """
+    delete = CompletionSketch.__table__.delete()
+    if user_id:
+        delete = delete.where(CompletionSketch.user_id == user_id)
+    db.session.execute(delete)
+
+    statement = select(
+        Task.user_id, Task.category, Task.status, Task.started_at, Task.completed_at
+    ).where(
+        Task.status == 'completed',
+        Task.started_at.isnot(None),
+        Task.completed_at.isnot(None)
+    ).execution_options(yield_per=batch_size)
+    if user_id:
+        statement = statement.where(Task.user_id == user_id)
+
+    sketches = {}
+    for row in db.session.execute(statement):
+        category, hours = completion_sample(row)
+        key = (row.user_id, category)
+        if key not in sketches:
+            sketches[key] = DDSketch(RELATIVE_ACCURACY)
+        sketches[key].add(hours)
+
+    db.session.add_all([
+        CompletionSketch(user_id=owner, category=category, sketch=sketch.to_dict(), count=sketch.count)
+        for (owner, category), sketch in sketches.items()
+    ])
+    return len(sketches)
@@ -1,5 +1,17 @@
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert, delete, select, func, literal_column, DateTime, JSON
 from extensions import db
+from utils.aggregates import dialect_name
+
+
+def sqlite_max_parameters(version_info=sqlite3.sqlite_version_info):
+    """Bound parameters SQLite allows in one statement: 32766 since 3.32, 999 before"""
+    return 32766 if version_info >= (3, 32, 0) else 999
+
+
+# Bound parameters allowed in one statement (PostgreSQL's wire limit is 65535)
+MAX_PARAMETERS = {'sqlite': sqlite_max_parameters(), 'postgresql': 65535}
 
 
 def init_db(app):
@@ -25,12 +37,92 @@ def get_or_create(model, **kwargs):
         return instance, True
 
 
-def bulk_create(model, data_list):
-    """Bulk create records"""
-    instances = [model(**data) for data in data_list]
-    db.session.bulk_save_objects(instances)
-    db.session.commit()
-    return instances
+def bulk_create(model, data_list, chunk_size=1000):
+    """
+    Bulk create records from column dicts with multi-row INSERT statements.
+
+    Rows are sent in chunks of at most chunk_size, fewer when needed to
+    stay under the dialect's bound-parameter limit. Every row must have the
+    same keys, with column defaults filled in by the caller. Runs in the
+    current transaction (the caller commits) and returns the number of
+    rows inserted.
+    """
+    if not data_list:
+        return 0
+
+    table = model.__table__
+    max_parameters = MAX_PARAMETERS.get(dialect_name(), 32766)
+    chunk_size = max(1, min(chunk_size, max_parameters // len(data_list[0])))
+
+    for start in range(0, len(data_list), chunk_size):
+        db.session.execute(insert(table).values(data_list[start:start + chunk_size]))
+    return len(data_list)
+
+
+def chunks(values, chunk_size=1000):
+    """Split values into lists of at most chunk_size, e.g. to keep IN (...) lists under the parameter limit"""
+    values = list(values)
+    chunk_size = max(1, min(chunk_size, MAX_PARAMETERS.get(dialect_name(), 32766) - 100))
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+def json_datetime(column):
+    """
+    SQL expression for a DateTime column as naive UTC ISO 8601 text with microseconds.
+
+    Matches datetime.isoformat(timespec='microseconds'), so values built in
+    SQL read the same as values serialized in Python.
+    """
+    if dialect_name() == 'postgresql':
+        if column.type.timezone:
+            column = column.op('AT TIME ZONE')(literal_column("'UTC'"))
+        return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    # SQLite stores datetimes as 'YYYY-MM-DD HH:MM:SS.ffffff' text
+    return func.replace(column, ' ', 'T')
+
+
+def json_object(columns):
+    """
+    SQL expression building a JSON object from {key: column}, for INSERT ... SELECT snapshots.
+
+    DateTime columns are embedded as json_datetime() strings.
+    """
+    columns = {
+        key: json_datetime(column) if isinstance(column.type, DateTime) else column
+        for key, column in columns.items()
+    }
+    if dialect_name() == 'postgresql':
+        build = func.json_build_object
+    else:
+        # SQLite keeps JSON columns as text; json() embeds them as values instead of strings
+        build = func.json_object
+        columns = {
+            key: func.json(column) if isinstance(column.type, JSON) else column
+            for key, column in columns.items()
+        }
+
+    arguments = []
+    for key, column in columns.items():
+        arguments.extend([key, column])
+    return build(*arguments)
+
+
+def delete_returning(model, columns, *criteria):
+    """
+    Delete the model rows matching criteria and return the given columns of each.
+
+    Uses DELETE ... RETURNING where the dialect supports it, and a SELECT
+    followed by the DELETE otherwise. Runs in the current transaction.
+    """
+    statement = delete(model).where(*criteria).execution_options(synchronize_session=False)
+    if db.session.get_bind().dialect.delete_returning:
+        return db.session.execute(statement.returning(*columns)).all()
+
+    rows = db.session.execute(select(*columns).where(*criteria)).all()
+    if rows:
+        db.session.execute(statement)
+    return rows
 
 
 def paginate_query(query, page=1, per_page=20):
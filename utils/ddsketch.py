@@ -0,0 +1,112 @@
+# utils/ddsketch.py
+"""
+DDSketch: a mergeable quantile sketch with relative-error guarantees.
+
+Positive values are counted in logarithmic bins: bin i covers
+(gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a), so every quantile is
+answered within relative accuracy a. Adding, removing and merging values
+only touch bin counters. With a = 1% one minute to one year of hours fits
+in under 700 bins. See Masson, Rim and Lee, "DDSketch" (VLDB 2019).
+"""
+import math
+
+# Values at or below this are counted as zero
+MIN_VALUE = 1e-9
+
+
+class DDSketch:
+    """Quantile sketch over non-negative values"""
+
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def _index(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index):
+        """Representative value of a bin, within relative_accuracy of anything in it"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value, weight=1):
+        """Count value weight times (a negative weight removes it)"""
+        if value <= MIN_VALUE:
+            self.zero_count = max(self.zero_count + weight, 0)
+        else:
+            index = self._index(value)
+            remaining = self.bins.get(index, 0) + weight
+            if remaining > 0:
+                self.bins[index] = remaining
+            else:
+                self.bins.pop(index, None)
+            self._collapse()
+
+        self.count = max(self.count + weight, 0)
+        self.total = self.total + value * weight if self.count else 0.0
+
+    def remove(self, value):
+        """Forget one earlier add(value)"""
+        self.add(value, -1)
+
+    def merge(self, other):
+        """Add every value counted by other (same relative accuracy)"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different relative accuracy')
+
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest bins together once there are more than max_bins"""
+        while len(self.bins) > self.max_bins:
+            lowest, second = sorted(self.bins)[:2]
+            self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or None when empty"""
+        if self.count <= 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return self._value(index)
+        return self._value(max(self.bins)) if self.bins else 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """Compact JSON-serializable form"""
+        return {
+            'a': self.relative_accuracy,
+            'n': self.count,
+            'z': self.zero_count,
+            's': round(self.total, 6),
+            'b': {str(index): count for index, count in sorted(self.bins.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(relative_accuracy=data.get('a', 0.01))
+        sketch.count = data.get('n', 0)
+        sketch.zero_count = data.get('z', 0)
+        sketch.total = data.get('s', 0.0)
+        sketch.bins = {int(index): count for index, count in (data.get('b') or {}).items()}
+        return sketch
@@ -0,0 +1,228 @@
+# utils/export.py
+"""
+Streaming task exports (CSV, NDJSON and JSON documents) and PDF reports.
+
+Rows are read in batches (yield_per; a server-side cursor on PostgreSQL)
+and encoded chunk by chunk, optionally gzip-compressed on the fly, so
+memory stays flat no matter how many tasks an account has.
+"""
+import csv
+import json
+import zlib
+from datetime import datetime
+from io import StringIO
+from flask import Response, stream_with_context
+from fpdf import FPDF
+from sqlalchemy import select, func
+from extensions import db
+from models.task import Task
+from utils.aggregates import task_aggregates, count_if
+
+# (CSV header, column) pairs of the CSV export
+CSV_COLUMNS = (
+    ('ID', Task.id),
+    ('Title', Task.title),
+    ('Category', Task.category),
+    ('Priority', Task.priority),
+    ('Impact', Task.impact),
+    ('Status', Task.status),
+    ('Progress', Task.progress),
+    ('Due Date', Task.due_date),
+    ('Created At', Task.created_at),
+    ('Completed At', Task.completed_at),
+)
+
+
+def export_filename(extension):
+    """Download name for an export, e.g. decisionai_export_20240318.csv"""
+    return f'decisionai_export_{datetime.utcnow().strftime("%Y%m%d")}.{extension}'
+
+
+def stream_task_rows(user_id, columns, batch_size=1000):
+    """Yield a user's tasks as column tuples, fetching batch_size rows at a time"""
+    statement = select(*columns).where(
+        Task.user_id == user_id
+    ).execution_options(yield_per=batch_size)
+
+    yield from db.session.execute(statement)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else ''
+
+
+def csv_task_row(row):
+    """CSV cells for one row of CSV_COLUMNS"""
+    return [
+        row.id,
+        row.title,
+        row.category,
+        row.priority,
+        row.impact,
+        row.status,
+        f'{row.progress}%',
+        _isoformat(row.due_date),
+        _isoformat(row.created_at),
+        _isoformat(row.completed_at)
+    ]
+
+
+def iter_csv(user_id, batch_size=1000):
+    """Yield the CSV export of a user's tasks in chunks of about batch_size rows"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in CSV_COLUMNS])
+
+    pending = 0
+    for row in stream_task_rows(user_id, [column for _, column in CSV_COLUMNS], batch_size):
+        writer.writerow(csv_task_row(row))
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+
+def stream_tasks(user_id, batch_size=500):
+    """Yield a user's Task objects, loading batch_size rows at a time"""
+    yield from Task.query.filter_by(user_id=user_id).yield_per(batch_size)
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+def iter_ndjson(user_id, batch_size=500):
+    """Yield the NDJSON export of a user's tasks, one task dictionary per line"""
+    lines = []
+    for task in stream_tasks(user_id, batch_size):
+        lines.append(_dumps(task.to_dict()))
+        if len(lines) >= batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_json_document(user_id, summary, batch_size=500):
+    """
+    Yield the JSON export envelope piece by piece:
+    {"success": true, "format": "json", "data": {"summary": ..., "tasks": [...]}}
+    """
+    yield '{"success":true,"format":"json","data":{"summary":' + _dumps(summary) + ',"tasks":['
+
+    separator = ''
+    chunk = []
+    for task in stream_tasks(user_id, batch_size):
+        chunk.append(separator + _dumps(task.to_dict()))
+        separator = ','
+        if len(chunk) >= batch_size:
+            yield ''.join(chunk)
+            chunk = []
+
+    yield ''.join(chunk) + ']}}'
+
+
+def task_summary(user):
+    """Summary block of the JSON export, computed in one aggregate query"""
+    counts = task_aggregates(user.id, {
+        'total_tasks': func.count(Task.id),
+        'completed_tasks': count_if(Task.status == 'completed'),
+        'pending_tasks': count_if(Task.status == 'pending')
+    })
+
+    return {
+        'total_tasks': int(counts['total_tasks']),
+        'completed_tasks': int(counts['completed_tasks']),
+        'pending_tasks': int(counts['pending_tasks']),
+        'export_date': datetime.utcnow().isoformat(),
+        'user': user.email
+    }
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip-compress a stream of text (UTF-8 encoded) or bytes chunks on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_response(chunks, mimetype, filename=None, compression=None):
+    """
+    Response streaming chunks within the request context.
+
+    filename adds an attachment Content-Disposition; compression='gzip'
+    compresses the body and sets Content-Encoding.
+    """
+    headers = {}
+    if filename:
+        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if compression == 'gzip':
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+# (header, column, width in mm) of the PDF report table
+PDF_COLUMNS = (
+    ('Title', Task.title, 80),
+    ('Category', Task.category, 30),
+    ('Priority', Task.priority, 18),
+    ('Impact', Task.impact, 16),
+    ('Status', Task.status, 24),
+    ('Due Date', Task.due_date, 22),
+)
+
+
+def _latin1(value):
+    """Core PDF fonts only cover latin-1"""
+    return str(value).encode('latin-1', 'replace').decode('latin-1')
+
+
+def write_pdf(user, path, batch_size=1000):
+    """Write a PDF report (summary and task table) of a user's tasks to path"""
+    summary = task_summary(user)
+
+    pdf = FPDF(orientation='P', unit='mm', format='A4')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font('Helvetica', 'B', 16)
+    pdf.cell(0, 10, 'DecisionAI task export', new_x='LMARGIN', new_y='NEXT')
+    pdf.set_font('Helvetica', '', 10)
+    pdf.cell(0, 6, _latin1(f"{summary['user']} - {summary['export_date'][:10]}"), new_x='LMARGIN', new_y='NEXT')
+    pdf.cell(0, 6, (
+        f"Total: {summary['total_tasks']}  Completed: {summary['completed_tasks']}  "
+        f"Pending: {summary['pending_tasks']}"
+    ), new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(4)
+
+    pdf.set_font('Helvetica', 'B', 9)
+    for header, _, width in PDF_COLUMNS:
+        pdf.cell(width, 7, header, border=1)
+    pdf.ln()
+
+    pdf.set_font('Helvetica', '', 8)
+    columns = [column for _, column, _ in PDF_COLUMNS]
+    for row in stream_task_rows(user.id, columns, batch_size):
+        values = [
+            row.title, row.category, row.priority, row.impact, row.status,
+            row.due_date.strftime('%Y-%m-%d') if row.due_date else ''
+        ]
+        for value, (_, _, width) in zip(values, PDF_COLUMNS):
+            text = _latin1('' if value is None else value)
+            while text and pdf.get_string_width(text) > width - 2:
+                text = text[:-1]
+            pdf.cell(width, 6, text, border=1)
+        pdf.ln()
+
+    pdf.output(path)
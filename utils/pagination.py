@@ -0,0 +1,85 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination for task listings.
+
+Instead of OFFSET, a page seeks past the last row of the previous one on
+(sort column, id). With the (user_id, column, id) indexes of the tasks
+table every page is an index range scan of `limit` rows, so deep pages
+cost the same as the first, and rows inserted between requests never
+shift or repeat a page. The continuation token is an opaque URL-safe
+encoding of the sort, its direction and the last row's key.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import DateTime, tuple_
+from models.task import Task
+
+# Sort columns that can be paged by key; each is indexed with id and NOT NULL,
+# as a row-value comparison would skip NULL rows
+KEYSET_COLUMNS = {
+    'priority': Task.priority,
+    'due_date': Task.due_date,
+    'created_at': Task.created_at,
+    'category': Task.category,
+}
+
+
+def encode_cursor(sort_by, order, value, row_id):
+    """Continuation token for the rows after (value, row_id)"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    payload = json.dumps([sort_by, order, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, sort_by, order):
+    """(value, id) key of a continuation token, for the same sort and order"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if (cursor_sort, cursor_order) != (sort_by, order):
+        raise ValueError('Cursor does not match the requested sort order')
+
+    if isinstance(KEYSET_COLUMNS[sort_by].type, DateTime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+    return value, row_id
+
+
+def keyset_page(query, sort_by, order='asc', cursor=None, limit=20):
+    """
+    One page of query ordered by (sort_by, id).
+
+    Returns the page's rows and the cursor of the next page, or None on the
+    last page. Fetches one extra row to tell whether more follow.
+    """
+    if sort_by not in KEYSET_COLUMNS:
+        raise ValueError(f'Cursor pagination supports sort_by: {", ".join(KEYSET_COLUMNS)}')
+
+    column = KEYSET_COLUMNS[sort_by]
+    descending = order == 'desc'
+
+    if cursor:
+        key = tuple_(column, Task.id)
+        after = decode_cursor(cursor, sort_by, order)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+
+    if descending:
+        query = query.order_by(column.desc(), Task.id.desc())
+    else:
+        query = query.order_by(column.asc(), Task.id.asc())
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
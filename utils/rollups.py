@@ -0,0 +1,205 @@
+# utils/rollups.py
+"""
+Incremental maintenance of the per-user daily analytics rollup.
+
+Writers take a task's contribution before changing it and record the
+difference afterwards; the delta is upserted into user_daily_stats inside
+the caller's transaction, so the rollup commits (or rolls back) with the
+task itself.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from utils.aggregates import sum_if
+from utils.time_buckets import as_utc
+from models.analytics import UserDailyStats
+from models.task import Task
+
+ROLLUP_COUNTERS = (
+    'tasks_created', 'impact_created', 'high_priority_created',
+    'tasks_completed', 'impact_completed', 'high_priority_completed',
+    'tasks_on_time', 'completion_hours', 'timed_completions'
+)
+
+# Columns needed to compute a contribution; lets rebuilds skip full ORM rows
+CONTRIBUTION_COLUMNS = (
+    Task.user_id, Task.status, Task.priority, Task.impact, Task.due_date,
+    Task.created_at, Task.started_at, Task.completed_at
+)
+
+
+def _add(days, day, counter, value):
+    counters = days.setdefault(day, {})
+    counters[counter] = counters.get(counter, 0) + value
+
+
+def task_contribution(task):
+    """
+    Rollup counters a task contributes, as {day: {counter: value}}.
+
+    Accepts a Task or any row exposing the same column attributes.  Completed
+    tasks without a completed_at timestamp count as completed on the day they
+    were created.
+    """
+    if task is None:
+        return {}
+
+    days = {}
+    created_at = as_utc(task.created_at) or datetime.now(timezone.utc)
+    created_day = created_at.date()
+    impact = task.impact or 0
+    high_priority = 1 if task.priority == 1 else 0
+
+    _add(days, created_day, 'tasks_created', 1)
+    _add(days, created_day, 'impact_created', impact)
+    _add(days, created_day, 'high_priority_created', high_priority)
+
+    if task.status == 'completed':
+        completed_at = as_utc(task.completed_at)
+        completed_day = completed_at.date() if completed_at else created_day
+        due_date = as_utc(task.due_date)
+        started_at = as_utc(task.started_at)
+
+        _add(days, completed_day, 'tasks_completed', 1)
+        _add(days, completed_day, 'impact_completed', impact)
+        _add(days, completed_day, 'high_priority_completed', high_priority)
+        if completed_at and due_date and completed_at <= due_date:
+            _add(days, completed_day, 'tasks_on_time', 1)
+        if completed_at and started_at:
+            hours = (completed_at - started_at).total_seconds() / 3600
+            _add(days, completed_day, 'completion_hours', hours)
+            _add(days, completed_day, 'timed_completions', 1)
+
+    return days
+
+
+def rollup_delta(before, after):
+    """Counter changes between two contributions, dropping days that net to zero"""
+    delta = {}
+    for day in set(before) | set(after):
+        old = before.get(day, {})
+        new = after.get(day, {})
+        changes = {
+            counter: new.get(counter, 0) - old.get(counter, 0)
+            for counter in ROLLUP_COUNTERS
+        }
+        if any(changes.values()):
+            delta[day] = changes
+    return delta
+
+
+def merge_delta(target, delta):
+    """Accumulate delta into target in place (for batching bulk operations)"""
+    for day, counters in delta.items():
+        for counter, value in counters.items():
+            _add(target, day, counter, value)
+    return target
+
+
+def _upsert_statement():
+    """INSERT ... ON CONFLICT that adds the inserted counters to an existing row"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    else:
+        return None
+
+    table = UserDailyStats.__table__
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            counter: table.c[counter] + statement.excluded[counter]
+            for counter in ROLLUP_COUNTERS
+        }
+    )
+
+
+def apply_rollup_delta(user_id, delta):
+    """Add delta to the user's rollup rows in the current transaction"""
+    if not delta:
+        return
+
+    rows = [
+        {'user_id': user_id, 'day': day, **{c: counters.get(c, 0) for c in ROLLUP_COUNTERS}}
+        for day, counters in delta.items()
+    ]
+
+    statement = _upsert_statement()
+    if statement is not None:
+        db.session.execute(statement, rows)
+        return
+
+    # Dialects without ON CONFLICT support: read-modify-write through the ORM
+    for row in rows:
+        stats = db.session.get(UserDailyStats, (user_id, row['day']))
+        if stats is None:
+            db.session.add(UserDailyStats(**row))
+        else:
+            for counter in ROLLUP_COUNTERS:
+                setattr(stats, counter, getattr(stats, counter) + row[counter])
+
+
+def record_task_change(user_id, before, after):
+    """Apply the rollup difference between two task contributions"""
+    apply_rollup_delta(user_id, rollup_delta(before, after))
+
+
+def rebuild_rollups(user_id=None, batch_size=1000):
+    """
+    Recompute user_daily_stats from the tasks table (all users, or one user).
+
+    Returns the number of rollup rows written.  Caller commits.
+    """
+    delete = db.session.query(UserDailyStats)
+    query = db.session.query(*CONTRIBUTION_COLUMNS)
+    if user_id:
+        delete = delete.filter(UserDailyStats.user_id == user_id)
+        query = query.filter(Task.user_id == user_id)
+    delete.delete(synchronize_session=False)
+
+    totals = {}
+    for row in query.yield_per(batch_size):
+        merge_delta(totals.setdefault(row.user_id, {}), task_contribution(row))
+
+    rows = [
+        UserDailyStats(user_id=owner, day=day, **{c: counters.get(c, 0) for c in ROLLUP_COUNTERS})
+        for owner, days in totals.items()
+        for day, counters in days.items()
+    ]
+    db.session.add_all(rows)
+    return len(rows)
+
+
+def rollup_totals(user_id, start_day=None, end_day=None):
+    """Sum every rollup counter for a user, optionally within [start_day, end_day]"""
+    query = db.session.query(
+        *[func.coalesce(func.sum(getattr(UserDailyStats, c)), 0).label(c) for c in ROLLUP_COUNTERS]
+    ).filter(UserDailyStats.user_id == user_id)
+    if start_day:
+        query = query.filter(UserDailyStats.day >= start_day)
+    if end_day:
+        query = query.filter(UserDailyStats.day <= end_day)
+
+    row = query.one()
+    return {counter: getattr(row, counter) for counter in ROLLUP_COUNTERS}
+
+
+def rollup_summary(user_id, days):
+    """
+    All-time rollup totals plus the completions on each of days, in one statement.
+
+    Returns (totals, completions) where completions lines up with days.
+    """
+    counters = [func.coalesce(func.sum(getattr(UserDailyStats, c)), 0).label(c) for c in ROLLUP_COUNTERS]
+    per_day = [
+        func.coalesce(sum_if(UserDailyStats.day == day, UserDailyStats.tasks_completed), 0).label(f'day_{i}')
+        for i, day in enumerate(days)
+    ]
+
+    row = db.session.query(*counters, *per_day).filter(UserDailyStats.user_id == user_id).one()
+    totals = {counter: getattr(row, counter) for counter in ROLLUP_COUNTERS}
+    return totals, [int(getattr(row, f'day_{i}')) for i in range(len(days))]
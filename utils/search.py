@@ -0,0 +1,163 @@
+# utils/search.py
+"""
+Full-text task search.
+
+PostgreSQL: tasks.search_vector is a stored generated tsvector of the
+title (weight A) and description (weight B) with a GIN index, so the
+database keeps it in sync on every write. Matches use @@ and are ranked
+with ts_rank.
+
+SQLite: tasks_fts is an external-content FTS5 table over the same two
+columns. Triggers on tasks keep it in sync. Matches are ranked with bm25,
+with the title weighted higher. The matches are computed once in a
+materialized CTE (SQLite 3.35+) and joined to tasks by rowid.
+
+Search terms are split into words and every word is matched as a prefix,
+so "desi rev" finds "Design review". The DDL runs with create_all. For
+databases created before it, `flask rebuild-search-index` creates it.
+Run that command again after a SQLite VACUUM, which may renumber the
+rowids the FTS table points at. Other databases, or a missing index, fall
+back to ILIKE.
+"""
+import re
+from flask import current_app
+from sqlalchemy import DDL, event, func, inspect, literal_column, or_, select, text
+from extensions import db
+from models.task import Task
+from utils.aggregates import dialect_name
+
+# (dialect, statement) pairs run after the tasks table is created
+CREATE_INDEX = (
+    ('postgresql', """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """),
+    ('postgresql', 'CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks USING GIN (search_vector)'),
+    ('sqlite', """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, content='tasks', content_rowid='rowid', tokenize='porter unicode61'
+        )
+    """),
+    ('sqlite', """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+        END
+    """),
+    ('sqlite', """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.rowid, old.title, old.description);
+        END
+    """),
+    ('sqlite', """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.rowid, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+        END
+    """),
+)
+
+DROP_INDEX = (
+    ('sqlite', 'DROP TABLE IF EXISTS tasks_fts'),
+)
+
+# bm25 weights of the title and description columns
+BM25_WEIGHTS = (10.0, 1.0)
+
+
+def _ddl(statements):
+    return [DDL(statement).execute_if(dialect=dialect) for dialect, statement in statements]
+
+
+_CREATE_DDL = _ddl(CREATE_INDEX)
+_DROP_DDL = _ddl(DROP_INDEX)
+
+
+def search_words(term):
+    """Lower-cased words of a search term"""
+    return re.findall(r'\w+', (term or '').lower())
+
+
+class TaskSearch:
+    """Full-text search over task titles and descriptions"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TASK_SEARCH_ENABLED', True)
+        app.extensions['task_search'] = {'available': None}
+
+        # Attach the DDL to the tasks table once per process
+        table = Task.__table__
+        if not event.contains(table, 'after_create', _CREATE_DDL[0]):
+            for ddl in _CREATE_DDL:
+                event.listen(table, 'after_create', ddl)
+            for ddl in _DROP_DDL:
+                event.listen(table, 'before_drop', ddl)
+
+    @property
+    def available(self):
+        """Whether the full-text index exists on the app's database"""
+        if not current_app.config['TASK_SEARCH_ENABLED']:
+            return False
+
+        state = current_app.extensions['task_search']
+        if state['available'] is None:
+            dialect = dialect_name()
+            inspector = inspect(db.engine)
+            if dialect == 'postgresql':
+                state['available'] = any(
+                    column['name'] == 'search_vector' for column in inspector.get_columns('tasks')
+                )
+            elif dialect == 'sqlite':
+                state['available'] = inspector.has_table('tasks_fts')
+            else:
+                state['available'] = False
+        return state['available']
+
+    def rebuild(self):
+        """Create the index if missing and refill it from the tasks table"""
+        with db.engine.begin() as connection:
+            for ddl in _CREATE_DDL:
+                ddl(Task.__table__, connection)
+            if connection.dialect.name == 'sqlite':
+                connection.execute(text("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')"))
+        current_app.extensions['task_search']['available'] = None
+
+    def apply(self, query, term):
+        """
+        Filter a Task query to the tasks matching term.
+
+        Returns the query and a relevance expression (higher is better), or
+        None for the relevance when matching fell back to ILIKE.
+        """
+        words = search_words(term)
+        if not words or not self.available:
+            pattern = f'%{term}%'
+            return query.filter(or_(Task.title.ilike(pattern), Task.description.ilike(pattern))), None
+
+        if dialect_name() == 'postgresql':
+            vector = literal_column('tasks.search_vector')
+            tsquery = func.to_tsquery('english', ' & '.join(f'{word}:*' for word in words))
+            return query.filter(vector.op('@@')(tsquery)), func.ts_rank(vector, tsquery)
+
+        # Materialized so the MATCH runs once; as a plain subquery SQLite may
+        # probe the FTS table once per task row instead
+        fts = literal_column('tasks_fts')
+        matches = select(
+            literal_column('rowid').label('rowid'),
+            (-func.bm25(fts, *BM25_WEIGHTS)).label('relevance')
+        ).select_from(text('tasks_fts')).where(
+            fts.op('MATCH')(' '.join(f'"{word}"*' for word in words))
+        ).cte('search_matches').prefix_with('MATERIALIZED')
+
+        query = query.join(matches, matches.c.rowid == literal_column('tasks.rowid'))
+        return query, matches.c.relevance
+
+
+task_search = TaskSearch()
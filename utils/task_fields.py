@@ -0,0 +1,90 @@
+# utils/task_fields.py
+"""
+Sparse fieldsets for task listings.
+
+A fields=id,title,status parameter selects only the columns the named
+fields are computed from, so list views skip the description, tags and
+ai_insights JSON. A TaskProjection is compiled once per field set into
+its column list and one getter per field. Rows stay plain result tuples,
+and the computed fields run the Task property code on them.
+"""
+from functools import lru_cache
+from operator import attrgetter
+from models.task import Task
+
+
+def _isoformat(name):
+    get = attrgetter(name)
+
+    def _get(row):
+        value = get(row)
+        return value.isoformat() if value else None
+    return _get
+
+
+# Field -> (columns it is computed from, getter on a result row), in to_dict order
+TASK_FIELDS = {
+    **{name: ((name,), attrgetter(name)) for name in (
+        'id', 'title', 'description', 'category', 'tags', 'priority', 'impact',
+        'complexity', 'estimated_hours', 'status', 'progress'
+    )},
+    **{name: ((name,), _isoformat(name)) for name in (
+        'due_date', 'completed_at', 'created_at', 'updated_at', 'started_at'
+    )},
+    'ai_insights': (('ai_insights',), attrgetter('ai_insights')),
+    'user_id': (('user_id',), attrgetter('user_id')),
+    'is_overdue': (('status', 'due_date'), Task.is_overdue.fget),
+    'task_score': (('priority', 'impact', 'complexity'), Task.task_score.fget),
+    'days_until_due': (('due_date', 'status'), Task.days_until_due.fget),
+}
+
+
+class TaskProjection:
+    """Columns to select and serializer for one set of task fields"""
+
+    def __init__(self, fields):
+        # id is always returned, so clients can address the rows
+        self.fields = ('id',) + tuple(field for field in fields if field != 'id')
+        self._getters = [(field, TASK_FIELDS[field][1]) for field in self.fields]
+        self.column_names = tuple(dict.fromkeys(
+            name for field in self.fields for name in TASK_FIELDS[field][0]
+        ))
+
+    def select(self, query, *extra_columns):
+        """query restricted to the projected columns (plus extra_columns, e.g. a sort key)"""
+        names = self.column_names + tuple(
+            column.key for column in extra_columns if column.key not in self.column_names
+        )
+        return query.with_entities(*(getattr(Task, name) for name in names))
+
+    def serialize(self, row):
+        return {field: get(row) for field, get in self._getters}
+
+
+@lru_cache(maxsize=128)
+def _compiled(fields):
+    return TaskProjection(fields)
+
+
+def task_projection(fields):
+    """
+    Compiled projection for a comma-separated fields parameter.
+
+    Returns None when no fields are given (full to_dict rows); raises
+    ValueError naming unknown fields.
+    """
+    names = tuple(dict.fromkeys(name.strip() for name in (fields or '').split(',') if name.strip()))
+    if not names:
+        return None
+
+    unknown = [name for name in names if name not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return _compiled(names)
+
+
+def serialize_tasks(rows, projection=None):
+    """Task dicts of rows; full to_dict() unless rows come from projection.select()"""
+    if projection is None:
+        return [task.to_dict() for task in rows]
+    return [projection.serialize(row) for row in rows]
@@ -0,0 +1,274 @@
+# utils/task_history.py
+"""
+Delta-encoded task history.
+
+Each task's history rows carry a version (1, 2, ...). Most rows store
+only the persisted columns an event changed, as {'delta': {column: new
+value}}. Creation, deletion and every SNAPSHOT_INTERVAL-th version store
+the full state instead, as {'snapshot': {column: value}}, so a task's
+state at any version is rebuilt from the nearest snapshot plus at most
+SNAPSHOT_INTERVAL - 1 deltas. Computed fields (is_overdue, task_score,
+days_until_due) and bookkeeping columns (id, user_id, updated_at) are not
+stored: they are derivable, and the computed ones drift daily anyway.
+
+With TASK_HISTORY_WRITE_BEHIND on, record_history hands the events to
+the write-behind queue (services/history_queue.py) instead of inserting
+them in the request transaction; versions are then assigned at flush.
+"""
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import bindparam, func, insert, literal, select, update
+from extensions import db
+from models.task import Task, TaskHistory
+from utils.aggregates import dialect_name
+from utils.database import bulk_create, chunks, json_object
+
+# Persisted task columns tracked in history
+STATE_COLUMNS = (
+    Task.title, Task.description, Task.category, Task.tags, Task.priority, Task.impact,
+    Task.complexity, Task.estimated_hours, Task.status, Task.progress, Task.due_date,
+    Task.completed_at, Task.created_at, Task.started_at, Task.ai_insights
+)
+STATE_KEYS = tuple(column.key for column in STATE_COLUMNS)
+
+# Every SNAPSHOT_INTERVAL-th version of a task stores its full state
+SNAPSHOT_INTERVAL = 20
+
+
+def _json_value(value):
+    """JSON-safe form of a column value; datetimes become naive UTC ISO strings (see json_datetime)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec='microseconds')
+    return value
+
+
+def task_state(task):
+    """History state of a Task, or of any row exposing the state columns"""
+    return {key: _json_value(getattr(task, key)) for key in STATE_KEYS}
+
+
+def state_delta(before, after):
+    """The entries of after that differ from before"""
+    before = before or {}
+    return {key: value for key, value in after.items() if key not in before or before[key] != value}
+
+
+def is_snapshot(action, version):
+    """Whether the history row at version stores the full state"""
+    return action in ('created', 'deleted') or version == 1 or version % SNAPSHOT_INTERVAL == 0
+
+
+def history_changes(action, version, before, after):
+    """The changes payload of a history row"""
+    if is_snapshot(action, version):
+        return {'snapshot': after}
+    return {'delta': state_delta(before, after)}
+
+
+def lock_tasks(criteria):
+    """
+    Lock the task rows matching criteria until the transaction ends.
+
+    Versions are numbered as max(version) + 1, so writers of one task's
+    history take its row lock before reading the max; the unique
+    (task_id, version) index rejects whatever still races. SQLite has no
+    row locks (it serializes writers), so the statement is skipped there.
+    """
+    if dialect_name() != 'sqlite':
+        db.session.execute(select(Task.id).where(*criteria).order_by(Task.id).with_for_update())
+
+
+def next_versions(task_ids):
+    """{task_id: next history version} for tasks with history, their rows locked; one grouped SELECT per chunk"""
+    versions = {}
+    for chunk in chunks(dict.fromkeys(task_ids), 10000):
+        lock_tasks((Task.id.in_(chunk),))
+        rows = db.session.query(
+            TaskHistory.task_id, func.max(TaskHistory.version)
+        ).filter(
+            TaskHistory.task_id.in_(chunk)
+        ).group_by(TaskHistory.task_id).all()
+        versions.update((task_id, (version or 0) + 1) for task_id, version in rows)
+    return versions
+
+
+def record_history(user_id, events, timestamp=None):
+    """
+    Record history for (task_id, action, before, after) events of one user.
+
+    before and after are task_state() dicts; before is None for a created
+    task. The rows are written in the caller's transaction, or queued for
+    the write-behind flusher once it commits when that mode is on. Returns
+    the number of events.
+    """
+    timestamp = timestamp or datetime.utcnow()
+    entries = [
+        {'user_id': user_id, 'task_id': task_id, 'action': action, 'before': before, 'after': after,
+         'timestamp': timestamp}
+        for task_id, action, before, after in events
+    ]
+
+    queue = current_app.extensions.get('history_queue')
+    if queue is not None:
+        queue.defer(db.session, entries)
+        return len(entries)
+    return write_history(entries)
+
+
+def write_history(entries):
+    """
+    Insert history rows for entries (dicts with user_id, task_id, action, before, after, timestamp).
+
+    A created task's row is version 1 without a lookup. Versions of the
+    other tasks come from one grouped query and count up through the
+    entries in order, and the rows go in with multi-row INSERTs in the
+    current transaction. Returns the number of rows.
+    """
+    versions = next_versions([entry['task_id'] for entry in entries if entry['before'] is not None])
+
+    rows = []
+    for entry in entries:
+        version = versions.get(entry['task_id'], 1) if entry['before'] is not None else 1
+        versions[entry['task_id']] = version + 1
+        rows.append({
+            'task_id': entry['task_id'],
+            'user_id': entry['user_id'],
+            'action': entry['action'],
+            'version': version,
+            'changes': history_changes(entry['action'], version, entry['before'], entry['after']),
+            'timestamp': entry['timestamp']
+        })
+    return bulk_create(TaskHistory, rows)
+
+
+def flush_queued_history():
+    """
+    Write out the write-behind queue, when that mode is on.
+
+    Writers that number versions in SQL (record_deletions) call this before
+    their transaction's first write: the queue is flushed on its own
+    connection, which would otherwise wait on the request's write lock.
+    """
+    queue = current_app.extensions.get('history_queue')
+    if queue is not None:
+        queue.drain()
+
+
+def record_deletions(criteria, timestamp=None):
+    """
+    Log a 'deleted' snapshot for every task matching criteria, in one INSERT ... SELECT.
+
+    Must run before the tasks are deleted; the snapshot is built in SQL.
+    Call flush_queued_history() before the transaction's first write, so the
+    versions follow any queued events.
+    """
+    lock_tasks(criteria)
+    previous = select(func.coalesce(func.max(TaskHistory.version), 0)).where(
+        TaskHistory.task_id == Task.id
+    ).scalar_subquery()
+    snapshot = json_object({'snapshot': json_object({column.key: column for column in STATE_COLUMNS})})
+
+    db.session.execute(insert(TaskHistory).from_select(
+        ['task_id', 'user_id', 'action', 'version', 'changes', 'timestamp'],
+        select(
+            Task.id, Task.user_id, literal('deleted'), previous + 1, snapshot,
+            literal(timestamp or datetime.utcnow(), TaskHistory.timestamp.type)
+        ).where(*criteria)
+    ))
+
+
+def task_state_at(task_id, version=None):
+    """
+    A task's history state as of version (the latest by default), or None without history.
+
+    Reads back from version to the nearest snapshot, then replays the deltas.
+    """
+    query = TaskHistory.query.filter(TaskHistory.task_id == task_id)
+    if version is not None:
+        query = query.filter(TaskHistory.version <= version)
+
+    deltas = []
+    for row in query.order_by(TaskHistory.version.desc()).yield_per(SNAPSHOT_INTERVAL):
+        changes = row.changes or {}
+        if 'snapshot' in changes:
+            state = dict(changes['snapshot'])
+            break
+        deltas.append(changes.get('delta') or {})
+    else:
+        if not deltas:
+            return None
+        state = {}
+
+    for delta in reversed(deltas):
+        state.update(delta)
+    return state
+
+
+def _legacy_state(action, changes, state):
+    """State after a pre-delta history row ({'from', 'to'} or {'deleted_task'} payloads)"""
+    def project(values):
+        return {key: values[key] for key in STATE_KEYS if key in values}
+
+    if 'snapshot' in changes:
+        return dict(changes['snapshot'])
+    if 'delta' in changes:
+        return {**state, **changes['delta']}
+    if isinstance(changes.get('deleted_task'), dict):
+        return {**state, **project(changes['deleted_task'])}
+    if isinstance(changes.get('to'), dict):
+        return {**state, **project(changes['to'])}
+    if action == 'status_updated':
+        return {**state, 'status': changes.get('to')}
+    if action == 'progress_updated':
+        return {**state, 'progress': changes.get('to')}
+    return state
+
+
+def compact_history(connection, batch_size=500):
+    """
+    Rewrite every task's history in the delta format and number its versions.
+
+    Rows in the old format (two full to_dict() snapshots per update) are
+    replayed per task in timestamp order, and rows already in the new
+    format are renumbered. Runs on connection (e.g. a migration's bind) in
+    batches of batch_size tasks; returns the number of rows rewritten.
+    """
+    table = TaskHistory.__table__
+    statement = update(table).where(table.c.id == bindparam('row_id')).values(
+        version=bindparam('new_version'),
+        changes=bindparam('new_changes', type_=table.c.changes.type)
+    )
+
+    rewritten, last_task_id = 0, ''
+    while True:
+        task_ids = connection.execute(
+            select(table.c.task_id).where(table.c.task_id > last_task_id)
+            .group_by(table.c.task_id).order_by(table.c.task_id).limit(batch_size)
+        ).scalars().all()
+        if not task_ids:
+            return rewritten
+        last_task_id = task_ids[-1]
+
+        rows = connection.execute(
+            select(table.c.id, table.c.task_id, table.c.action, table.c.changes)
+            .where(table.c.task_id.in_(task_ids))
+            .order_by(table.c.task_id, table.c.timestamp, table.c.id)
+        ).all()
+
+        params, task_id, version, state = [], None, 0, {}
+        for row in rows:
+            if row.task_id != task_id:
+                task_id, version, state = row.task_id, 0, {}
+            version += 1
+            after = _legacy_state(row.action, row.changes or {}, state)
+            params.append({
+                'row_id': row.id,
+                'new_version': version,
+                'new_changes': history_changes(row.action, version, state, after)
+            })
+            state = after
+
+        connection.execute(statement, params)
+        rewritten += len(params)
@@ -0,0 +1,295 @@
+# utils/task_snapshot.py
+"""
+Columnar task snapshots for vectorized analytics.
+
+A snapshot holds the numeric columns of every task a user owns as NumPy
+arrays. Statuses are stored as small integer codes and timestamps as int64
+Unix seconds, with MISSING standing in for NULL. The arrays are loaded with
+one column-only query. Dashboard counters, the priority/impact distributions,
+time series and the rollup totals behind the performance and productivity
+scores are then computed from the arrays instead of with one SQL query per
+metric.
+
+Snapshots are cached per process under the user's analytics data version.
+Task writers bump that version after they commit, so a write invalidates
+the user's snapshot. NumPy is optional. Without it the engine reports
+itself disabled and analytics stay on SQL.
+"""
+from datetime import date, datetime, timezone
+from itertools import chain
+from sqlalchemy import select, func, case
+from flask import current_app
+from extensions import db
+from models.task import Task
+from utils.aggregates import epoch_seconds
+from utils.cache import MemoryCacheBackend, analytics_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+STATUS_CODES = {
+    'pending': 0,
+    'in-progress': 1,
+    'completed': 2,
+    'blocked': 3,
+    'archived': 4,
+}
+OTHER_STATUS = -1
+
+# Stand-in for NULL timestamps
+MISSING = -2 ** 63
+
+SECONDS_PER_DAY = 86400
+EPOCH_DAY = date(1970, 1, 1)
+
+# Timestamp columns, stored as int64 Unix seconds
+TIMESTAMP_COLUMNS = ('due_date', 'created_at', 'started_at', 'completed_at')
+
+
+def snapshot_columns():
+    """(name, SQL expression) pairs loaded into a snapshot, all numeric"""
+    return (
+        ('priority', func.coalesce(Task.priority, 0)),
+        ('impact', func.coalesce(Task.impact, 0)),
+        ('complexity', func.coalesce(Task.complexity, 0)),
+        ('estimated_hours', func.coalesce(Task.estimated_hours, 0)),
+        ('status', case(STATUS_CODES, value=Task.status, else_=OTHER_STATUS)),
+    ) + tuple(
+        (name, func.coalesce(epoch_seconds(getattr(Task, name)), MISSING))
+        for name in TIMESTAMP_COLUMNS
+    )
+
+
+def _epoch(value):
+    """Unix seconds of a datetime (naive means UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _day_number(value):
+    """Days since 1970-01-01 of a date"""
+    return (value - EPOCH_DAY).days
+
+
+class TaskSnapshot:
+    """One user's tasks as NumPy column arrays"""
+
+    def __init__(self, columns, loaded_at=None):
+        self.priority = columns['priority'].astype(np.int64)
+        self.impact = columns['impact'].astype(np.int64)
+        self.complexity = columns['complexity'].astype(np.int64)
+        self.estimated_hours = columns['estimated_hours'].astype(np.float64)
+        self.status = columns['status'].astype(np.int64)
+        self.due_date = columns['due_date'].astype(np.int64)
+        self.created_at = columns['created_at'].astype(np.int64)
+        self.started_at = columns['started_at'].astype(np.int64)
+        self.completed_at = columns['completed_at'].astype(np.int64)
+        self.loaded_at = loaded_at or datetime.utcnow()
+
+    @classmethod
+    def load(cls, user_id):
+        """Load a user's snapshot with one column-only query"""
+        names, expressions = zip(*snapshot_columns())
+        rows = db.session.execute(select(*expressions).where(Task.user_id == user_id)).all()
+
+        values = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * len(names))
+        matrix = values.reshape(len(rows), len(names))
+        return cls({name: matrix[:, i] for i, name in enumerate(names)})
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def completed(self):
+        return self.status == STATUS_CODES['completed']
+
+    @property
+    def timed_completions(self):
+        """Completed tasks that carry both start and completion timestamps"""
+        return self.completed & (self.started_at != MISSING) & (self.completed_at != MISSING)
+
+    def completion_hours(self, mask):
+        """Start-to-completion hours of the tasks selected by mask"""
+        return (self.completed_at[mask] - self.started_at[mask]) / 3600.0
+
+    def dashboard_metrics(self, now=None):
+        """Same counters as utils.aggregates.dashboard_metrics"""
+        now = _epoch(now or datetime.utcnow())
+        timed = self.timed_completions
+        open_tasks = ~self.completed
+        priorities = np.bincount(np.clip(self.priority, 0, 6), minlength=7)
+
+        metrics = {
+            'total_tasks': float(len(self)),
+            'completed_tasks': float(self.completed.sum()),
+            'pending_tasks': float((self.status == STATUS_CODES['pending']).sum()),
+            'in_progress_tasks': float((self.status == STATUS_CODES['in-progress']).sum()),
+            'overdue_tasks': float((open_tasks & (self.due_date != MISSING) & (self.due_date < now)).sum()),
+            'avg_completion_time': float(self.completion_hours(timed).mean()) if timed.any() else 0.0,
+            'avg_impact': float(self.impact.mean()) if len(self) else 0.0,
+        }
+        for priority in range(1, 6):
+            metrics[f'priority_{priority}'] = float(priorities[priority])
+
+        return metrics
+
+    def rollup_totals(self):
+        """Same counters as utils.rollups.rollup_totals over all time"""
+        completed = self.completed
+        high_priority = self.priority == 1
+        timed = self.timed_completions
+        on_time = (
+            completed & (self.completed_at != MISSING) & (self.due_date != MISSING)
+            & (self.completed_at <= self.due_date)
+        )
+
+        return {
+            'tasks_created': float(len(self)),
+            'impact_created': float(self.impact.sum()),
+            'high_priority_created': float(high_priority.sum()),
+            'tasks_completed': float(completed.sum()),
+            'impact_completed': float(self.impact[completed].sum()),
+            'high_priority_completed': float((high_priority & completed).sum()),
+            'tasks_on_time': float(on_time.sum()),
+            'completion_hours': float(self.completion_hours(timed).sum()),
+            'timed_completions': float(timed.sum()),
+        }
+
+    def priority_distribution(self):
+        """Count, average impact, completion rate and completion time per priority 1-5"""
+        completed = self.completed
+        timed = self.timed_completions
+        hours = np.zeros(len(self))
+        hours[timed] = self.completion_hours(timed)
+
+        distribution = []
+        for priority in range(1, 6):
+            mask = self.priority == priority
+            count = int(mask.sum())
+            timed_count = int((mask & timed).sum())
+            distribution.append({
+                'priority_level': priority,
+                'count': count,
+                'avg_impact': round(float(self.impact[mask].mean()), 2) if count else 0,
+                'completion_rate': round(float(completed[mask].mean() * 100), 2) if count else 0,
+                'avg_completion_time': round(float(hours[mask & timed].sum() / timed_count), 2) if timed_count else 0
+            })
+
+        return distribution
+
+    def impact_distribution(self):
+        """Number of tasks per impact level 1-10"""
+        counts = np.bincount(np.clip(self.impact, 0, 11), minlength=12)
+        return {impact: int(counts[impact]) for impact in range(1, 11)}
+
+    def _created_days(self):
+        created = np.where(self.created_at != MISSING, self.created_at, _epoch(datetime.utcnow()))
+        return created // SECONDS_PER_DAY
+
+    def _buckets(self, days, granularity):
+        """Bucket start (days since epoch) of each day number"""
+        if granularity == 'week':
+            # 1970-01-01 was a Thursday, three days after a Monday
+            return days - (days + 3) % 7
+        if granularity == 'month':
+            months = days.astype('datetime64[D]').astype('datetime64[M]')
+            return months.astype('datetime64[D]').astype(np.int64)
+        return days
+
+    def _count_buckets(self, days, weights, start, end, granularity):
+        in_range = (days >= _day_number(start)) & (days <= _day_number(end))
+        buckets = self._buckets(days[in_range], granularity)
+        keys, inverse = np.unique(buckets, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        sums = np.bincount(inverse, weights=weights[in_range], minlength=len(keys))
+        return {
+            date.fromordinal(EPOCH_DAY.toordinal() + int(key)): (int(count), float(total))
+            for key, count, total in zip(keys, counts, sums)
+        }
+
+    def time_series(self, start, end, granularity='day'):
+        """
+        Created/completed counts and completed impact per bucket between two dates.
+
+        Mirrors time_series over the daily rollup, returning
+        {bucket_start_date: {'created', 'completed', 'impact'}}. Completions
+        count on their completion day, or on the creation day when no
+        completed_at is recorded.
+        """
+        created_days = self._created_days()
+        completed = self.completed
+        completed_days = np.where(
+            self.completed_at != MISSING, self.completed_at // SECONDS_PER_DAY, created_days
+        )[completed]
+
+        created = self._count_buckets(created_days, self.impact, start, end, granularity)
+        finished = self._count_buckets(completed_days, self.impact[completed], start, end, granularity)
+
+        series = {}
+        for bucket in set(created) | set(finished):
+            created_count, _ = created.get(bucket, (0, 0.0))
+            completed_count, impact = finished.get(bucket, (0, 0.0))
+            series[bucket] = {'created': created_count, 'completed': completed_count, 'impact': impact}
+        return series
+
+    def daily_completions(self, days):
+        """Completed tasks on each of a list of consecutive dates"""
+        series = self.time_series(days[0], days[-1])
+        return [series.get(day, {}).get('completed', 0) for day in days]
+
+
+class TaskSnapshotCache:
+    """Per-process cache of task snapshots, invalidated by the analytics data version"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ANALYTICS_SNAPSHOT_ENABLED', False)
+        app.config.setdefault('ANALYTICS_SNAPSHOT_TTL', 300)
+        app.config.setdefault('ANALYTICS_SNAPSHOT_MAX_USERS', 64)
+        app.extensions['task_snapshots'] = {
+            'backend': MemoryCacheBackend(int(app.config['ANALYTICS_SNAPSHOT_MAX_USERS'])),
+            'hits': 0,
+            'loads': 0
+        }
+
+    @property
+    def enabled(self):
+        """Whether analytics should read from snapshots (requires numpy)"""
+        return (
+            np is not None
+            and 'task_snapshots' in current_app.extensions
+            and current_app.config['ANALYTICS_SNAPSHOT_ENABLED']
+        )
+
+    def get(self, user_id):
+        """
+        The user's snapshot, loading it on first use or after a write.
+
+        The version is read before loading, so a write that commits during
+        the load can only make the cached snapshot newer than its key.
+        """
+        state = current_app.extensions['task_snapshots']
+        key = f'snapshot:{user_id}:{analytics_cache.data_version(user_id)}'
+
+        snapshot = state['backend'].get(key)
+        if snapshot is not None:
+            state['hits'] += 1
+            return snapshot
+
+        state['loads'] += 1
+        snapshot = TaskSnapshot.load(user_id)
+        state['backend'].set(key, snapshot, current_app.config['ANALYTICS_SNAPSHOT_TTL'])
+        return snapshot
+
+    def clear(self):
+        if 'task_snapshots' in current_app.extensions:
+            current_app.extensions['task_snapshots']['backend'].clear()
+
+
+task_snapshots = TaskSnapshotCache()
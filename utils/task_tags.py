@@ -0,0 +1,111 @@
+# utils/task_tags.py
+"""
+Indexed tag filtering.
+
+Task.tags stays the JSON list the API returns. The task_tags table holds
+one (user_id, tag, task_id) row per tag, and its primary key is the index
+the filters and counts read. Writers pass a task's tags before and after
+a change, and only the difference is written, inside the caller's
+transaction. The statements are ORM-enabled, so pending tasks are
+flushed before their tag rows. Tags are matched case-insensitively; the
+index stores them stripped and lower-cased.
+"""
+from sqlalchemy import delete, func, insert, select
+from extensions import db
+from models.task import Task, TaskTag
+
+TAG_MATCHES = ('any', 'all')
+
+
+def normalize_tags(tags):
+    """Distinct index form of a tag list (stripped, lower-cased, at most 50 characters)"""
+    return {str(tag).strip().lower()[:50] for tag in tags or () if str(tag).strip()}
+
+
+def parse_tags(value):
+    """Index form of a comma-separated tags parameter"""
+    return normalize_tags((value or '').split(','))
+
+
+def sync_task_tags(user_id, task_id, old_tags, new_tags):
+    """Write the difference between a task's old and new tags to the index"""
+    old, new = normalize_tags(old_tags), normalize_tags(new_tags)
+
+    removed = old - new
+    if removed:
+        db.session.execute(delete(TaskTag).where(
+            TaskTag.user_id == user_id, TaskTag.task_id == task_id, TaskTag.tag.in_(removed)
+        ).execution_options(synchronize_session=False))
+
+    added = new - old
+    if added:
+        db.session.execute(insert(TaskTag), [
+            {'user_id': user_id, 'tag': tag, 'task_id': task_id} for tag in sorted(added)
+        ])
+
+
+def index_tasks(tasks):
+    """Index the tags of new tasks in one statement"""
+    rows = [
+        {'user_id': task.user_id, 'tag': tag, 'task_id': task.id}
+        for task in tasks
+        for tag in sorted(normalize_tags(task.tags))
+    ]
+    if rows:
+        db.session.execute(insert(TaskTag), rows)
+
+
+def unindex_tasks(task_ids):
+    """Drop the index rows of tasks about to be deleted"""
+    if task_ids:
+        db.session.execute(
+            delete(TaskTag).where(TaskTag.task_id.in_(task_ids)).execution_options(synchronize_session=False)
+        )
+
+
+def tag_filter(user_id, tags, match='any'):
+    """
+    Criterion for Task queries: tasks with any (or all) of tags.
+
+    Both forms are an index range scan of task_tags on (user_id, tag).
+    """
+    matching = select(TaskTag.task_id).where(
+        TaskTag.user_id == user_id,
+        TaskTag.tag.in_(sorted(tags))
+    )
+    if match == 'all':
+        matching = matching.group_by(TaskTag.task_id).having(func.count(TaskTag.tag) == len(tags))
+    return Task.id.in_(matching)
+
+
+def tag_counts(user_id):
+    """[{'tag', 'count'}] of the user's tags, most used first"""
+    rows = db.session.execute(
+        select(TaskTag.tag, func.count().label('count')).where(
+            TaskTag.user_id == user_id
+        ).group_by(TaskTag.tag).order_by(func.count().desc(), TaskTag.tag)
+    ).all()
+    return [{'tag': row.tag, 'count': row.count} for row in rows]
+
+
+def rebuild_task_tags(user_id=None, batch_size=1000):
+    """
+    Recompute task_tags from the tasks' tag lists (all users, or one user).
+
+    Returns the number of tag rows written. Caller commits.
+    """
+    clear = delete(TaskTag).execution_options(synchronize_session=False)
+    statement = select(Task.id, Task.user_id, Task.tags).execution_options(yield_per=batch_size)
+    if user_id:
+        clear = clear.where(TaskTag.user_id == user_id)
+        statement = statement.where(Task.user_id == user_id)
+    db.session.execute(clear)
+
+    rows = [
+        {'user_id': row.user_id, 'tag': tag, 'task_id': row.id}
+        for row in db.session.execute(statement)
+        for tag in sorted(normalize_tags(row.tags))
+    ]
+    if rows:
+        db.session.execute(insert(TaskTag), rows)
+    return len(rows)
@@ -0,0 +1,135 @@
+# utils/time_buckets.py
+"""
+Time-bucketed aggregate queries for analytics time series.
+
+bucket_expression truncates a date/datetime column to the start of its day,
+ISO week (Monday) or month in SQL - date_trunc on PostgreSQL, strftime/date
+on SQLite - so a whole series comes back from one GROUP BY.  Empty buckets
+are filled in Python by fill_buckets.
+"""
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import func
+from extensions import db
+from utils.aggregates import dialect_name
+
+GRANULARITIES = ('day', 'week', 'month')
+
+BUCKET_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-%m-%d',
+    'month': '%Y-%m',
+}
+
+
+def bucket_expression(column, granularity='day'):
+    """SQL expression truncating column to the start of its bucket"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unsupported granularity: {granularity}')
+
+    if dialect_name() == 'postgresql':
+        return func.date_trunc(granularity, column)
+
+    if granularity == 'day':
+        return func.strftime('%Y-%m-%d', column)
+    if granularity == 'week':
+        # 'weekday 0' moves forward to Sunday; six days back is that week's Monday
+        return func.date(column, 'weekday 0', '-6 days')
+    return func.strftime('%Y-%m-01', column)
+
+
+def as_utc(value):
+    """Treat naive datetimes as UTC and convert aware ones to UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def bucket_start(value, granularity='day'):
+    """Start date of the bucket containing value (date, datetime or ISO string)"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(start, granularity='day'):
+    """Start date of the bucket following start (calendar-correct for months)"""
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1, day=1)
+        return start.replace(month=start.month + 1, day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_range(start, end, granularity='day'):
+    """Every bucket start from the bucket containing start to the one containing end"""
+    current = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def bucket_label(start, granularity='day'):
+    """Display key for a bucket, e.g. '2024-03-18' or '2024-03'"""
+    return start.strftime(BUCKET_FORMATS[granularity])
+
+
+def time_series(column, metrics, start, end, granularity='day', criteria=()):
+    """
+    Group rows by the bucket of column and evaluate named aggregates per bucket.
+
+    Only rows with start <= column <= end (and matching criteria) are scanned.
+    Returns {bucket_start_date: {metric: value}} for buckets that have rows.
+    """
+    bucket = bucket_expression(column, granularity).label('bucket')
+    names = list(metrics)
+
+    rows = db.session.query(
+        bucket,
+        *[metrics[name].label(name) for name in names]
+    ).filter(
+        column >= start,
+        column <= end,
+        *criteria
+    ).group_by(bucket).all()
+
+    return {
+        bucket_start(row.bucket, granularity): {name: getattr(row, name) or 0 for name in names}
+        for row in rows
+    }
+
+
+def fill_buckets(series, start, end, granularity='day', defaults=None):
+    """
+    Expand a sparse time_series result into one entry per bucket in [start, end].
+
+    Returns a list of (bucket_start_date, values); buckets without rows get a
+    copy of defaults (an empty dict when not given).
+    """
+    filled = []
+    for bucket in bucket_range(start, end, granularity):
+        filled.append((bucket, series.get(bucket, dict(defaults or {}))))
+    return filled
+
+
+def regroup(series, granularity='day'):
+    """Sum a daily time_series result into week or month buckets"""
+    grouped = {}
+    for day, values in series.items():
+        bucket = grouped.setdefault(bucket_start(day, granularity), {})
+        for name, value in values.items():
+            bucket[name] = bucket.get(name, 0) + value
+    return grouped
@@ -1,5 +1,5 @@
 # utils/validators.py
-from marshmallow import Schema, fields, validate, validates, ValidationError, post_load, EXCLUDE
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError, post_load, EXCLUDE, RAISE
 from email_validator import validate_email, EmailNotValidError
 from datetime import datetime, timezone
 import re
@@ -120,6 +120,57 @@ class BulkTaskSchema(Schema):
         unknown = EXCLUDE
 
 
+# Fields a bulk update may change
+BULK_UPDATE_FIELDS = ('status', 'priority', 'category', 'due_date')
+
+
+class TaskFilterSchema(Schema):
+    """Schema for the task list filters, as a bulk update's target"""
+    status = fields.String(validate=validate.OneOf(['pending', 'in-progress', 'completed', 'blocked', 'archived']))
+    priority = fields.Integer(validate=validate.Range(min=1, max=5))
+    category = fields.String(validate=validate.Length(min=1, max=50))
+    tags = fields.String(validate=validate.Length(min=1))
+    tag_match = fields.String(validate=validate.OneOf(['any', 'all']))
+    due_before = fields.DateTime()
+    due_after = fields.DateTime()
+    search = fields.String(validate=validate.Length(min=1))
+
+    class Meta:
+        unknown = RAISE
+
+    @validates_schema
+    def validate_criteria(self, data, **kwargs):
+        # An empty filter would match every task of the user
+        if not any(value is not None for key, value in data.items() if key != 'tag_match'):
+            raise ValidationError('Give at least one filter criterion')
+
+
+class BulkUpdateTaskSchema(Schema):
+    """Schema for bulk task updates: the tasks (ids or list filters) and the field patch"""
+    task_ids = fields.List(fields.String(), validate=validate.Length(min=1))
+    filter = fields.Nested(TaskFilterSchema)
+    patch = fields.Nested(UpdateTaskSchema(only=BULK_UPDATE_FIELDS), required=True)
+
+    class Meta:
+        unknown = EXCLUDE
+
+    @validates_schema
+    def validate_target(self, data, **kwargs):
+        if ('task_ids' in data) == ('filter' in data):
+            raise ValidationError('Give either task_ids or filter', 'task_ids')
+        if not data.get('patch'):
+            raise ValidationError(f'Patch at least one of: {", ".join(BULK_UPDATE_FIELDS)}', 'patch')
+
+
+class ExportJobSchema(Schema):
+    """Schema for queueing a background export"""
+    format = fields.String(required=True, validate=validate.OneOf(['csv', 'ndjson', 'pdf']))
+    compression = fields.String(validate=validate.OneOf(['gzip']))
+
+    class Meta:
+        unknown = EXCLUDE
+
+
 # Export all schemas
 __all__ = [
     'RegisterSchema',
@@ -131,5 +182,8 @@ __all__ = [
     'UpdateTaskSchema',
     'TaskStatusSchema',
     'TaskProgressSchema',
-    'BulkTaskSchema'
+    'BulkTaskSchema',
+    'TaskFilterSchema',
+    'BulkUpdateTaskSchema',
+    'ExportJobSchema'
 ]
\ No newline at end of file